@@ -4,8 +4,10 @@ Provides intelligent error detection, correction, and suggestions
 """
 
 import difflib
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional
+from collections import deque
 import re
+from lexer import TokenBuffer, TokenType
 
 class AIErrorHandler:
     """AI-powered error detection and suggestion system"""
@@ -73,14 +75,21 @@ class AIErrorHandler:
         ]
     }
     
+    # Python statements that must end their header with a colon
+    COMPOUND_STATEMENTS = ('if', 'elif', 'else', 'for', 'while', 'def', 'class')
+    
     def __init__(self, language: str = 'python'):
         self.language = language.lower()
         self.error_history: List[Dict] = []
     
-    def analyze_errors(self, code: str, tokens: List, lexer_errors: List[dict]) -> Dict:
+    def analyze_errors(self, code: str, tokens: Iterable, lexer_errors: List[dict]) -> Dict:
         """
         Comprehensive error analysis with AI-enhanced suggestions
         Returns: Dictionary with errors, warnings, and suggestions
+        
+        tokens may be a lazy stream from Lexer.iter_tokens(); it is drained
+        first because the lexer only fills lexer_errors as tokens are produced
+        (and kept for Python, whose structure check walks the tokens).
         """
         result = {
             'errors': [],
@@ -89,6 +98,12 @@ class AIErrorHandler:
             'fixed_code': code
         }
         
+        if isinstance(tokens, Iterator):
+            if self.language == 'python':
+                tokens = list(tokens)
+            else:
+                deque(tokens, maxlen=0)
+        
         # Analyze lexer errors
         for error in lexer_errors:
             enhanced_error = self._enhance_error(error, code)
@@ -109,7 +124,7 @@ class AIErrorHandler:
             result['suggestions'].extend(typo_fixes)
         
         # Analyze structural issues
-        structural_issues = self._analyze_structure(code)
+        structural_issues = self._analyze_structure(tokens)
         result['warnings'].extend(structural_issues)
         
         return result
@@ -209,35 +224,81 @@ class AIErrorHandler:
         
         return suggestions
     
-    def _analyze_structure(self, code: str) -> List[Dict]:
-        """Analyze code structure for potential issues"""
+    def _analyze_structure(self, tokens: Iterable) -> List[Dict]:
+        """
+        Analyze code structure for potential issues
+        
+        Walks the tokens the code was already lexed into. Logical lines end
+        at NEWLINE tokens when the stream has them (the tokenize engine),
+        otherwise at a line change outside brackets that does not follow a
+        backslash continuation; so comments, blank lines and bracketed
+        continuations are handled without lexing the code again.
+        """
         warnings = []
-        lines = code.split('\n')
         
         # Check for common structural issues
         if self.language == 'python':
-            # Check indentation
-            for i, line in enumerate(lines, 1):
-                if line.strip() and not line.startswith((' ', '\t')):
-                    if i > 1 and lines[i-2].rstrip().endswith(':'):
-                        warnings.append({
-                            'line': i,
-                            'type': 'indentation',
-                            'message': 'Expected indentation after colon',
-                            'severity': 'warning'
-                        })
+            NEWLINE, EOF = TokenType.NEWLINE.value, TokenType.EOF.value
+            INDENT, DEDENT = TokenType.INDENT.value, TokenType.DEDENT.value
+            DELIMITER, ERROR = TokenType.DELIMITER.value, TokenType.ERROR.value
+            # (type code, value, line, column) of every token
+            if isinstance(tokens, TokenBuffer):
+                source = tokens.source
+                values = map(source.__getitem__, map(slice, tokens.starts, tokens.ends))
+                rows = zip(tokens.types, values, tokens.lines, tokens.columns)
+                marked = NEWLINE in tokens.types
+            else:
+                rows = [(token.type.value, token.value, token.line, token.column) for token in tokens]
+                marked = any(row[0] == NEWLINE for row in rows)
+            first = last = None  # First and last token of the current logical line
+            depth = 0
+            has_colon = False
+            header = None  # First token of a header ending in ':', until its body starts
             
-            # Check for missing colons
-            for i, line in enumerate(lines, 1):
-                stripped = line.strip()
-                if stripped.startswith(('if ', 'elif ', 'else', 'for ', 'while ', 'def ', 'class ')):
-                    if not stripped.endswith(':'):
+            for row in rows:
+                code, value, line, column = row
+                if code == INDENT or code == DEDENT:
+                    continue
+                ends_line = code == NEWLINE or code == EOF
+                if last is not None and not marked and depth == 0 and line > last[2]:
+                    # A trailing backslash joins just the next physical line
+                    continued = last[0] == ERROR and last[1].endswith('\\')
+                    ends_line = not continued or line > last[2] + 1
+                if last is not None and ends_line:
+                    # Check for missing colons
+                    if first[1] in self.COMPOUND_STATEMENTS and not has_colon:
                         warnings.append({
-                            'line': i,
+                            'line': first[2],
                             'type': 'missing_colon',
                             'message': 'Missing colon at end of statement',
                             'severity': 'error'
                         })
+                    header = first if last[0] == DELIMITER and last[1] == ':' else None
+                    first = last = None
+                    depth = 0
+                    has_colon = False
+                if code == NEWLINE or code == EOF:
+                    continue
+                
+                if first is None:
+                    # Check indentation
+                    if header is not None and column <= header[3]:
+                        warnings.append({
+                            'line': line,
+                            'type': 'indentation',
+                            'message': 'Expected indentation after colon',
+                            'severity': 'warning'
+                        })
+                    header = None
+                    first = row
+                last = row
+                if code == DELIMITER:
+                    if value in '([{':
+                        depth += 1
+                    elif value in ')]}':
+                        depth = max(depth - 1, 0)
+                    elif value == ':' and depth == 0:
+                        has_colon = True
         
         return warnings
     
@@ -6,6 +6,8 @@ Provides REST API endpoints for the web frontend
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 from compiler import AIMLCompiler
+from lexer import Lexer
+from token_cache import token_cache
 import json
 import sys
 import io
@@ -14,7 +16,12 @@ import tempfile
 import os
 import traceback
 import re
+import secrets
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 # Add compilers to PATH
 gcc_path = r'C:\msys64\mingw64\bin'
@@ -34,6 +41,88 @@ CORS(app)  # Enable CORS for frontend access
 # Store compiler instances (in production, use proper session management)
 compilers = {}
 
+class LexDocuments:
+    """
+    Token buffers of open editor documents, for incremental lexing
+    
+    Documents are keyed by (session, document id), so a client only reaches
+    its own. The least recently used ones are dropped beyond max_documents
+    or max_chars of source in total, and any left unused for ttl seconds
+    expire.
+    """
+    
+    def __init__(self, max_documents: int = 1024, max_chars: int = 64 << 20, ttl: float = 3600.0):
+        self.max_documents = max_documents
+        self.max_chars = max_chars
+        self.ttl = ttl
+        # (session, document id) -> (last used, language, buffer, errors)
+        self.entries: 'OrderedDict[Tuple[str, str], tuple]' = OrderedDict()
+        self.chars = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def get(self, session: str, document_id: str) -> Optional[tuple]:
+        """(language, buffer, errors) of a document, or None"""
+        key = (session, document_id)
+        with self._lock:
+            self._expire()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries[key] = (time.monotonic(),) + entry[1:]
+            self.entries.move_to_end(key)
+            return entry[1:]
+    
+    def put(self, session: str, document_id: str, language: str, buffer, errors: list):
+        key = (session, document_id)
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.chars -= len(previous[2].source)
+            self.entries[key] = (time.monotonic(), language, buffer, errors)
+            self.chars += len(buffer.source)
+            self._expire()
+            while len(self.entries) > self.max_documents or self.chars > self.max_chars:
+                _, evicted = self.entries.popitem(last=False)
+                self.chars -= len(evicted[2].source)
+    
+    def _expire(self):
+        """Drop documents unused for ttl seconds; the oldest come first"""
+        deadline = time.monotonic() - self.ttl
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if entry[0] >= deadline:
+                break
+            del self.entries[key]
+            self.chars -= len(entry[2].source)
+
+lex_documents = LexDocuments()
+
+# Cookie naming a client's lexing session
+LEX_SESSION_COOKIE = 'lex_session'
+
+def lex_session() -> Tuple[str, bool]:
+    """The client's lexing session id, and whether it was just issued"""
+    session = request.cookies.get(LEX_SESSION_COOKIE, '')
+    if re.fullmatch(r'[A-Za-z0-9_-]{43}', session):
+        return session, False
+    return secrets.token_urlsafe(32), True
+
+def invalid_edit(edit, length: int) -> Optional[str]:
+    """Why an incremental edit cannot apply to a document of length characters, or None"""
+    if not isinstance(edit, dict):
+        return 'edit must be an object'
+    offset, deleted = edit.get('offset', 0), edit.get('deleted', 0)
+    if type(offset) is not int or type(deleted) is not int:
+        return 'edit offset and deleted must be integers'
+    if not isinstance(edit.get('inserted', ''), str):
+        return 'edit inserted must be a string'
+    if offset < 0 or deleted < 0 or offset + deleted > length:
+        return f'edit deleting {deleted} characters at offset {offset} is outside the {length}-character document'
+    return None
+
 def execute_code(code: str, language: str, user_inputs: list = None) -> dict:
     """
     Execute the compiled code safely and capture output
@@ -853,6 +942,91 @@ def compile_code():
             'error': str(e)
         }), 500
 
+@app.route('/api/tokenize', methods=['POST'])
+def tokenize_code():
+    """
+    Tokenize an editor document, re-lexing only the edited lines when possible
+    
+    Request body (full text):
+    {
+        "document_id": "editor-1",
+        "language": "python",
+        "code": "source code here"
+    }
+    
+    Request body (incremental):
+    {
+        "document_id": "editor-1",
+        "edit": {"offset": 42, "deleted": 3, "inserted": "abc"}
+    }
+    
+    Documents belong to the session named by the lex_session cookie, which
+    is issued with the first response.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'Expected a JSON object'
+            }), 400
+        session, new_session = lex_session()
+        document_id = data.get('document_id', 'default')
+        if not isinstance(document_id, str) or len(document_id) > 256:
+            return jsonify({
+                'success': False,
+                'error': 'document_id must be a string of at most 256 characters'
+            }), 400
+        edit = data.get('edit')
+        
+        if edit is not None:
+            document = lex_documents.get(session, document_id)
+            if document is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'Unknown document, send the full code first'
+                }), 409
+            language, buffer, errors = document
+            error = invalid_edit(edit, len(buffer.source))
+            if error:
+                return jsonify({
+                    'success': False,
+                    'error': error
+                }), 400
+            lexer = Lexer('', language)
+            buffer, errors = lexer.relex(
+                buffer, errors,
+                edit.get('offset', 0),
+                edit.get('deleted', 0),
+                edit.get('inserted', '')
+            )
+        else:
+            language, code = data.get('language', 'python'), data.get('code', '')
+            if not isinstance(language, str) or not isinstance(code, str):
+                return jsonify({
+                    'success': False,
+                    'error': 'language and code must be strings'
+                }), 400
+            lexer = Lexer(code, language)
+            buffer, errors = lexer.tokenize_buffer()
+        
+        lex_documents.put(session, document_id, language, buffer, errors)
+        
+        response = jsonify({
+            'success': True,
+            'tokens': buffer.to_dicts(),
+            'errors': errors
+        })
+        if new_session:
+            response.set_cookie(LEX_SESSION_COOKIE, session, httponly=True, samesite='Lax')
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/detect-language', methods=['POST'])
 def detect_language():
     """
@@ -1018,7 +1192,8 @@ def health_check():
             'Automatic language detection',
             'IR optimization',
             'Intelligent suggestions'
-        ]
+        ],
+        'token_cache': token_cache.stats()
     })
 
 @app.route('/', methods=['GET'])
@@ -1039,6 +1214,7 @@ def api_docs():
         'version': '1.0.0',
         'endpoints': {
             '/api/compile': 'POST - Compile code with AI/ML enhancements',
+            '/api/tokenize': 'POST - Tokenize a document, incrementally after edits',
             '/api/detect-language': 'POST - Detect programming language',
             '/api/correct-syntax': 'POST - Auto-correct syntax errors',
             '/api/explain-error': 'POST - Get human-friendly error explanations',
@@ -0,0 +1,2290 @@
+"""
+C-Family Frontend
+Recursive-descent parser lowering C, C++, Java, JavaScript/TypeScript and Go
+token streams to three-address IR
+"""
+
+import warnings
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from lexer import Lexer, TokenBuffer, TokenType
+from intermediate_representation import IRGenerator, IRInstruction, IROpCode, Scope, SymbolKind, ir_name, is_temp
+
+_KEYWORD = TokenType.KEYWORD.value
+_IDENTIFIER = TokenType.IDENTIFIER.value
+_NUMBER = TokenType.NUMBER.value
+_STRING = TokenType.STRING.value
+_OPERATOR = TokenType.OPERATOR.value
+_DELIMITER = TokenType.DELIMITER.value
+_EOF = TokenType.EOF.value
+_WORDS = (_KEYWORD, _IDENTIFIER)
+
+_OPENERS = {'(': ')', '[': ']', '{': '}'}
+_CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+# Keywords allowed in the type of a declaration, modifiers included
+C_TYPE_WORDS = frozenset((
+    'auto', 'char', 'const', 'double', 'enum', 'extern', 'float', 'inline', 'int', 'long',
+    'register', 'restrict', 'short', 'signed', 'static', 'struct', 'union', 'unsigned',
+    'void', 'volatile', 'bool'
+))
+CPP_TYPE_WORDS = C_TYPE_WORDS | {'constexpr', 'mutable', 'typename', 'virtual', 'explicit', 'friend'}
+JAVA_TYPE_WORDS = frozenset((
+    'abstract', 'boolean', 'byte', 'char', 'double', 'final', 'float', 'int', 'long',
+    'native', 'private', 'protected', 'public', 'short', 'static', 'strictfp',
+    'synchronized', 'transient', 'void', 'volatile'
+))
+
+# Keywords that may begin a cast such as (int) x
+CAST_WORDS = frozenset(('int', 'long', 'short', 'char', 'byte', 'unsigned', 'signed', 'float', 'double', 'bool', 'boolean'))
+FLOAT_WORDS = frozenset(('float', 'double'))
+
+# Words that evaluate to constants
+LITERAL_WORDS = {
+    'true': True, 'false': False, 'null': None, 'nullptr': None, 'NULL': None,
+    'nil': None, 'undefined': None
+}
+
+# Calls that print their arguments on one line, like Python's print()
+PRINT_CALLS = (('System', '.', 'out', '.', 'println'), ('console', '.', 'log'), ('fmt', '.', 'Println'))
+
+# Binary operator -> (precedence, opcode); higher binds tighter
+C_BINARY_OPS = {
+    '||': (1, IROpCode.OR), '??': (1, None), '&&': (2, IROpCode.AND),
+    '|': (3, IROpCode.BIT_OR), '^': (4, IROpCode.BIT_XOR), '&': (5, IROpCode.BIT_AND),
+    '==': (6, IROpCode.EQ), '!=': (6, IROpCode.NE),
+    '===': (6, IROpCode.STRICT_EQ), '!==': (6, IROpCode.STRICT_NE),
+    '<': (7, IROpCode.LT), '<=': (7, IROpCode.LE), '>': (7, IROpCode.GT), '>=': (7, IROpCode.GE),
+    '<<': (8, IROpCode.SHL), '>>': (8, IROpCode.SHR), '>>>': (8, IROpCode.SHR),
+    '+': (9, IROpCode.ADD), '-': (9, IROpCode.SUB),
+    '*': (10, IROpCode.MUL), '/': (10, IROpCode.DIV), '%': (10, IROpCode.MOD),
+    '**': (11, IROpCode.POW)
+}
+GO_BINARY_OPS = {
+    '||': (1, IROpCode.OR), '&&': (2, IROpCode.AND),
+    '==': (3, IROpCode.EQ), '!=': (3, IROpCode.NE), '<': (3, IROpCode.LT), '<=': (3, IROpCode.LE),
+    '>': (3, IROpCode.GT), '>=': (3, IROpCode.GE),
+    '+': (4, IROpCode.ADD), '-': (4, IROpCode.SUB), '|': (4, IROpCode.BIT_OR), '^': (4, IROpCode.BIT_XOR),
+    '*': (5, IROpCode.MUL), '/': (5, IROpCode.DIV), '%': (5, IROpCode.MOD), '<<': (5, IROpCode.SHL),
+    '>>': (5, IROpCode.SHR), '&': (5, IROpCode.BIT_AND), '&^': (5, None)
+}
+
+# Compound assignment operator -> opcode
+ASSIGN_OPS = {
+    '+=': IROpCode.ADD, '-=': IROpCode.SUB, '*=': IROpCode.MUL, '/=': IROpCode.DIV,
+    '%=': IROpCode.MOD, '&=': IROpCode.BIT_AND, '|=': IROpCode.BIT_OR, '^=': IROpCode.BIT_XOR,
+    '<<=': IROpCode.SHL, '>>=': IROpCode.SHR, '>>>=': IROpCode.SHR, '**=': IROpCode.POW
+}
+
+class _ParseError(Exception):
+    """Syntax error at the current token"""
+
+class CFamilyFrontend(IRGenerator):
+    """
+    Recursive-descent parser for the statement and expression grammar the C
+    family shares, lowering straight to IRInstructions as it parses
+    
+    Works on a Lexer TokenBuffer without building Token objects or a tree.
+    A syntax error is recorded in self.errors and parsing resumes at the
+    next statement boundary. Function bodies are skipped where they are
+    defined (brackets are matched once up front) and lowered afterwards as
+    FUNC_BEGIN ... FUNC_END regions, so every token is parsed once.
+    Constructs without an IR form are listed in self.unsupported. Names
+    are declared in symbol_table where the source declares them, in the
+    scope of the function being lowered; any other name is a global.
+    """
+    
+    LANGUAGES = ('c', 'cpp', 'java', 'javascript', 'typescript', 'go')
+    
+    def __init__(self, language: str = 'c'):
+        super().__init__()
+        if language not in self.LANGUAGES:
+            raise ValueError(f'No C-family frontend for {language!r}')
+        self.language = language
+        self.go = language == 'go'
+        self.js = language in ('javascript', 'typescript')
+        self.typed_declarations = language in ('c', 'cpp', 'java')
+        # Go and JavaScript end statements at line breaks
+        self.auto_semicolons = self.go or self.js
+        self.type_words = {'c': C_TYPE_WORDS, 'cpp': CPP_TYPE_WORDS, 'java': JAVA_TYPE_WORDS}.get(language, frozenset())
+        self.binary_ops = GO_BINARY_OPS if self.go else C_BINARY_OPS
+        self.errors: List[Dict] = []
+        self.unsupported: List[Dict] = []
+        self._statement_handlers = {
+            'if': self._if,
+            'while': self._while,
+            'do': self._do_while,
+            'for': self._for,
+            'return': self._return,
+            'break': self._break,
+            'continue': self._continue,
+            'switch': self._switch,
+            'try': self._try,
+            'throw': self._skip_unsupported,
+            'goto': self._skip_unsupported,
+            'defer': self._skip_unsupported,
+            'go': self._skip_unsupported,
+            'select': self._skip_unsupported,
+            'fallthrough': self._fallthrough,
+            'class': self._skip_unsupported,
+            'type': self._skip_unsupported,
+            'interface': self._skip_unsupported,
+            'enum': self._skip_unsupported,
+            'import': self._skip_statement,
+            'package': self._skip_statement,
+            'using': self._skip_statement,
+            'typedef': self._skip_statement,
+            'export': self._export,
+            'let': self._variable_declaration,
+            'const': self._variable_declaration,
+            'var': self._variable_declaration,
+            'function': self._function_statement,
+            'async': self._advance
+        }
+    
+    def generate_from_source(self, source: str) -> List[IRInstruction]:
+        """Lex and lower source"""
+        buffer, _ = Lexer(source, self.language).tokenize_buffer()
+        return self.generate_from_buffer(buffer)
+    
+    def generate_from_buffer(self, buffer: TokenBuffer) -> List[IRInstruction]:
+        """Lower a lexed program: its top-level code first, then one region per function"""
+        self.instructions = []
+        self.temp_counter = 0
+        self.label_counter = 0
+        self.errors = []
+        self.unsupported = []
+        self.source = buffer.source
+        self.types = buffer.types
+        self.starts = buffer.starts
+        self.ends = buffer.ends
+        self.lines = buffer.lines
+        self.columns = buffer.columns
+        if not self.types or self.types[-1] != _EOF:
+            raise ValueError('Token buffer must end with EOF')
+        self.last = len(self.types) - 1
+        self.match = self._match_brackets()
+        self._reset_symbols()
+        self._pending: List[Tuple[str, List, int, bool, Scope]] = []
+        self._loops: List[Tuple[Optional[str], str]] = []
+        self._named_loops: Dict[str, Tuple[Optional[str], str]] = {}
+        self._loop_name: Optional[str] = None
+        self._lambda_counter = 0
+        self._access = None
+        self._address_taken: List[str] = []
+        self._no_composite = False
+        self._in_switch = False
+        self._falls_through = False
+        self._line = 1
+        self._seek(0)
+        
+        self._top_level(self.last)
+        params = next((params for name, params, *_ in self._pending if name == 'main'), None)
+        if params is not None and not self.js:
+            # Programs start in main once globals are initialized: Java's gets an
+            # empty args array, C's an argc of 1 and an argv of the program name
+            arguments = []
+            if len(params) == 1:
+                arguments.append(self._temp_op(IROpCode.BUILD_LIST, []))
+            elif len(params) == 2:
+                arguments += [1, self._temp_op(IROpCode.BUILD_LIST, ["''"])]
+            self._temp_op(IROpCode.CALL, ['main'] + arguments)
+        if self._pending:
+            self._emit(IROpCode.HALT, [])
+        index = 0
+        while index < len(self._pending):
+            self._lower_function(*self._pending[index])
+            index += 1
+        self._bind_symbols(assignments_declare=False)
+        return self.instructions
+    
+    def _match_brackets(self) -> array:
+        """Index of the partner of every bracket token (-1 when unbalanced)"""
+        source, types, starts, ends = self.source, self.types, self.starts, self.ends
+        match = array('i', [-1]) * len(types)
+        stack = []
+        for index in range(len(types)):
+            if types[index] != _DELIMITER or ends[index] - starts[index] != 1:
+                continue
+            char = source[starts[index]]
+            if char in _OPENERS:
+                stack.append(index)
+            elif char in _CLOSERS and stack:
+                opener = stack[-1]
+                if source[starts[opener]] != _CLOSERS[char]:
+                    if char != '}':
+                        continue
+                    # A '}' closes its block even past unclosed '(' or '['
+                    depth = len(stack) - 1
+                    while depth >= 0 and source[starts[stack[depth]]] != '{':
+                        depth -= 1
+                    if depth < 0:
+                        continue
+                    del stack[depth + 1:]
+                opener = stack.pop()
+                match[opener] = index
+                match[index] = opener
+        return match
+    
+    def _text(self, index: int) -> str:
+        """Text of a token; strings read as '' so they never match punctuation"""
+        if self.types[index] == _STRING:
+            return ''
+        return self.source[self.starts[index]:self.ends[index]]
+    
+    def _seek(self, index: int):
+        if index > self.last:
+            index = self.last
+        self.pos = index
+        kind = self.kind = self.types[index]
+        self.tok = '' if kind == _STRING else self.source[self.starts[index]:self.ends[index]]
+        self._line = self.lines[index]
+    
+    def _advance(self):
+        self._seek(self.pos + 1)
+    
+    def _peek(self, offset: int = 1) -> str:
+        return self._text(min(self.pos + offset, self.last))
+    
+    def _skip_group(self):
+        """Move past the bracket group opened at the current token (to the end if unclosed)"""
+        partner = self.match[self.pos]
+        self._seek(partner + 1 if partner > self.pos else self.last)
+    
+    def _accept(self, text: str) -> bool:
+        if self.tok == text:
+            self._advance()
+            return True
+        return False
+    
+    def _expect(self, text: str):
+        if self.tok != text:
+            raise _ParseError(f"Expected '{text}'")
+        self._advance()
+    
+    def _word(self) -> str:
+        """Consume an identifier (or keyword used as a member name)"""
+        if self.kind not in _WORDS:
+            raise _ParseError('Expected a name')
+        word = self.tok
+        self._advance()
+        return word
+    
+    def _emit(self, opcode: IROpCode, operands: List[Any], result: Optional[str] = None) -> IRInstruction:
+        """Emit at the line of the current token"""
+        instruction = IRInstruction(opcode, operands, result, self._line)
+        self.instructions.append(instruction)
+        return instruction
+    
+    def _temp_op(self, opcode: IROpCode, operands: List[Any]) -> str:
+        """Emit an instruction into a fresh temporary and return it"""
+        temp = self.generate_temp()
+        self.instructions.append(IRInstruction(opcode, operands, temp, self._line))
+        return temp
+    
+    def _label(self, label: str):
+        self.instructions.append(IRInstruction(IROpCode.LABEL, [label], None, self._line))
+    
+    def _jump(self, label: str):
+        self.instructions.append(IRInstruction(IROpCode.JUMP, [label], None, self._line))
+    
+    @staticmethod
+    def _name(identifier: str) -> str:
+        """IR name of a source identifier"""
+        return ir_name(identifier)
+    
+    def _declare(self, name: str, kind: Optional[SymbolKind] = None):
+        """Declare name in the current scope: a local in a function, else a global"""
+        table = self.symbol_table
+        if kind is None:
+            kind = SymbolKind.GLOBAL if table.scope is table.module else SymbolKind.LOCAL
+        if name != '_':
+            table.declare(name, kind)
+    
+    def _unsupported(self, construct: str, value: bool = False) -> Optional[str]:
+        """Record a construct the IR cannot express; values get an opaque NOP"""
+        self.unsupported.append({'line': self._line, 'construct': construct})
+        if value:
+            return self._temp_op(IROpCode.NOP, [construct])
+        self._emit(IROpCode.NOP, [construct])
+        return None
+    
+    def _record_error(self, message: str):
+        self.errors.append({
+            'line': self.lines[self.pos],
+            'column': self.columns[self.pos],
+            'message': message if self.kind != _EOF else f'{message} before end of input',
+            'severity': 'error'
+        })
+    
+    # Statements
+    
+    def _top_level(self, end: int):
+        """Declarations and statements up to token index end"""
+        while self.pos < end and self.kind != _EOF:
+            start = self.pos
+            try:
+                if self.go:
+                    self._go_top_level()
+                elif self.typed_declarations:
+                    self._external_declaration()
+                else:
+                    self._statement()
+            except _ParseError as error:
+                self._record_error(str(error))
+                self._synchronize(end)
+            if self.pos == start:
+                self._advance()
+    
+    def _statements(self, end: int, stops: Tuple[str, ...] = ()):
+        """Statements up to token index end (or a stop word such as 'case')"""
+        while self.pos < end and self.kind != _EOF and not (stops and self.tok in stops):
+            start = self.pos
+            try:
+                self._statement()
+            except _ParseError as error:
+                self._record_error(str(error))
+                self._synchronize(end)
+            if self.pos == start:
+                self._advance()
+    
+    def _synchronize(self, end: int):
+        """Skip to the next statement boundary after a syntax error"""
+        line = self.lines[self.pos]
+        while self.pos < end and self.kind != _EOF:
+            tok = self.tok
+            if tok == ';':
+                self._advance()
+                return
+            if tok == '}':
+                return
+            if self.auto_semicolons and self.lines[self.pos] > line:
+                return
+            partner = self.match[self.pos]
+            if tok in _OPENERS and self.kind == _DELIMITER:
+                if partner < 0:
+                    self._seek(end)
+                    return
+                self._seek(partner + 1)
+            else:
+                self._advance()
+    
+    def _end_statement(self):
+        """Consume a ';', or accept a line break where semicolons are optional"""
+        if self.tok == ';':
+            self._advance()
+        elif self.tok == '}' or self.kind == _EOF or self.lines[self.pos] > self.lines[self.pos - 1]:
+            if not self.auto_semicolons:
+                self._record_error("Expected ';'")
+        else:
+            raise _ParseError("Expected ';'")
+    
+    def _statement(self):
+        tok, kind = self.tok, self.kind
+        if kind == _DELIMITER:
+            if tok == '{':
+                self._block()
+                return
+            if tok == ';':
+                self._advance()
+                return
+        if self.typed_declarations and self._declaration_name(self.pos) >= 0:
+            self._declaration()
+            self._end_statement()
+            return
+        if kind == _KEYWORD:
+            handler = self._statement_handlers.get(tok)
+            if handler is not None:
+                handler()
+                return
+        if kind == _IDENTIFIER and self._peek() == ':':
+            # Statement label, e.g. outer: for (...)
+            self._loop_name = tok
+            self._advance()
+            self._advance()
+            return
+        if self.language == 'cpp' and self._cout_statement():
+            return
+        self._simple_statement()
+        self._end_statement()
+    
+    def _block(self):
+        """'{' statements '}'"""
+        close = self.match[self.pos]
+        self._expect('{')
+        end = close if close >= 0 else self.last
+        self._statements(end)
+        if close >= 0:
+            self._seek(close + 1)
+        else:
+            self._record_error("Expected '}'")
+    
+    def _body(self):
+        """A loop or branch body: a block, or one statement outside Go"""
+        if self.go:
+            if self.tok != '{':
+                raise _ParseError("Expected '{'")
+            self._block()
+        else:
+            self._statement()
+    
+    def _simple_statement(self) -> Optional[Any]:
+        """
+        Expression, assignment or increment statement
+        
+        Returns the value of a plain expression (for Go's 'if x := f(); x'),
+        else None. Go's a, b = b, a assigns in parallel.
+        """
+        first = self._assignment()
+        if self.tok != ',':
+            return first
+        if not self.go and not self.js:
+            # The C comma operator
+            while self._accept(','):
+                self._assignment()
+            return None
+        
+        targets = [first]
+        while self._accept(','):
+            targets.append(self._conditional())
+        if self.tok not in ('=', ':='):
+            raise _ParseError("Expected '='")
+        if self.tok == ':=':
+            for target in targets:
+                if isinstance(target, str) and not is_temp(target):
+                    self._declare(target)
+        self._advance()
+        values = [self._assignment()]
+        while self._accept(','):
+            values.append(self._assignment())
+        if len(values) == 1 and len(targets) > 1:
+            # a, b := f() unpacks one result
+            values = [self._temp_op(IROpCode.GET_ITEM, [values[0], index]) for index in range(len(targets))]
+        elif len(values) != len(targets):
+            raise _ParseError('Assignment count mismatch')
+        else:
+            # Every value is read before any target is written
+            values = [
+                self._temp_op(IROpCode.STORE, [value]) if isinstance(value, str) and not is_temp(value) else value
+                for value in values
+            ]
+        for target, value in zip(targets, values):
+            if target == '_':
+                continue
+            if not isinstance(target, str) or is_temp(target):
+                raise _ParseError('Invalid assignment target')
+            self._emit(IROpCode.STORE, [value], target)
+        return None
+    
+    def _cout_statement(self) -> bool:
+        """std::cout << a << b; prints its operands"""
+        if self.tok == 'std' and self._peek() == '::' and self._peek(2) == 'cout' and self._peek(3) == '<<':
+            self._advance()
+            self._advance()
+        elif not (self.tok == 'cout' and self._peek() == '<<'):
+            return False
+        self._advance()
+        operands = []
+        precedence = self.binary_ops['<<'][0] + 1
+        while self._accept('<<'):
+            if self.tok in ('endl', 'std') and (self.tok == 'endl' or self._peek(2) == 'endl'):
+                self._advance()
+                if self._accept('::'):
+                    self._advance()
+                continue
+            operands.append(self._binary(precedence))
+        self._emit(IROpCode.PRINT, operands)
+        self._end_statement()
+        return True
+    
+    def _condition(self) -> Any:
+        """Parenthesized condition, or a bare one in Go"""
+        if self.go:
+            return self._header_expression()
+        self._expect('(')
+        value = self._expression()
+        self._expect(')')
+        return value
+    
+    def _header_expression(self) -> Any:
+        """Expression in a Go header, where '{' starts the body rather than a literal"""
+        saved = self._no_composite
+        self._no_composite = True
+        try:
+            return self._expression()
+        finally:
+            self._no_composite = saved
+    
+    def _if(self):
+        self._advance()
+        if self.go:
+            saved = self._no_composite
+            self._no_composite = True
+            try:
+                value = self._simple_statement()
+                if self._accept(';'):
+                    value = self._expression()
+            finally:
+                self._no_composite = saved
+            if value is None:
+                raise _ParseError('Expected a condition')
+        else:
+            value = self._condition()
+        else_label = self.generate_label()
+        self._emit(IROpCode.JUMP_IF_FALSE, [value, else_label])
+        self._body()
+        if self.tok == 'else':
+            self._advance()
+            end_label = self.generate_label()
+            if not self._ends_in_jump():
+                self._jump(end_label)
+            self._label(else_label)
+            if self.tok == 'if':
+                self._if()
+            else:
+                self._body()
+            self._label(end_label)
+        else:
+            self._label(else_label)
+    
+    def _ends_in_jump(self) -> bool:
+        """Whether the last instruction never falls through"""
+        return bool(self.instructions) and self.instructions[-1].opcode in (IROpCode.JUMP, IROpCode.RETURN)
+    
+    def _enter_loop(self, continue_label: Optional[str], break_label: str):
+        self._loops.append((continue_label, break_label))
+        if self._loop_name:
+            self._named_loops[self._loop_name] = (continue_label, break_label)
+            self._loop_name = None
+    
+    def _while(self):
+        self._advance()
+        start_label = self.generate_label()
+        end_label = self.generate_label()
+        self._label(start_label)
+        value = self._condition()
+        self._emit(IROpCode.JUMP_IF_FALSE, [value, end_label])
+        self._enter_loop(start_label, end_label)
+        self._body()
+        self._loops.pop()
+        self._jump(start_label)
+        self._label(end_label)
+    
+    def _do_while(self):
+        self._advance()
+        start_label = self.generate_label()
+        condition_label = self.generate_label()
+        end_label = self.generate_label()
+        self._label(start_label)
+        self._enter_loop(condition_label, end_label)
+        self._statement()
+        self._loops.pop()
+        self._label(condition_label)
+        if self.tok != 'while':
+            raise _ParseError("Expected 'while'")
+        self._advance()
+        value = self._condition()
+        self._emit(IROpCode.JUMP_IF_TRUE, [value, start_label])
+        self._label(end_label)
+        self._end_statement()
+    
+    def _for(self):
+        self._advance()
+        if self.go:
+            self._go_for()
+            return
+        close = self.match[self.pos]
+        if self.tok != '(' or close < 0:
+            raise _ParseError("Expected '('")
+        if self._for_each(close):
+            return
+        self._advance()
+        # init; cond; step with the step lowered after the body
+        if self.tok != ';':
+            if self.typed_declarations and self._declaration_name(self.pos) >= 0:
+                self._declaration()
+            elif self.kind == _KEYWORD and self.tok in ('let', 'var', 'const'):
+                self._advance()
+                self._declarators()
+            else:
+                self._simple_statement()
+        self._expect(';')
+        start_label = self.generate_label()
+        step_label = self.generate_label()
+        end_label = self.generate_label()
+        self._label(start_label)
+        if self.tok != ';':
+            self._emit(IROpCode.JUMP_IF_FALSE, [self._expression(), end_label])
+        self._expect(';')
+        step = self.pos
+        self._seek(close + 1)
+        self._loop_with_step(step, close, start_label, step_label, end_label)
+    
+    def _loop_with_step(self, step: int, step_end: int, start_label: str, step_label: str, end_label: str):
+        """Body, then the step clause found at token index step, then the back edge"""
+        self._enter_loop(step_label, end_label)
+        self._body()
+        self._loops.pop()
+        after = self.pos
+        self._label(step_label)
+        if step < step_end:
+            self._seek(step)
+            self._simple_statement()
+            if self.pos != step_end:
+                raise _ParseError("Expected ')'" if not self.go else "Expected '{'")
+            self._seek(after)
+        self._jump(start_label)
+        self._label(end_label)
+    
+    def _for_each(self, close: int) -> bool:
+        """for (T x : xs), for (const x of xs) and for (k in obj)"""
+        index = self.pos + 1
+        separator = -1
+        while index < close:
+            text = self._text(index)
+            if text == ';':
+                return False
+            if self.types[index] == _DELIMITER and text in _OPENERS and self.match[index] > 0:
+                index = self.match[index]
+            elif (text == ':' and self.types[index] == _DELIMITER) or (
+                    self.js and self.types[index] == _KEYWORD and text in ('of', 'in')):
+                separator = index
+                break
+            index += 1
+        if separator < 0:
+            return False
+        name = self._text(separator - 1)
+        if self.types[separator - 1] not in _WORDS:
+            raise _ParseError('Expected a loop variable')
+        if separator - 1 > self.pos + 1:
+            # A type or let/const/var declares it
+            self._declare(self._name(name))
+        self._seek(separator + 1)
+        iterable = self._expression()
+        if self.pos != close:
+            raise _ParseError("Expected ')'")
+        self._seek(close + 1)
+        if self._text(separator) == 'in':
+            # for..in visits keys (indices of arrays)
+            iterable = self._temp_op(IROpCode.CALL, ['Object.keys', iterable])
+        self._iterate(iterable, [self._name(name)])
+        return True
+    
+    def _iterate(self, iterable: Any, targets: List[str], enumerate_items: bool = False):
+        """GET_ITER/FOR_ITER loop binding targets on every item"""
+        if enumerate_items:
+            iterable = self._temp_op(IROpCode.CALL, ['enumerate', iterable])
+        iterator = self._temp_op(IROpCode.GET_ITER, [iterable])
+        start_label = self.generate_label()
+        end_label = self.generate_label()
+        self._label(start_label)
+        item = self._temp_op(IROpCode.FOR_ITER, [iterator, end_label])
+        if enumerate_items:
+            for index, target in enumerate(targets):
+                if target != '_':
+                    self._emit(IROpCode.GET_ITEM, [item, index], target)
+        elif targets[0] != '_':
+            self.instructions[-1].result = targets[0]
+        self._enter_loop(start_label, end_label)
+        self._body()
+        self._loops.pop()
+        self._jump(start_label)
+        self._label(end_label)
+    
+    def _go_for(self):
+        """for {}, for cond {}, for init; cond; post {} and for k, v := range x {}"""
+        if self.tok == '{':
+            start_label = self.generate_label()
+            end_label = self.generate_label()
+            self._label(start_label)
+            self._enter_loop(start_label, end_label)
+            self._block()
+            self._loops.pop()
+            self._jump(start_label)
+            self._label(end_label)
+            return
+        
+        # Find the body brace and what the header holds
+        index = self.pos
+        semicolons = []
+        range_at = -1
+        while index < self.last:
+            text = self._text(index)
+            if self.types[index] == _DELIMITER:
+                if text == '{':
+                    break
+                if text in ('(', '[') and self.match[index] > 0:
+                    index = self.match[index]
+                elif text == ';':
+                    semicolons.append(index)
+            elif text == 'range' and self.types[index] == _KEYWORD:
+                range_at = index
+            index += 1
+        body = index
+        
+        if range_at >= 0:
+            targets = []
+            while self.pos < range_at and self.tok not in (':=', '=', 'range'):
+                targets.append(self._name(self._word()))
+                self._accept(',')
+            if self.tok == ':=':
+                for target in targets:
+                    self._declare(target)
+            self._seek(range_at + 1)
+            iterable = self._header_expression()
+            if not targets:
+                targets = ['_']
+            if len(targets) == 1:
+                # The first range variable is the index
+                length = self._temp_op(IROpCode.CALL, ['len', iterable])
+                iterable = self._temp_op(IROpCode.CALL, ['range', length])
+                self._iterate(iterable, targets)
+            else:
+                self._iterate(iterable, targets, enumerate_items=True)
+            return
+        
+        if len(semicolons) != 2:
+            start_label = self.generate_label()
+            end_label = self.generate_label()
+            self._label(start_label)
+            self._emit(IROpCode.JUMP_IF_FALSE, [self._header_expression(), end_label])
+            self._enter_loop(start_label, end_label)
+            self._block()
+            self._loops.pop()
+            self._jump(start_label)
+            self._label(end_label)
+            return
+        
+        saved = self._no_composite
+        self._no_composite = True
+        try:
+            if self.tok != ';':
+                self._simple_statement()
+            self._expect(';')
+            start_label = self.generate_label()
+            step_label = self.generate_label()
+            end_label = self.generate_label()
+            self._label(start_label)
+            if self.tok != ';':
+                self._emit(IROpCode.JUMP_IF_FALSE, [self._expression(), end_label])
+            self._expect(';')
+        finally:
+            self._no_composite = saved
+        step = self.pos
+        self._seek(body)
+        self._loop_with_step(step, body, start_label, step_label, end_label)
+    
+    def _return(self):
+        self._advance()
+        if self.tok in (';', '}') or self.kind == _EOF or (
+                self.auto_semicolons and self.lines[self.pos] > self.lines[self.pos - 1]):
+            self._emit(IROpCode.RETURN, [])
+        else:
+            value = self._expression()
+            if self.go and self.tok == ',':
+                values = [value]
+                while self._accept(','):
+                    values.append(self._expression())
+                value = self._temp_op(IROpCode.BUILD_TUPLE, values)
+            self._emit(IROpCode.RETURN, [value])
+        self._end_statement()
+    
+    def _break(self):
+        self._loop_jump(1)
+    
+    def _continue(self):
+        self._loop_jump(0)
+    
+    def _loop_jump(self, which: int):
+        """break (which=1) or continue (which=0), possibly to a named loop"""
+        keyword = self.tok
+        self._advance()
+        target = None
+        if self.kind == _IDENTIFIER and self.lines[self.pos] == self.lines[self.pos - 1]:
+            target = self._named_loops.get(self.tok)
+            self._advance()
+            if target is None:
+                raise _ParseError(f"Unknown label for '{keyword}'")
+        elif which == 0:
+            target = next((loop for loop in reversed(self._loops) if loop[0] is not None), None)
+        elif self._loops:
+            target = self._loops[-1]
+        if target is None:
+            raise _ParseError(f"'{keyword}' outside loop")
+        self._jump(target[which])
+        self._end_statement()
+    
+    def _fallthrough(self):
+        """Go's fallthrough: the case body continues into the next one"""
+        if not self._in_switch:
+            raise _ParseError("'fallthrough' outside switch")
+        self._advance()
+        self._falls_through = True
+        self._end_statement()
+    
+    def _switch(self):
+        """
+        switch lowered to a compare chain and case bodies in source order
+        
+        C, C++, Java and JavaScript cases fall through; Go cases (and Java
+        'case X ->' arms) end with an implicit break.
+        """
+        self._advance()
+        if self.go:
+            saved = self._no_composite
+            self._no_composite = True
+            try:
+                value = None
+                if self.tok != '{':
+                    value = self._simple_statement()
+                    if self._accept(';'):
+                        value = self._expression() if self.tok != '{' else None
+            finally:
+                self._no_composite = saved
+        else:
+            value = self._condition()
+        if isinstance(value, str) and not is_temp(value):
+            value = self._temp_op(IROpCode.STORE, [value])
+        
+        close = self.match[self.pos]
+        self._expect('{')
+        end = close if close >= 0 else self.last
+        end_label = self.generate_label()
+        dispatch = len(self.instructions)
+        self._loops.append((None, end_label))
+        saved_switch = self._in_switch
+        self._in_switch = True
+        
+        cases = []  # (value operands or None for default, label)
+        while self.pos < end and self.kind != _EOF:
+            if self.tok not in ('case', 'default'):
+                raise _ParseError("Expected 'case'")
+            label = self.generate_label()
+            if self.tok == 'default':
+                self._advance()
+                matches = None
+            else:
+                self._advance()
+                # Case values are computed in the dispatch chain
+                mark = len(self.instructions)
+                matches = [self._conditional()]
+                while self._accept(','):
+                    matches.append(self._conditional())
+                matches = (matches, self.instructions[mark:])
+                del self.instructions[mark:]
+            arrow = self.tok == '->'
+            if not arrow:
+                self._expect(':')
+            else:
+                self._advance()
+            cases.append((matches, label))
+            self._label(label)
+            if arrow:
+                self._statement()
+                self._jump(end_label)
+                continue
+            self._falls_through = False
+            self._statements(end, ('case', 'default'))
+            if self.go and not self._falls_through:
+                self._jump(end_label)
+        
+        self._loops.pop()
+        self._in_switch = saved_switch
+        if close >= 0:
+            self._seek(close + 1)
+        # Dispatch: compare against each case in order, then default (JavaScript matches with ===)
+        equal = IROpCode.STRICT_EQ if self.js else IROpCode.EQ
+        chain = []
+        default_label = end_label
+        for matches, label in cases:
+            if matches is None:
+                default_label = label
+                continue
+            operands, setup = matches
+            chain += setup
+            for operand in operands:
+                if value is None:
+                    chain.append(IRInstruction(IROpCode.JUMP_IF_TRUE, [operand, label], None, setup[0].line if setup else self._line))
+                    continue
+                test = self.generate_temp()
+                chain.append(IRInstruction(equal, [value, operand], test, self._line))
+                chain.append(IRInstruction(IROpCode.JUMP_IF_TRUE, [test, label], None, self._line))
+        chain.append(IRInstruction(IROpCode.JUMP, [default_label], None, self._line))
+        self.instructions[dispatch:dispatch] = chain
+        self._label(end_label)
+    
+    def _try(self):
+        """Exceptions have no IR form: catch blocks are recorded, try/finally bodies run in order"""
+        self._advance()
+        if self.tok == '(':
+            # Java try-with-resources
+            self._skip_group()
+        self._block()
+        while self.tok == 'catch':
+            self._unsupported('catch')
+            self._advance()
+            if self.tok == '(':
+                self._skip_group()
+            if self.tok != '{' or self.match[self.pos] < 0:
+                raise _ParseError("Expected '{'")
+            self._skip_group()
+        if self.tok == 'finally':
+            self._advance()
+            self._block()
+    
+    def _skip_unsupported(self):
+        """Record the statement and skip it"""
+        self._unsupported(self.tok)
+        self._skip_statement()
+    
+    def _skip_statement(self):
+        """Skip to the end of the statement, including a trailing block"""
+        line = self.lines[self.pos]
+        self._advance()
+        while self.kind != _EOF:
+            tok = self.tok
+            if tok == ';':
+                self._advance()
+                return
+            if tok == '}':
+                return
+            if tok in _OPENERS and self.kind == _DELIMITER:
+                partner = self.match[self.pos]
+                if partner < 0:
+                    self._seek(self.last)
+                    return
+                self._seek(partner + 1)
+                if tok == '{' and self.tok != ',' and self.tok != '.':
+                    self._accept(';')
+                    return
+                continue
+            if self.auto_semicolons and self.lines[self.pos] > line:
+                return
+            self._advance()
+    
+    def _export(self):
+        self._advance()
+        if self.tok == 'default':
+            self._advance()
+    
+    def _variable_declaration(self):
+        """let/const/var in JavaScript, var/const in Go"""
+        self._advance()
+        if self.go and self.tok == '(':
+            # var ( a = 1; b = 2 )
+            close = self.match[self.pos]
+            if close < 0:
+                raise _ParseError("Expected ')'")
+            self._advance()
+            while self.pos < close:
+                self._go_var_spec()
+                self._accept(';')
+            self._seek(close + 1)
+            return
+        if self.go:
+            self._go_var_spec()
+        else:
+            self._declarators()
+        self._end_statement()
+    
+    def _declarators(self):
+        """name [: type] [= value], ... (JavaScript/TypeScript)"""
+        while True:
+            if self.tok in ('{', '['):
+                self._unsupported('destructuring')
+                self._skip_group()
+                if self._accept('='):
+                    self._assignment()
+            else:
+                name = self._name(self._word())
+                self._declare(name)
+                if self.tok == ':' and self.language == 'typescript':
+                    self._skip_type(('=', ',', ';'))
+                if self._accept('='):
+                    self._store(name, self._assignment())
+            if not self._accept(','):
+                return
+    
+    def _go_var_spec(self):
+        """a, b T = x, y"""
+        names = [self._name(self._word())]
+        while self._accept(','):
+            names.append(self._name(self._word()))
+        for name in names:
+            self._declare(name)
+        type_word = None
+        if self.tok != '=' and self.tok not in (';', ')') and self.lines[self.pos] == self.lines[self.pos - 1]:
+            type_word = self.tok
+            self._skip_type(('=', ';', ')'))
+        if self._accept('='):
+            values = [self._assignment()]
+            while self._accept(','):
+                values.append(self._assignment())
+            for name, value in zip(names, values):
+                if name != '_':
+                    self._store(name, value)
+        else:
+            zero = _go_zero_value(type_word)
+            if zero is not _NO_VALUE:
+                for name in names:
+                    self._emit(IROpCode.LOAD_CONST, [zero], name)
+    
+    def _skip_type(self, stops: Tuple[str, ...]):
+        """Skip a type annotation up to one of stops at bracket depth 0 (or a line break in Go)"""
+        line = self.lines[self.pos]
+        if self.tok == ':':
+            self._advance()
+        depth = 0
+        while self.kind != _EOF:
+            tok = self.tok
+            if depth == 0 and (tok in stops or tok == '}' or (self.go and self.lines[self.pos] > line)):
+                return
+            if tok in _OPENERS and self.kind == _DELIMITER and self.match[self.pos] > 0:
+                if self.go and tok == '{' and self._text(self.pos - 1) not in ('struct', 'interface'):
+                    return
+                self._skip_group()
+                continue
+            if tok == '<':
+                depth += 1
+            elif tok == '>' and depth:
+                depth -= 1
+            elif tok == '>>' and depth:
+                depth = max(depth - 2, 0)
+            self._advance()
+    
+    def _function_statement(self):
+        """function name(params) { body } in JavaScript"""
+        self._advance()
+        self._accept('*')
+        name = self._name(self._word())
+        self._function_literal(name)
+    
+    def _store(self, name: str, value: Any):
+        """name = value, retargeting a temporary computed just for it"""
+        last = self.instructions[-1] if self.instructions else None
+        if last is not None and last.result == value and is_temp(value):
+            last.result = name
+        else:
+            self._emit(IROpCode.STORE, [value], name)
+    
+    # Typed declarations (C, C++, Java)
+    
+    def _declaration_name(self, index: int, allow_call: bool = False) -> int:
+        """
+        Index of the declared name if a typed declaration starts at index, else -1
+        
+        The type is a run of type keywords, identifiers, '::', '*', '&',
+        '[]' and balanced template arguments with at least one word, and the
+        name must be an identifier followed by '=', ';', ',', '[', ':' (a
+        for-each), or '(' when allow_call (a function or constructor).
+        """
+        types = self.types
+        words = 0
+        while index < self.last:
+            kind = types[index]
+            text = self._text(index)
+            if kind == _IDENTIFIER:
+                following = self._text(index + 1)
+                if words and (following in ('=', ';', ',', '[', ':') or (
+                        following in ('(', '{') and (allow_call or self.language == 'cpp'))):
+                    return index
+                words += 1
+            elif kind == _KEYWORD and text in self.type_words:
+                words += 1
+            elif text in ('*', '&', '&&', '::') and words:
+                pass
+            elif text == '[' and words and self._text(index + 1) == ']':
+                index += 1
+            elif text == '<' and words:
+                index = self._template_end(index)
+                if index < 0:
+                    return -1
+            elif text == '...' or (text == '.' and words and self._text(index + 1) == '.'):
+                pass
+            else:
+                return -1
+            index += 1
+        return -1
+    
+    def _template_end(self, index: int) -> int:
+        """Index of the '>' closing template arguments opened at index, or -1"""
+        depth = 0
+        while index < self.last:
+            text = self._text(index)
+            if text == '<':
+                depth += 1
+            elif text == '>':
+                depth -= 1
+            elif text == '>>':
+                depth -= 2
+            elif text in (';', '{', '}', '(', ')', '=', '&&', '||'):
+                return -1
+            if depth <= 0:
+                return index
+            index += 1
+        return -1
+    
+    def _declaration(self):
+        """Typed declaration with one or more declarators (no trailing ';')"""
+        name_at = self._declaration_name(self.pos)
+        type_name = None
+        while self.pos < name_at:
+            if self.tok == '<':
+                self._seek(self._template_end(self.pos) + 1)
+                continue
+            if self.kind == _IDENTIFIER:
+                type_name = self.tok
+            elif self.kind == _KEYWORD and self.tok not in ('const', 'static', 'final', 'unsigned', 'signed'):
+                type_name = self.tok
+            self._advance()
+        while True:
+            while self.tok in ('*', '&', '&&'):
+                self._advance()
+            name = self._name(self._word())
+            self._declare(name)
+            size = None
+            while self.tok == '[':
+                self._advance()
+                if self.tok != ']':
+                    dimension = self._expression()
+                    size = dimension if size is None else size
+                self._expect(']')
+            if self._accept('='):
+                value = self._initializer() if self.tok == '{' else self._assignment()
+                self._store(name, value)
+            elif self.tok == '(' and self.language == 'cpp':
+                self._store(name, self._call(type_name or 'object'))
+            elif self.tok == '{' and self.language == 'cpp':
+                value = self._initializer()
+                self._store(name, value)
+            elif size is not None:
+                zeros = self._temp_op(IROpCode.BUILD_LIST, [0])
+                self._emit(IROpCode.MUL, [zeros, size], name)
+            elif self.tok == ':':
+                raise _ParseError("Unexpected ':'")
+            if not self._accept(','):
+                return
+    
+    def _initializer(self) -> str:
+        """{a, b, {c}} braced initializer as a list"""
+        close = self.match[self.pos]
+        self._expect('{')
+        elements = []
+        while self.tok != '}' and self.pos < close:
+            if self.tok == '.' or self.tok == '[':
+                raise _ParseError('Designated initializers are not supported')
+            elements.append(self._initializer() if self.tok == '{' else self._assignment())
+            if not self._accept(','):
+                break
+        self._expect('}')
+        return self._temp_op(IROpCode.BUILD_LIST, elements)
+    
+    def _external_declaration(self):
+        """One top-level item of a C, C++ or Java file, or of a class body"""
+        tok, kind = self.tok, self.kind
+        if tok == '#':
+            # Preprocessor directive: skip the rest of the line
+            line = self.lines[self.pos]
+            while self.kind != _EOF and self.lines[self.pos] == line:
+                self._advance()
+            return
+        if tok == '@' and kind == _OPERATOR:
+            # Java annotation
+            self._advance()
+            self._word()
+            while self._accept('.'):
+                self._word()
+            if self.tok == '(':
+                self._skip_group()
+            return
+        if tok == ';':
+            self._advance()
+            return
+        if kind == _KEYWORD:
+            if tok in ('package', 'import', 'using', 'typedef', 'friend'):
+                self._skip_statement()
+                return
+            if tok in ('public', 'private', 'protected') and self._peek() == ':':
+                self._advance()
+                self._advance()
+                return
+            if tok == 'template':
+                self._advance()
+                if self.tok == '<':
+                    end = self._template_end(self.pos)
+                    self._seek(end + 1 if end > 0 else self.pos + 1)
+                return
+            if tok == 'namespace' or (tok == 'extern' and self.types[self.pos + 1] == _STRING):
+                while self.tok != '{' and self.kind != _EOF and self.tok != ';':
+                    self._advance()
+                if self.tok == '{':
+                    close = self.match[self.pos]
+                    self._advance()
+                    self._top_level(close if close >= 0 else self.last)
+                    if close >= 0:
+                        self._seek(close + 1)
+                else:
+                    self._advance()
+                return
+        if self._class_definition():
+            return
+        if self._function_definition():
+            return
+        if self._declaration_name(self.pos) >= 0:
+            self._declaration()
+            self._end_statement()
+            return
+        self._statement()
+    
+    def _class_definition(self) -> bool:
+        """class/struct/interface/enum definitions; methods become functions"""
+        index = self.pos
+        while self.types[index] == _KEYWORD and self._text(index) in self.type_words | {'abstract', 'final'}:
+            index += 1
+        keyword = self._text(index)
+        if self.types[index] != _KEYWORD or keyword not in ('class', 'struct', 'interface', 'enum', 'union', 'record'):
+            return False
+        # Find the body, or a ';' for a forward declaration or a variable of the type
+        scan = index + 1
+        while scan < self.last and self._text(scan) not in ('{', ';', '(', '='):
+            scan += 1
+        if self._text(scan) != '{':
+            return False
+        close = self.match[scan]
+        if close < 0:
+            raise _ParseError("Expected '}'")
+        if keyword in ('class', 'struct') and self.typed_declarations:
+            self._seek(scan + 1)
+            self._class_body(close)
+        else:
+            self._unsupported(keyword)
+        self._seek(close + 1)
+        if self.tok != ';' and self.language != 'java' and self.kind in _WORDS:
+            # struct point { ... } p;
+            self._skip_statement()
+        else:
+            self._accept(';')
+        return True
+    
+    def _class_body(self, close: int):
+        """Members of a class: methods are lowered, static field initializers run at the top level"""
+        while self.pos < close and self.kind != _EOF:
+            start = self.pos
+            try:
+                tok = self.tok
+                if tok in ('public', 'private', 'protected') and self._peek() == ':':
+                    self._advance()
+                    self._advance()
+                elif self._class_definition() or self._function_definition():
+                    pass
+                elif tok == '@' or tok == '#' or (self.kind == _KEYWORD and tok in ('using', 'typedef', 'friend')):
+                    self._external_declaration()
+                elif tok == 'static' and self._declaration_name(self.pos) >= 0:
+                    self._declaration()
+                    self._end_statement()
+                else:
+                    self._skip_statement()
+            except _ParseError as error:
+                self._record_error(str(error))
+                self._synchronize(close)
+            if self.pos == start:
+                self._advance()
+    
+    def _function_definition(self) -> bool:
+        """type name(params) [qualifiers] { body }; prototypes are skipped"""
+        index = self.pos
+        paren = -1
+        while index < self.last:
+            text = self._text(index)
+            if self.types[index] == _DELIMITER and text == '(':
+                paren = index
+                break
+            if text in (';', '{', '=', '}') or self.types[index] in (_NUMBER, _STRING):
+                return False
+            if text == '<' and index > self.pos:
+                index = self._template_end(index)
+                if index < 0:
+                    return False
+            index += 1
+        if paren <= self.pos or self.types[paren - 1] not in _WORDS:
+            return False
+        name = self._text(paren - 1)
+        if self.types[paren - 1] == _KEYWORD and name not in ('main',):
+            return False
+        close = self.match[paren]
+        if close < 0:
+            return False
+        
+        # Qualifiers, throws clauses and constructor initializer lists
+        index = close + 1
+        while index < self.last:
+            text = self._text(index)
+            if text == '{' or text == ';' or text == '=':
+                break
+            if self.types[index] == _DELIMITER and text in ('(', '[') and self.match[index] > 0:
+                index = self.match[index]
+            elif text == ':' and self._text(index + 1) != ':':
+                # Constructor initializers: member(args) or member{args}, ...
+                index += 1
+                while index < self.last and self._text(index) != '{':
+                    if self._text(index) in ('(', '{') and self.match[index] > 0:
+                        index = self.match[index] + 1
+                        if self._text(index) == ',':
+                            index += 1
+                            continue
+                        break
+                    index += 1
+                break
+            index += 1
+        text = self._text(index)
+        if text == ';' or text == '=':
+            # Prototype, pure virtual or defaulted function
+            self._seek(index)
+            self._skip_statement() if text == '=' else self._advance()
+            return True
+        if text != '{' or self.match[index] < 0:
+            return False
+        
+        self._seek(paren)
+        params = self._c_params(close)
+        self._declare(self._name(name), SymbolKind.FUNCTION)
+        self._pending.append((self._name(name), params, index, False, self.symbol_table.scope))
+        self._seek(self.match[index] + 1)
+        return True
+    
+    def _c_params(self, close: int) -> List[Tuple[str, Optional[str], Any]]:
+        """(name, marker, default) of each C, C++ or Java parameter"""
+        params = []
+        index = self.pos + 1
+        group = []
+        while index <= close:
+            text = self._text(index)
+            if index == close or (text == ',' and self.types[index] == _DELIMITER):
+                params.append(group)
+                group = []
+            elif self.types[index] == _DELIMITER and text in ('(', '[') and self.match[index] > 0 and text == '(':
+                group.append((index, text))
+                index = self.match[index]
+            else:
+                group.append((index, text))
+            index += 1
+        result = []
+        for group in params:
+            if not group or (len(group) == 1 and group[0][1] == 'void'):
+                continue
+            marker = '*' if any(text in ('...', '.') for _, text in group) else None
+            default = _NO_VALUE
+            if any(text == '=' for _, text in group):
+                split = next(i for i, (_, text) in enumerate(group) if text == '=')
+                tail = group[split + 1:]
+                if len(tail) == 1:
+                    default = self._literal_at(tail[0][0])
+                group = group[:split]
+            names = [
+                text for position, (index, text) in enumerate(group)
+                if self.types[index] == _IDENTIFIER and (position == len(group) - 1 or group[position + 1][1] in ('[', '='))
+            ]
+            if not names:
+                names = [text for index, text in group if self.types[index] == _IDENTIFIER][-1:]
+            if not names:
+                continue
+            result.append((self._name(names[-1]), marker, default))
+        return result
+    
+    def _literal_at(self, index: int) -> Any:
+        """Constant value of a single-token literal (for parameter defaults), or _NO_VALUE"""
+        kind = self.types[index]
+        if kind == _NUMBER:
+            value = _number_value(self._text(index))
+            return _NO_VALUE if value is None else value
+        if kind == _STRING:
+            return _NO_VALUE if self._is_template(index) else repr(self._string_at(index))
+        return LITERAL_WORDS.get(self._text(index), _NO_VALUE)
+    
+    # Go top level
+    
+    def _go_top_level(self):
+        tok = self.tok
+        if tok in ('package', 'import'):
+            self._advance()
+            if self.tok == '(':
+                self._skip_group()
+            else:
+                self._skip_statement_line()
+            return
+        if tok == 'func' and self.kind == _KEYWORD:
+            self._advance()
+            if self.tok == '(':
+                # Method receiver
+                self._skip_group()
+            self._function_literal(self._name(self._word()))
+            return
+        if tok == 'type':
+            self._skip_unsupported()
+            return
+        self._statement()
+    
+    def _skip_statement_line(self):
+        line = self.lines[self.pos]
+        while self.kind != _EOF and self.lines[self.pos] == line and self.tok != ';':
+            self._advance()
+        self._accept(';')
+    
+    # Functions
+    
+    def _function_literal(self, name: Optional[str] = None) -> str:
+        """Parameters at '(' and a body, queued for lowering; returns the function's name"""
+        if name is None:
+            name = f'<lambda{self._lambda_counter}>'
+            self._lambda_counter += 1
+        if self.tok != '(' or self.match[self.pos] < 0:
+            raise _ParseError("Expected '('")
+        close = self.match[self.pos]
+        params = self._go_params(close) if self.go else self._js_params(close)
+        self._seek(close + 1)
+        # Return type annotations
+        if self.go:
+            while self.tok != '{' and self.kind != _EOF:
+                if self.tok in ('(', '[') and self.match[self.pos] > 0:
+                    self._skip_group()
+                else:
+                    self._advance()
+        elif self.tok == ':':
+            self._skip_type(('{', '=>'))
+        if self.tok != '{' or self.match[self.pos] < 0:
+            raise _ParseError("Expected '{'")
+        self._declare(name, SymbolKind.FUNCTION)
+        self._pending.append((name, params, self.pos, False, self.symbol_table.scope))
+        self._skip_group()
+        return name
+    
+    def _js_params(self, close: int) -> List[Tuple[str, Optional[str], Any]]:
+        params = []
+        self._advance()
+        while self.pos < close:
+            marker = None
+            if self._accept('...'):
+                marker = '*'
+            if self.kind not in _WORDS:
+                if self.tok not in ('{', '['):
+                    raise _ParseError('Expected a parameter name')
+                self._unsupported('destructured parameter')
+                self._skip_group()
+                self._skip_type((',', ')'))
+                self._accept(',')
+                continue
+            name = self._name(self._word())
+            if self.language == 'typescript':
+                self._accept('?')
+                if self.tok == ':':
+                    self._skip_type((',', '=', ')'))
+            default = _NO_VALUE
+            if self._accept('='):
+                start = self.pos
+                self._skip_type((',', ')'))
+                if self.pos == start + 1:
+                    default = self._literal_at(start)
+                if default is _NO_VALUE:
+                    self._unsupported('non-constant default')
+            params.append((name, marker, default))
+            if not self._accept(','):
+                break
+        return params
+    
+    def _go_params(self, close: int) -> List[Tuple[str, Optional[str], Any]]:
+        """Go parameters: names come first in each group unless no group has a type"""
+        groups = []
+        group = []
+        index = self.pos + 1
+        while index <= close:
+            text = self._text(index)
+            if index == close or text == ',':
+                if group:
+                    groups.append(group)
+                group = []
+            else:
+                group.append((index, text))
+                if text in ('(', '[', '{') and self.match[index] > 0:
+                    index = self.match[index]
+            index += 1
+        if not any(len(group) > 1 for group in groups):
+            return []
+        params = []
+        for group in groups:
+            index, text = group[0]
+            marker = '*' if len(group) > 1 and group[1][1] == '...' else None
+            params.append((self._name(text), marker, _NO_VALUE))
+        return params
+    
+    def _lower_function(self, name: str, params: List, body: int, expression_body: bool, parent: Scope):
+        """Lower one queued function into its own region, in a scope nested in parent"""
+        self._seek(body)
+        self._loops = []
+        self._named_loops = {}
+        self._begin_scope(name, parent)
+        self._emit(IROpCode.FUNC_BEGIN, [name])
+        for index, (param, marker, default) in enumerate(params):
+            operands = [index]
+            if marker:
+                operands.append(marker)
+            elif default is not _NO_VALUE:
+                operands.append(default)
+            self._emit(IROpCode.PARAM, operands, param)
+        try:
+            if expression_body:
+                self._emit(IROpCode.RETURN, [self._assignment()])
+            else:
+                self._block()
+        except _ParseError as error:
+            self._record_error(str(error))
+        if not self.instructions or self.instructions[-1].opcode != IROpCode.RETURN:
+            self._emit(IROpCode.RETURN, [])
+        self._emit(IROpCode.FUNC_END, [name])
+        self._end_scope()
+    
+    # Expressions
+    
+    def _expression(self) -> Any:
+        return self._assignment()
+    
+    def _assignment(self) -> Any:
+        """Assignments are right associative and yield the assigned value"""
+        left = self._conditional()
+        op = self.tok
+        if self.kind != _OPERATOR or (op not in ('=', ':=') and op not in ASSIGN_OPS):
+            return left
+        access = self._access if self._access is not None and self._access[0] == left else None
+        if access is None and (not isinstance(left, str) or is_temp(left) or left[:1] in ('"', "'")):
+            raise _ParseError('Invalid assignment target')
+        if op == ':=' and access is None:
+            self._declare(left)
+        self._advance()
+        if access is not None and op in ('=', ':='):
+            # The read of the target is replaced by a write
+            if self.instructions and self.instructions[-1].result == left:
+                self.instructions.pop()
+        value = self._assignment()
+        if op in ASSIGN_OPS:
+            if access is None:
+                self._emit(ASSIGN_OPS[op], [left, value], left)
+                return left
+            value = self._temp_op(ASSIGN_OPS[op], [left, value])
+        if access is None:
+            self._store(left, value)
+            return left
+        _, opcode, obj, key = access
+        self._emit(opcode, [obj, key, value])
+        return value
+    
+    def _conditional(self) -> Any:
+        condition = self._binary(1)
+        if self.tok != '?' or self.kind != _OPERATOR:
+            return condition
+        self._advance()
+        result = self.generate_temp()
+        else_label = self.generate_label()
+        end_label = self.generate_label()
+        self._emit(IROpCode.JUMP_IF_FALSE, [condition, else_label])
+        self._emit(IROpCode.STORE, [self._assignment()], result)
+        self._jump(end_label)
+        self._expect(':')
+        self._label(else_label)
+        self._emit(IROpCode.STORE, [self._assignment()], result)
+        self._label(end_label)
+        self._access = None
+        return result
+    
+    def _binary(self, min_precedence: int) -> Any:
+        """Precedence climbing over the binary operators"""
+        left = self._unary()
+        binary_ops = self.binary_ops
+        while True:
+            op = self.tok
+            if op == 'instanceof' and self.kind == _KEYWORD and min_precedence <= binary_ops['<'][0]:
+                self._advance()
+                left = self._temp_op(IROpCode.CALL, ['isinstance', left, self._name(self._word())])
+                continue
+            entry = binary_ops.get(op) if self.kind == _OPERATOR else None
+            if entry is None or entry[0] < min_precedence:
+                return left
+            precedence, opcode = entry
+            self._advance()
+            self._access = None
+            if op in ('&&', '||', '??'):
+                left = self._short_circuit(left, op, precedence)
+            elif op == '&^':
+                inverted = self._temp_op(IROpCode.BIT_XOR, [self._binary(precedence + 1), -1])
+                left = self._temp_op(IROpCode.BIT_AND, [left, inverted])
+            else:
+                # ** is right associative
+                right = self._binary(precedence if op == '**' else precedence + 1)
+                left = self._temp_op(opcode, [left, right])
+    
+    def _short_circuit(self, left: Any, op: str, precedence: int) -> str:
+        """&&, || and ?? evaluate their right operand only when needed"""
+        result = self.generate_temp()
+        end_label = self.generate_label()
+        self._emit(IROpCode.STORE, [left], result)
+        if op == '??':
+            is_null = self._temp_op(IROpCode.IS, [result, None])
+            self._emit(IROpCode.JUMP_IF_FALSE, [is_null, end_label])
+        else:
+            self._emit(IROpCode.JUMP_IF_FALSE if op == '&&' else IROpCode.JUMP_IF_TRUE, [result, end_label])
+        self._emit(IROpCode.STORE, [self._binary(precedence + 1)], result)
+        self._label(end_label)
+        if op != '??' and self.language in ('c', 'cpp'):
+            # C's logical operators give 1 or 0, not the deciding operand
+            return self._temp_op(IROpCode.NE, [result, 0])
+        return result
+    
+    def _unary(self) -> Any:
+        tok, kind = self.tok, self.kind
+        if kind == _OPERATOR:
+            if tok in ('-', '+', '!', '~') or (tok == '^' and self.go):
+                self._advance()
+                operand = self._unary()
+                self._access = None
+                if tok == '-':
+                    return self._temp_op(IROpCode.NEG, [operand])
+                if tok == '!':
+                    return self._temp_op(IROpCode.NOT, [operand])
+                if tok == '+':
+                    return self._temp_op(IROpCode.ADD, [0, operand])
+                return self._temp_op(IROpCode.BIT_XOR, [operand, -1])
+            if tok in ('++', '--'):
+                self._advance()
+                target = self._unary()
+                return self._increment(target, tok, prefix=True)
+            if tok == '&':
+                self._advance()
+                operand = self._unary()
+                if isinstance(operand, str) and not is_temp(operand):
+                    # Whatever receives the address may write through it, from any function
+                    self._address_taken.append(operand)
+                    symbol = self.symbol_table.lookup(operand)
+                    if symbol is not None:
+                        self.symbol_table.captured.add(symbol)
+                self._access = None
+                return operand
+            if tok == '*':
+                self._advance()
+                operand = self._unary()
+                self._access = None
+                return self._temp_op(IROpCode.NOP, ['deref', operand])
+            if tok == '<-':
+                self._advance()
+                self._unary()
+                return self._unsupported('channel receive', value=True)
+        if kind == _KEYWORD:
+            if tok == 'sizeof':
+                self._advance()
+                if self.tok == '(' and self.match[self.pos] > 0:
+                    self._skip_group()
+                else:
+                    self._unary()
+                return self._unsupported('sizeof', value=True)
+            if tok == 'typeof':
+                self._advance()
+                return self._temp_op(IROpCode.CALL, ['typeof', self._unary()])
+            if tok in ('delete', 'void', 'await') and not self.go:
+                self._advance()
+                self._unary()
+                if tok == 'void':
+                    return self._temp_op(IROpCode.LOAD_CONST, [None])
+                return self._unsupported(tok, value=True)
+        if tok == '(' and kind == _DELIMITER and self.typed_declarations:
+            cast = self._cast()
+            if cast is not None:
+                return cast
+        return self._postfix(self._primary())
+    
+    def _cast(self) -> Optional[Any]:
+        """(int) x style casts; only numeric ones change the value"""
+        close = self.match[self.pos]
+        if close < 0:
+            return None
+        inner = [self._text(index) for index in range(self.pos + 1, close)]
+        if not inner:
+            return None
+        after = self.types[close + 1]
+        if all(text in self.type_words or text in ('*', '&') for text in inner) and inner[0] in self.type_words:
+            pass
+        elif (len(inner) == 1 and self.types[self.pos + 1] == _IDENTIFIER and inner[0][:1].isupper()
+              and after in (_IDENTIFIER, _NUMBER, _STRING)):
+            pass
+        else:
+            return None
+        self._seek(close + 1)
+        value = self._unary()
+        self._access = None
+        if any(text in FLOAT_WORDS for text in inner):
+            return self._temp_op(IROpCode.CALL, ['float', value])
+        if any(text in CAST_WORDS for text in inner) and '*' not in inner:
+            if any(text in ('bool', 'boolean') for text in inner):
+                return self._temp_op(IROpCode.CALL, ['bool', value])
+            return self._temp_op(IROpCode.CALL, ['int', value])
+        return value
+    
+    def _increment(self, target: Any, op: str, prefix: bool) -> Any:
+        """++/-- on a name or member; postfix forms yield the old value"""
+        opcode = IROpCode.ADD if op == '++' else IROpCode.SUB
+        access = self._access if self._access is not None and self._access[0] == target else None
+        self._access = None
+        if access is None:
+            if not isinstance(target, str) or is_temp(target):
+                raise _ParseError(f"Invalid operand for '{op}'")
+            old = target if prefix else self._temp_op(IROpCode.STORE, [target])
+            self._emit(opcode, [target, 1], target)
+            return target if prefix else old
+        _, store, obj, key = access
+        updated = self._temp_op(opcode, [target, 1])
+        self._emit(store, [obj, key, updated])
+        return updated if prefix else target
+    
+    def _postfix(self, value: Any) -> Any:
+        while True:
+            tok, kind = self.tok, self.kind
+            if kind == _DELIMITER:
+                if tok == '(':
+                    value = self._call(value)
+                    continue
+                if tok == '[':
+                    value = self._index(value)
+                    continue
+                if tok == '.':
+                    self._advance()
+                    if self.go and self.tok == '(':
+                        # Type assertion x.(T)
+                        self._skip_group()
+                        continue
+                    value = self._member(value)
+                    continue
+                if tok == '{' and self.go and not self._no_composite and isinstance(value, str) and not is_temp(value):
+                    value = self._composite(named_fields=True)
+                    continue
+            elif kind == _OPERATOR:
+                if (tok == '->' and self.language in ('c', 'cpp')) or tok == '?.':
+                    self._advance()
+                    value = self._member(value)
+                    continue
+                if tok == '::':
+                    self._advance()
+                    member = self._word()
+                    value = f'{value}::{member}' if isinstance(value, str) and not is_temp(value) else value
+                    continue
+                if tok in ('++', '--') and self.lines[self.pos] == self.lines[self.pos - 1]:
+                    self._advance()
+                    value = self._increment(value, tok, prefix=False)
+                    continue
+                if tok == '<' and self.language in ('cpp', 'java') and isinstance(value, str) and not is_temp(value):
+                    # Explicit template arguments: f<int>(x)
+                    end = self._template_end(self.pos)
+                    if end > 0 and self._text(end + 1) in ('(', '::'):
+                        self._seek(end + 1)
+                        continue
+                if tok == '...' and self.go:
+                    return value
+            return value
+    
+    def _member(self, obj: Any) -> str:
+        name = self._word()
+        value = self._temp_op(IROpCode.GET_ATTR, [obj, repr(name)])
+        self._access = (value, IROpCode.SET_ATTR, obj, repr(name))
+        return value
+    
+    def _index(self, obj: Any) -> str:
+        self._advance()
+        if self.go and (self.tok == ':' or self._slice_ahead()):
+            low = None if self.tok == ':' else self._expression()
+            self._expect(':')
+            high = None if self.tok == ']' else self._expression()
+            self._expect(']')
+            key = self._temp_op(IROpCode.CALL, ['slice', low, high, None])
+            return self._temp_op(IROpCode.GET_ITEM, [obj, key])
+        key = self._expression()
+        self._expect(']')
+        value = self._temp_op(IROpCode.GET_ITEM, [obj, key])
+        self._access = (value, IROpCode.SET_ITEM, obj, key)
+        return value
+    
+    def _slice_ahead(self) -> bool:
+        """Whether the brackets opened before the current token hold a Go slice"""
+        close = self.match[self.pos - 1]
+        index = self.pos
+        while index < close:
+            text = self._text(index)
+            if text == ':':
+                return True
+            if text in _OPENERS and self.match[index] > 0:
+                index = self.match[index]
+            index += 1
+        return False
+    
+    def _call(self, callee: Any) -> str:
+        """CALL [callee, args...]; '*' marks a spread argument"""
+        self._advance()
+        operands = [callee]
+        marks = len(self._address_taken)
+        while self.tok != ')':
+            if self.tok == '...' and self.kind == _OPERATOR:
+                self._advance()
+                operands += ['*', self._assignment()]
+            else:
+                argument = self._assignment()
+                if self.go and self.tok == '...':
+                    self._advance()
+                    operands += ['*', argument]
+                else:
+                    operands.append(argument)
+            if not self._accept(','):
+                break
+        self._expect(')')
+        result = self._temp_op(IROpCode.CALL, operands)
+        # Variables passed by address may have been written
+        for name in self._address_taken[marks:]:
+            self._emit(IROpCode.NOP, ['address', name], name)
+        del self._address_taken[marks:]
+        self._access = None
+        return result
+    
+    def _print_call(self) -> bool:
+        """Whether a printing call such as console.log( starts here"""
+        for pattern in PRINT_CALLS:
+            if self.tok == pattern[0] and all(self._peek(offset) == text for offset, text in enumerate(pattern[1:], 1)):
+                return self._peek(len(pattern)) == '('
+        return False
+    
+    def _primary(self) -> Any:
+        self._access = None
+        tok, kind = self.tok, self.kind
+        if kind == _NUMBER:
+            return self._temp_op(IROpCode.LOAD_CONST, [self._number()])
+        if kind == _STRING:
+            if self._is_template(self.pos):
+                return self._template_literal()
+            value = self._string_at(self.pos)
+            self._advance()
+            while self.kind == _STRING:
+                # Adjacent literals concatenate
+                value += self._string_at(self.pos)
+                self._advance()
+            return self._temp_op(IROpCode.LOAD_CONST, [repr(value)])
+        if kind in _WORDS:
+            if tok in LITERAL_WORDS and (kind == _KEYWORD or tok in ('NULL', 'undefined')):
+                self._advance()
+                return self._temp_op(IROpCode.LOAD_CONST, [LITERAL_WORDS[tok]])
+            if kind == _KEYWORD:
+                if tok == 'new':
+                    self._advance()
+                    return self._new()
+                if tok == 'async' and self.js:
+                    self._advance()
+                    return self._primary()
+                if tok == 'function' and self.js:
+                    self._advance()
+                    self._accept('*')
+                    name = self._name(self._word()) if self.kind in _WORDS else None
+                    return self._function_literal(name)
+                if tok == 'func' and self.go:
+                    self._advance()
+                    return self._function_literal()
+                if tok in ('map', 'struct', 'chan', 'interface') and self.go:
+                    return self._go_typed_literal()
+                if tok.endswith('_cast') and self._peek() == '<':
+                    end = self._template_end(self.pos + 1)
+                    if end < 0:
+                        raise _ParseError("Expected '>'")
+                    self._seek(end + 1)
+                    self._expect('(')
+                    value = self._expression()
+                    self._expect(')')
+                    return value
+                if tok not in ('this', 'super', 'self', 'int', 'float', 'double', 'string', 'char', 'bool'):
+                    raise _ParseError(f"Unexpected '{tok}'")
+            if self.js and self._peek() == '=>':
+                return self._arrow()
+            if self._print_call():
+                return self._print()
+            self._advance()
+            return self._name(tok)
+        if kind == _DELIMITER:
+            if tok == '(':
+                close = self.match[self.pos]
+                if self.js and close > 0 and self._text(close + 1) == '=>':
+                    return self._arrow()
+                self._advance()
+                value = self._expression()
+                self._expect(')')
+                return value
+            if tok == '[':
+                if self.go:
+                    return self._go_typed_literal()
+                return self._array_literal()
+            if tok == '{':
+                if self.js:
+                    return self._object_literal()
+                return self._initializer()
+        if kind == _EOF:
+            raise _ParseError('Unexpected end of input')
+        raise _ParseError(f"Unexpected '{tok}'" if tok else 'Unexpected string')
+    
+    def _number(self) -> Any:
+        """Numeric literal; hex, exponent and suffix pieces split by the lexer are rejoined"""
+        text = self.tok
+        self._advance()
+        while self.starts[self.pos] == self.ends[self.pos - 1]:
+            if self.kind in (_IDENTIFIER, _KEYWORD, _NUMBER):
+                text += self.tok
+            elif self.tok in ('+', '-') and text[-1] in 'eE' and not text.lower().startswith('0x'):
+                text += self.tok
+            else:
+                break
+            self._advance()
+        value = _number_value(text)
+        if value is None:
+            raise _ParseError(f"Invalid number '{text}'")
+        return value
+    
+    def _string_at(self, index: int) -> str:
+        """Value of the string token at index, with escapes decoded unless raw"""
+        start = self.starts[index]
+        body = self.source[start:self.ends[index]]
+        opener = self.source[start - 1] if start else ''
+        if (opener == '`' and self.go) or opener == '(':
+            return body
+        return _unescape(body)
+    
+    def _is_template(self, index: int) -> bool:
+        """Whether the string token at index is a JavaScript template literal with ${...} in it"""
+        start = self.starts[index]
+        return self.js and start > 0 and self.source[start - 1] == '`' and '${' in self.source[start:self.ends[index]]
+    
+    def _template_literal(self) -> Any:
+        """
+        A template literal concatenates its text with String() of each
+        ${...} expression, as f-strings do in the Python frontend; one
+        whose expressions do not lower on their own (a function defined
+        in one, or a syntax error) is an unsupported NOP value
+        """
+        index = self.pos
+        body = self.source[self.starts[index]:self.ends[index]]
+        line = self.lines[index]
+        self._advance()
+        parts = _template_parts(body)
+        mark = len(self.instructions)
+        pending = len(self._pending)
+        values = []
+        try:
+            if parts is None:
+                raise _ParseError('Unclosed ${ in template literal')
+            for offset, text, embedded in parts:
+                if embedded:
+                    value = self._embedded_expression(text, line + body.count('\n', 0, offset))
+                    values.append(self._temp_op(IROpCode.CALL, ['String', value]))
+                elif text:
+                    text = _unescape(text.replace('\\$', '$').replace('\\`', '`'))
+                    values.append(self._temp_op(IROpCode.LOAD_CONST, [repr(text)]))
+            if len(self._pending) != pending:
+                raise _ParseError('Function in template literal')
+        except _ParseError:
+            del self.instructions[mark:]
+            del self._pending[pending:]
+            return self._unsupported('template literal', value=True)
+        result = values[0]
+        for value in values[1:]:
+            result = self._temp_op(IROpCode.ADD, [result, value])
+        return result
+    
+    def _embedded_expression(self, text: str, line: int) -> Any:
+        """Lower the source of one ${...} expression starting on line, then resume where parsing was"""
+        buffer, errors = Lexer(text, self.language).tokenize_buffer()
+        saved = (self.source, self.types, self.starts, self.ends, self.lines, self.columns, self.last, self.match, self.pos)
+        self.source, self.types, self.starts, self.ends = buffer.source, buffer.types, buffer.starts, buffer.ends
+        self.lines = [line + number - 1 for number in buffer.lines]
+        self.columns = buffer.columns
+        self.last = len(self.types) - 1
+        self.match = self._match_brackets()
+        try:
+            self._seek(0)
+            value = self._assignment()
+            if errors or self.kind != _EOF:
+                raise _ParseError('Invalid expression in template literal')
+            return value
+        finally:
+            self.source, self.types, self.starts, self.ends, self.lines, self.columns, self.last, self.match, pos = saved
+            self._seek(pos)
+    
+    def _print(self) -> Any:
+        """console.log(...) and friends become PRINT"""
+        while self.tok != '(':
+            self._advance()
+        self._advance()
+        operands = []
+        while self.tok != ')':
+            operands.append(self._assignment())
+            if not self._accept(','):
+                break
+        self._expect(')')
+        self._emit(IROpCode.PRINT, operands)
+        return None
+    
+    def _arrow(self) -> str:
+        """(a, b) => body and x => body"""
+        name = f'<lambda{self._lambda_counter}>'
+        self._lambda_counter += 1
+        if self.tok == '(':
+            close = self.match[self.pos]
+            params = self._js_params(close)
+            self._seek(close + 1)
+        else:
+            params = [(self._name(self.tok), None, _NO_VALUE)]
+            self._advance()
+        self._expect('=>')
+        self._declare(name, SymbolKind.FUNCTION)
+        if self.tok == '{':
+            self._pending.append((name, params, self.pos, False, self.symbol_table.scope))
+            self._skip_group()
+        else:
+            # Expression body: skip it now and lower it with the function
+            self._pending.append((name, params, self.pos, True, self.symbol_table.scope))
+            line_end = self.lines[self.pos]
+            while self.kind != _EOF and self.tok not in (',', ';', ')', ']', '}'):
+                if (self.lines[self.pos] > line_end and self.kind != _OPERATOR
+                        and self.types[self.pos - 1] != _OPERATOR):
+                    break
+                line_end = self.lines[self.pos]
+                if self.tok in _OPENERS and self.kind == _DELIMITER and self.match[self.pos] > 0:
+                    self._skip_group()
+                else:
+                    self._advance()
+        return name
+    
+    def _new(self) -> Any:
+        """new T(args), new T[n] and new T[] {...}"""
+        name = self._word()
+        while self.tok in ('.', '::'):
+            self._advance()
+            name = self._word()
+        if self.tok == '<':
+            end = self._template_end(self.pos)
+            if end < 0:
+                raise _ParseError("Expected '>'")
+            self._seek(end + 1)
+        if self.tok == '[':
+            self._advance()
+            if self.tok == ']':
+                self._advance()
+                while self.tok == '[':
+                    self._advance()
+                    self._expect(']')
+                return self._initializer() if self.tok == '{' else self._unsupported('new array', value=True)
+            size = self._expression()
+            self._expect(']')
+            while self.tok == '[':
+                self._skip_group()
+            zeros = self._temp_op(IROpCode.BUILD_LIST, [0 if name not in ('String', 'Object') else None])
+            return self._temp_op(IROpCode.MUL, [zeros, size])
+        if self.tok != '(':
+            return self._temp_op(IROpCode.CALL, [self._name(name)])
+        value = self._call(self._name(name))
+        if self.tok == '{' and self.match[self.pos] > 0:
+            # Anonymous class body
+            self._unsupported('anonymous class')
+            self._skip_group()
+        return value
+    
+    def _array_literal(self) -> str:
+        self._advance()
+        elements = []
+        while self.tok != ']':
+            if self.tok == '...':
+                self._advance()
+                self._assignment()
+                return self._finish_unsupported_list('spread element')
+            elements.append(self._assignment())
+            if not self._accept(','):
+                break
+        self._expect(']')
+        return self._temp_op(IROpCode.BUILD_LIST, elements)
+    
+    def _finish_unsupported_list(self, construct: str) -> str:
+        while self.tok != ']' and self.kind != _EOF:
+            self._advance()
+        self._accept(']')
+        return self._unsupported(construct, value=True)
+    
+    def _object_literal(self) -> str:
+        """{key: value, name, [computed]: value} in JavaScript"""
+        close = self.match[self.pos]
+        self._advance()
+        operands = []
+        while self.tok != '}' and self.pos < close:
+            if self.tok == '...':
+                self._seek(close)
+                self._advance()
+                return self._unsupported('object spread', value=True)
+            if self.kind == _STRING:
+                key = repr(self._string_at(self.pos))
+                self._advance()
+            elif self.kind == _NUMBER:
+                key = self._number()
+            elif self.tok == '[':
+                self._advance()
+                key = self._expression()
+                self._expect(']')
+            else:
+                word = self._word()
+                key = repr(word)
+                if self.tok in (',', '}'):
+                    operands += [key, self._name(word)]
+                    self._accept(',')
+                    continue
+                if self.tok == '(':
+                    self._unsupported('object method')
+                    self._skip_group()
+                    if self.tok == '{':
+                        self._skip_group()
+                    self._accept(',')
+                    continue
+            self._expect(':')
+            operands += [key, self._assignment()]
+            if not self._accept(','):
+                break
+        self._expect('}')
+        return self._temp_op(IROpCode.BUILD_DICT, operands)
+    
+    def _go_typed_literal(self) -> Any:
+        """[]T{...}, [N]T{...}, map[K]V{...} and struct{...}{...} composite literals"""
+        is_map = self.tok == 'map'
+        start = self.pos
+        line = self.lines[self.pos]
+        while self.tok != '{' and self.kind in (_WORDS + (_DELIMITER, _OPERATOR)) and self.lines[self.pos] == line:
+            if self.tok in ('(', '[') and self.match[self.pos] > 0:
+                self._skip_group()
+            elif self.tok in ('struct', 'interface'):
+                self._advance()
+                if self.tok == '{':
+                    self._skip_group()
+            elif self.tok in (',', ')', ';', '}', '='):
+                break
+            else:
+                self._advance()
+        if self.tok != '{' or self._no_composite:
+            # A type operand such as make([]int, n): its source text as a string
+            type_text = self.source[self.starts[start]:self.ends[self.pos - 1]]
+            return self._temp_op(IROpCode.LOAD_CONST, [repr(type_text)])
+        return self._composite(named_fields=False, is_map=is_map)
+    
+    def _composite(self, named_fields: bool, is_map: bool = False) -> str:
+        """Go composite literal body; keyed ones become dicts"""
+        close = self.match[self.pos]
+        self._advance()
+        keys = []
+        values = []
+        saved = self._no_composite
+        self._no_composite = False
+        try:
+            while self.tok != '}' and self.pos < close:
+                if self.tok == '{':
+                    value = self._composite(named_fields=False)
+                else:
+                    value = self._assignment()
+                if self._accept(':'):
+                    if named_fields and isinstance(value, str) and not is_temp(value):
+                        value = repr(value)
+                    keys.append(value)
+                    value = self._composite(named_fields=False) if self.tok == '{' else self._assignment()
+                values.append(value)
+                if not self._accept(','):
+                    break
+        finally:
+            self._no_composite = saved
+        self._expect('}')
+        if keys or is_map:
+            operands = []
+            for key, value in zip(keys, values):
+                operands += [key, value]
+            return self._temp_op(IROpCode.BUILD_DICT, operands)
+        return self._temp_op(IROpCode.BUILD_LIST, values)
+
+# Marks a parameter without a (constant) default
+_NO_VALUE = object()
+
+def _unescape(body: str) -> str:
+    """A string literal's text with its backslash escapes decoded"""
+    if '\\' not in body:
+        return body
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            return body.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+        except UnicodeDecodeError:
+            return body
+
+def _template_parts(body: str) -> Optional[List[Tuple[int, str, bool]]]:
+    """
+    A template literal's body split into (offset, text, is an expression)
+    pieces: the text around each ${...} and the expression inside it;
+    None when a ${ is never closed
+    """
+    parts = []
+    start = index = 0
+    while index < len(body):
+        char = body[index]
+        if char == '\\':
+            index += 2
+            continue
+        if not body.startswith('${', index):
+            index += 1
+            continue
+        parts.append((start, body[start:index], False))
+        depth = 0
+        index += 2
+        expression = index
+        while index < len(body) and (depth or body[index] != '}'):
+            char = body[index]
+            if char in '\'"`':
+                # Skip a string inside the expression
+                index += 1
+                while index < len(body) and body[index] != char:
+                    index += 2 if body[index] == '\\' else 1
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            index += 1
+        if index >= len(body):
+            return None
+        parts.append((expression, body[expression:index], True))
+        start = index = index + 1
+    parts.append((start, body[start:], False))
+    return parts
+
+def _number_value(text: str) -> Any:
+    """Python value of a C-family numeric literal with its suffixes dropped, or None"""
+    lower = text.lower().replace("'", '')
+    try:
+        if lower.startswith(('0x', '0b', '0o')):
+            return int(lower.rstrip('uln'), 0)
+        body = lower.rstrip('ulfdn')
+        if '.' in body or 'e' in body:
+            return float(body)
+        if len(body) > 1 and body.startswith('0') and body.isdigit():
+            return int(body, 8)
+        return int(body)
+    except ValueError:
+        return None
+
+def _go_zero_value(type_word: Optional[str]) -> Any:
+    """Zero value of a basic Go type (_NO_VALUE for anything else)"""
+    if type_word is None:
+        return _NO_VALUE
+    if type_word.startswith(('int', 'uint', 'byte', 'rune')):
+        return 0
+    if type_word.startswith(('float', 'complex')):
+        return 0.0
+    if type_word == 'string':
+        return "''"
+    if type_word == 'bool':
+        return False
+    return _NO_VALUE
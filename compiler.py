@@ -3,11 +3,14 @@ Main Compiler Engine
 Integrates all components: Lexer, Parser, IR Generator, AI/ML Error Handler
 """
 
-from lexer import Lexer, Token
+from lexer import Lexer
+from token_cache import TokenCache, token_cache as shared_token_cache
 from ai_error_handler import AIErrorHandler
 from nlp_corrector import NLPErrorCorrector
-from intermediate_representation import IRGenerator, IROptimizer
-from typing import Dict, List
+from intermediate_representation import IRBuffer, IRGenerator, IROptimizer
+from python_frontend import PythonFrontend
+from cfamily_frontend import CFamilyFrontend
+from typing import Dict, List, Optional
 import json
 
 class AIMLCompiler:
@@ -16,13 +19,15 @@ class AIMLCompiler:
     Combines traditional compiler phases with AI/ML enhancements
     """
     
-    def __init__(self, language: str = 'python'):
+    def __init__(self, language: str = 'python', token_cache: Optional[TokenCache] = None, optimization_level: int = 2):
         self.language = language
         self.lexer = None
+        self.token_cache = token_cache or shared_token_cache
         self.error_handler = AIErrorHandler(language)
         self.nlp_corrector = NLPErrorCorrector()
         self.ir_generator = IRGenerator()
-        self.ir_optimizer = IROptimizer()
+        self.python_frontend = PythonFrontend()
+        self.ir_optimizer = IROptimizer(language, optimization_level)
         self.compilation_stats = {}
     
     def compile(self, source_code: str, auto_detect_language: bool = True) -> Dict:
@@ -70,10 +75,10 @@ class AIMLCompiler:
                 result['auto_fixes'] = correction_result['fixes_applied']
                 source_code = correction_result['corrected_code']  # Use corrected code
             
-            # Phase 3: Lexical Analysis
+            # Phase 3: Lexical Analysis (reused when this exact source was lexed before)
             self.lexer = Lexer(source_code, self.language)
-            tokens, lexer_errors = self.lexer.tokenize()
-            result['tokens'] = [self._token_to_dict(t) for t in tokens]
+            tokens, lexer_errors = self.token_cache.tokenize(self.lexer)
+            result['tokens'] = tokens.to_dicts()
             
             # Phase 4: AI-Enhanced Error Analysis
             error_analysis = self.error_handler.analyze_errors(
@@ -90,18 +95,21 @@ class AIMLCompiler:
                 result['ai_suggested_code'] = error_analysis['fixed_code']
             
             # Phase 5: Intermediate Representation Generation
-            ir_instructions = self.ir_generator.generate_from_tokens(tokens)
-            result['ir_code'] = self.ir_generator.get_ir_code()
+            ir_generator = self._lower(source_code, tokens)
+            ir_instructions = ir_generator.instructions
+            result['ir_code'] = ir_generator.get_ir_code()
             
-            # Phase 6: ML-Based Optimization
-            optimized_ir = self.ir_optimizer.optimize_ir(ir_instructions)
-            self.ir_generator.instructions = optimized_ir
-            result['optimized_ir'] = self.ir_generator.get_ir_code()
+            # Phase 6: ML-Based Optimization (in place on a compact copy, temporaries reused last)
+            self.ir_optimizer.language = self.language
+            optimized_ir = self.ir_optimizer.optimize_ir(IRBuffer(ir_instructions, ir_generator.symbol_table))
+            ir_generator.instructions = optimized_ir
+            result['optimized_ir'] = ir_generator.get_ir_code()
             result['optimization_report'] = self.ir_optimizer.get_optimization_report()
             
-            # Phase 7: Generate execution code (simplified)
+            # Phase 7: Generate execution code (simplified) from the allocated IR
             if not result['errors'] or all(e.get('severity') != 'error' for e in result['errors']):
                 result['success'] = True
+                optimized_ir.compact()
                 result['executable_code'] = self._generate_executable(optimized_ir)
             
             # Compilation Statistics
@@ -123,14 +131,28 @@ class AIMLCompiler:
         
         return result
     
-    def _token_to_dict(self, token: Token) -> Dict:
-        """Convert Token object to dictionary"""
-        return {
-            'type': token.type.name,
-            'value': token.value,
-            'line': token.line,
-            'column': token.column
-        }
+    def _lower(self, source_code: str, tokens) -> IRGenerator:
+        """
+        Generate IR with the best frontend for the language
+        
+        Python is lowered from its ast and the C family by the recursive-
+        descent frontend over the lexed tokens; Python source that does not
+        parse (the error handler reports why) and other languages fall back
+        to token pattern matching. Returns the generator holding the
+        instructions.
+        """
+        if self.language == 'python':
+            try:
+                self.python_frontend.generate_from_source(source_code)
+                return self.python_frontend
+            except (SyntaxError, ValueError):
+                pass
+        elif self.language in CFamilyFrontend.LANGUAGES:
+            frontend = CFamilyFrontend(self.language)
+            frontend.generate_from_buffer(tokens)
+            return frontend
+        self.ir_generator.generate_from_tokens(tokens)
+        return self.ir_generator
     
     def _generate_executable(self, ir_instructions: List) -> str:
         """
@@ -145,13 +167,13 @@ class AIMLCompiler:
         
         for instr in ir_instructions:
             if instr.opcode.name == 'PRINT':
-                lines.append(f"print({instr.operands[0]})")
+                lines.append(f"print({', '.join(str(operand) for operand in instr.operands)})")
             elif instr.opcode.name == 'STORE':
                 lines.append(f"{instr.result} = {instr.operands[0]}")
             elif instr.opcode.name == 'FUNC_BEGIN':
                 lines.append(f"def {instr.operands[0]}():")
             elif instr.opcode.name == 'RETURN':
-                lines.append(f"    return {instr.operands[0]}")
+                lines.append(f"    return {instr.operands[0]}" if instr.operands else "    return")
         
         return '\n'.join(lines)
     
@@ -200,7 +222,25 @@ class AIMLCompiler:
         # Optimization
         if 'optimization_report' in result:
             opt_report = result['optimization_report']
-            explanation.append(f"\n🚀 Optimizations: {opt_report.get('optimizations_applied', 0)} applied")
+            explanation.append(f"\n🚀 Optimizations ({opt_report.get('optimization_level', 'O2')}): "
+                             f"{opt_report.get('optimizations_applied', 0)} applied")
+            explanation.append(f"   IR instructions: {opt_report.get('instructions_before', 0)} → "
+                             f"{opt_report.get('instructions_after', 0)} in {opt_report.get('time_ms', 0):.1f} ms")
+            temporaries = opt_report.get('temporaries')
+            if temporaries:
+                peaks = opt_report.get('peak_live_temporaries', {})
+                explanation.append(f"   Temporaries: {temporaries['before']} → {temporaries['after']} "
+                                 f"(at most {max(peaks.values(), default=0)} live in one function)")
+            loop_transformations = opt_report.get('loop_transformations')
+            if loop_transformations:
+                hoisted = sum(1 for record in loop_transformations if record['transformation'] == 'hoisted')
+                explanation.append(f"   Loops: {hoisted} invariant instructions hoisted, "
+                                 f"{len(loop_transformations) - hoisted} induction products strength-reduced")
+            inlined_calls = opt_report.get('inlined_calls', [])
+            removed_functions = opt_report.get('removed_functions', [])
+            if inlined_calls or removed_functions:
+                explanation.append(f"   Functions: {len(inlined_calls)} calls inlined, "
+                                 f"{len(removed_functions)} unreachable functions removed")
             explanation.append(f"   Estimated improvement: {opt_report.get('estimated_improvement', 'N/A')}")
         
         # Success
@@ -216,7 +256,7 @@ class AIMLCompiler:
         return self.error_handler.get_learning_insights()
 
 # Convenience function
-def compile_code(source_code: str, language: str = 'python') -> Dict:
+def compile_code(source_code: str, language: str = 'python', optimization_level: int = 2) -> Dict:
     """
     Quick compilation function
     
@@ -224,7 +264,7 @@ def compile_code(source_code: str, language: str = 'python') -> Dict:
         result = compile_code("print('Hello')", "python")
         print(result['success'])
     """
-    compiler = AIMLCompiler(language)
+    compiler = AIMLCompiler(language, optimization_level=optimization_level)
     return compiler.compile(source_code)
 
 # Example usage
@@ -0,0 +1,607 @@
+"""
+IR Analysis
+Basic blocks, control-flow graphs, dominator trees, loop nesting and call graphs over IR
+"""
+
+from array import array
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from intermediate_representation import IRBuffer, IROpCode, SHARED_KINDS, VARIABLE_KINDS
+
+_LABEL = IROpCode.LABEL.value
+_JUMP = IROpCode.JUMP.value
+_FUNC_BEGIN = IROpCode.FUNC_BEGIN.value
+_FUNC_END = IROpCode.FUNC_END.value
+# Conditional branches carry their target label as the last operand
+_BRANCHES = frozenset((IROpCode.JUMP_IF_FALSE.value, IROpCode.JUMP_IF_TRUE.value, IROpCode.FOR_ITER.value))
+_EXITS = frozenset((IROpCode.RETURN.value, IROpCode.HALT.value, _FUNC_END))
+_TERMINATORS = _BRANCHES | _EXITS | {_JUMP}
+# Operands that name labels or functions rather than read a variable
+_NO_READS = frozenset((_LABEL, _JUMP, _FUNC_BEGIN, _FUNC_END))
+
+# Opcodes that must run even when their result is unused: I/O, calls,
+# stores into objects, control flow and function structure
+EFFECT_OPCODES = frozenset(opcode.value for opcode in (
+    IROpCode.PRINT, IROpCode.INPUT, IROpCode.CALL, IROpCode.SET_ATTR, IROpCode.SET_ITEM,
+    IROpCode.RETURN, IROpCode.JUMP, IROpCode.JUMP_IF_FALSE, IROpCode.JUMP_IF_TRUE,
+    IROpCode.LABEL, IROpCode.FOR_ITER, IROpCode.FUNC_BEGIN, IROpCode.FUNC_END,
+    IROpCode.PARAM, IROpCode.HALT,
+))
+
+class BasicBlock:
+    """Instructions [start, end) entered only at start and left only at end"""
+    __slots__ = ('index', 'start', 'end', 'successors', 'predecessors')
+    
+    def __init__(self, index: int, start: int, end: int):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.successors: List[int] = []
+        self.predecessors: List[int] = []
+    
+    def __len__(self):
+        return self.end - self.start
+    
+    def __repr__(self):
+        return f"BasicBlock({self.index}, [{self.start}, {self.end}), succ={self.successors})"
+
+class ControlFlowGraph:
+    """
+    Basic blocks of an instruction sequence and the edges between them
+    
+    Block 0 is the entry. Blocks unreachable from it are kept, so every
+    instruction belongs to a block, but only reachable ones appear in
+    order (reverse postorder). A jump to a missing label has no edge.
+    """
+    
+    def __init__(self, instructions):
+        buffer = instructions if isinstance(instructions, IRBuffer) else IRBuffer(instructions)
+        self.buffer = buffer
+        self.blocks: List[BasicBlock] = []
+        # Block index of every instruction
+        self.block_of = array('I')
+        self.labels: Dict[int, int] = {}
+        self._build()
+        self.order = self._reverse_postorder()
+        # Position of each block in order (-1 when unreachable)
+        self.order_index = array('i', [-1]) * len(self.blocks)
+        for position, block in enumerate(self.order):
+            self.order_index[block] = position
+    
+    def _build(self):
+        buffer = self.buffer
+        opcodes, offsets, counts, pool = buffer.opcodes, buffer.offsets, buffer.counts, buffer.pool
+        count = len(buffer)
+        if not count:
+            return
+        leaders = bytearray(count + 1)
+        leaders[0] = 1
+        labels = self.labels
+        for index in range(count):
+            opcode = opcodes[index]
+            if opcode == _LABEL:
+                leaders[index] = 1
+                labels[pool[offsets[index]]] = index
+            elif opcode in _TERMINATORS:
+                leaders[index + 1] = 1
+        
+        blocks = self.blocks
+        block_of = self.block_of
+        start = 0
+        for index in range(1, count + 1):
+            if leaders[index] or index == count:
+                block = BasicBlock(len(blocks), start, index)
+                blocks.append(block)
+                block_of.extend(array('I', [block.index]) * (index - start))
+                start = index
+        
+        for block in blocks:
+            last = block.end - 1
+            opcode = opcodes[last]
+            successors = block.successors
+            if opcode == _JUMP or opcode in _BRANCHES:
+                if counts[last]:
+                    target = labels.get(pool[offsets[last] + counts[last] - 1])
+                    if target is not None:
+                        successors.append(block_of[target])
+                if opcode == _JUMP:
+                    continue
+            elif opcode in _EXITS:
+                continue
+            following = block.index + 1
+            if following < len(blocks) and following not in successors:
+                successors.append(following)
+        for block in blocks:
+            for successor in block.successors:
+                blocks[successor].predecessors.append(block.index)
+    
+    def _reverse_postorder(self) -> List[int]:
+        """Reachable blocks, each before its successors except along back edges"""
+        if not self.blocks:
+            return []
+        blocks = self.blocks
+        visited = bytearray(len(blocks))
+        postorder = []
+        visited[0] = 1
+        stack = [(0, iter(blocks[0].successors))]
+        while stack:
+            block, successors = stack[-1]
+            for successor in successors:
+                if not visited[successor]:
+                    visited[successor] = 1
+                    stack.append((successor, iter(blocks[successor].successors)))
+                    break
+            else:
+                stack.pop()
+                postorder.append(block)
+        postorder.reverse()
+        return postorder
+    
+    def reachable(self, block: int) -> bool:
+        return self.order_index[block] >= 0
+    
+    def edges(self) -> Iterable:
+        """All (source, target) block edges"""
+        for block in self.blocks:
+            for successor in block.successors:
+                yield block.index, successor
+    
+    def __len__(self):
+        return len(self.blocks)
+    
+    def __iter__(self):
+        return iter(self.blocks)
+
+class DominatorTree:
+    """
+    Immediate dominators by the Cooper-Harvey-Kennedy iterative algorithm
+    
+    Converges in a few reverse-postorder sweeps on reducible graphs. A pre-
+    and postorder numbering of the tree answers dominates() in O(1).
+    Unreachable blocks have no dominator (idom -1).
+    """
+    
+    def __init__(self, cfg: ControlFlowGraph):
+        self.cfg = cfg
+        count = len(cfg.blocks)
+        self.idom = array('i', [-1]) * count
+        self.children: List[List[int]] = [[] for _ in range(count)]
+        self.preorder: List[int] = []
+        self._enter = array('i', [-1]) * count
+        self._exit = array('i', [-1]) * count
+        if count:
+            self._solve()
+            self._number()
+    
+    def _solve(self):
+        cfg = self.cfg
+        blocks = cfg.blocks
+        idom = self.idom
+        position = cfg.order_index
+        idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for block in cfg.order[1:]:
+                new_idom = -1
+                for predecessor in blocks[block].predecessors:
+                    if idom[predecessor] < 0:
+                        continue
+                    if new_idom < 0:
+                        new_idom = predecessor
+                        continue
+                    # Walk both fingers up to their common dominator
+                    finger = predecessor
+                    while finger != new_idom:
+                        while position[finger] > position[new_idom]:
+                            finger = idom[finger]
+                        while position[new_idom] > position[finger]:
+                            new_idom = idom[new_idom]
+                if idom[block] != new_idom:
+                    idom[block] = new_idom
+                    changed = True
+        for block in cfg.order[1:]:
+            self.children[idom[block]].append(block)
+    
+    def _number(self):
+        """Pre/post DFS numbers of the tree and the preorder walk"""
+        counter = 0
+        stack = [(0, iter(self.children[0]))]
+        self._enter[0] = counter
+        self.preorder.append(0)
+        while stack:
+            block, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                counter += 1
+                self._exit[block] = counter
+                continue
+            counter += 1
+            self._enter[child] = counter
+            self.preorder.append(child)
+            stack.append((child, iter(self.children[child])))
+    
+    def dominates(self, a: int, b: int) -> bool:
+        """Whether block a dominates block b (every block dominates itself)"""
+        enter = self._enter
+        if enter[a] < 0 or enter[b] < 0:
+            return False
+        return enter[a] <= enter[b] and self._exit[b] <= self._exit[a]
+    
+    def strictly_dominates(self, a: int, b: int) -> bool:
+        return a != b and self.dominates(a, b)
+
+class Loop:
+    """A natural loop: its header, latches (back-edge sources), blocks and nesting"""
+    __slots__ = ('header', 'latches', 'blocks', 'parent', 'children', 'depth')
+    
+    def __init__(self, header: int, latches: List[int], blocks: List[int]):
+        self.header = header
+        self.latches = latches
+        self.blocks = blocks
+        self.parent: Optional['Loop'] = None
+        self.children: List['Loop'] = []
+        self.depth = 1
+    
+    def __contains__(self, block: int) -> bool:
+        return block in self.blocks
+    
+    def __repr__(self):
+        return f"Loop(header={self.header}, blocks={len(self.blocks)}, depth={self.depth})"
+
+class LoopNest:
+    """
+    Natural loops found from back edges (edges to a dominating block)
+    
+    Back edges sharing a header form one loop. Loops are either disjoint
+    or nested; loop_of maps each block to its innermost loop. Cycles with
+    no dominating header (irreducible flow) are not reported as loops.
+    """
+    
+    def __init__(self, cfg: ControlFlowGraph, dominators: DominatorTree):
+        self.cfg = cfg
+        self.loops: List[Loop] = []
+        # Innermost loop (index into loops) of each block, -1 outside loops
+        self.loop_of = array('i', [-1]) * len(cfg.blocks)
+        latches: Dict[int, List[int]] = {}
+        for block in cfg.order:
+            for successor in cfg.blocks[block].successors:
+                if dominators.dominates(successor, block):
+                    latches.setdefault(successor, []).append(block)
+        
+        found = []
+        for header, sources in latches.items():
+            body = {header}
+            worklist = [latch for latch in sources if latch != header]
+            body.update(worklist)
+            while worklist:
+                block = worklist.pop()
+                for predecessor in cfg.blocks[block].predecessors:
+                    if predecessor not in body and cfg.reachable(predecessor):
+                        body.add(predecessor)
+                        worklist.append(predecessor)
+            found.append(Loop(header, sources, sorted(body)))
+        
+        # Outer loops first, so each inner loop finds its parent already placed
+        found.sort(key=lambda loop: (-len(loop.blocks), cfg.order_index[loop.header]))
+        loop_of = self.loop_of
+        for index, loop in enumerate(found):
+            enclosing = loop_of[loop.header]
+            if enclosing >= 0:
+                loop.parent = found[enclosing]
+                loop.parent.children.append(loop)
+                loop.depth = loop.parent.depth + 1
+            for block in loop.blocks:
+                loop_of[block] = index
+        self.loops = found
+    
+    def innermost(self, block: int) -> Optional[Loop]:
+        index = self.loop_of[block]
+        return self.loops[index] if index >= 0 else None
+    
+    def depth(self, block: int) -> int:
+        """Loop nesting depth of a block (0 outside loops)"""
+        loop = self.innermost(block)
+        return loop.depth if loop else 0
+    
+    def top_level(self) -> List[Loop]:
+        return [loop for loop in self.loops if loop.parent is None]
+    
+    def __len__(self):
+        return len(self.loops)
+    
+    def __iter__(self):
+        return iter(self.loops)
+
+# Analyses that depend only on control flow, still valid after a pass that
+# rewrites operands or opcodes without touching branches, labels or the
+# instruction count
+CONTROL_FLOW_ANALYSES = frozenset(('cfg', 'dominators', 'loops'))
+
+class IRFunction:
+    """
+    One FUNC_BEGIN ... FUNC_END region, or a stretch of module code, with
+    its analyses built on demand and cached until its buffer changes
+    """
+    __slots__ = ('name', 'buffer', 'start', 'global_names', '_cache', '_version')
+    
+    def __init__(self, name: str, buffer: IRBuffer, start: int = 0, global_names: Set[int] = frozenset()):
+        self.name = name
+        self.buffer = buffer
+        # Index of the first instruction in the program it was split from
+        self.start = start
+        # Symbols of the variables other functions can see
+        self.global_names = global_names
+        self._cache: Dict[str, Any] = {}
+        self._version = buffer.version
+    
+    def analysis(self, key: str, build: Callable[[], Any]) -> Any:
+        """Cached result of build(), rebuilt after the buffer is mutated"""
+        if self._version != self.buffer.version:
+            self._cache.clear()
+            self._version = self.buffer.version
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = build()
+        return value
+    
+    def invalidate(self):
+        self._cache.clear()
+    
+    def adopt(self, other: 'IRFunction', analyses: Iterable[str]):
+        """
+        Take over other's cached analyses named in analyses, for a new split
+        of the same function after a pass that kept them valid (it changed
+        no instruction count, label or control flow)
+        """
+        if other._version != other.buffer.version or len(other.buffer) != len(self.buffer):
+            return
+        for key in analyses:
+            value = other._cache.get(key)
+            if value is not None:
+                self._cache[key] = value
+        cfg = self._cache.get('cfg')
+        if cfg is not None:
+            cfg.buffer = self.buffer
+    
+    @property
+    def cfg(self) -> ControlFlowGraph:
+        return self.analysis('cfg', lambda: ControlFlowGraph(self.buffer))
+    
+    @property
+    def dominators(self) -> DominatorTree:
+        return self.analysis('dominators', lambda: DominatorTree(self.cfg))
+    
+    @property
+    def loops(self) -> LoopNest:
+        return self.analysis('loops', lambda: LoopNest(self.cfg, self.dominators))
+    
+    @property
+    def liveness(self) -> 'Liveness':
+        from ir_dataflow import Liveness
+        return self.analysis('liveness', lambda: Liveness(self.cfg, self.global_names))
+    
+    @property
+    def reaching_definitions(self) -> 'ReachingDefinitions':
+        from ir_dataflow import ReachingDefinitions
+        return self.analysis('reaching_definitions', lambda: ReachingDefinitions(self.cfg))
+    
+    def __repr__(self):
+        return f"IRFunction({self.name!r}, {len(self.buffer)} instructions)"
+
+MODULE_NAME = '<module>'
+
+def split_functions(instructions) -> List[IRFunction]:
+    """
+    Split a program into IRFunctions in source order
+    
+    Each FUNC_BEGIN ... FUNC_END region is one function (a region missing
+    its FUNC_END runs to the next FUNC_BEGIN); every stretch of code
+    outside them is a '<module>' function. The buffers share one symbol
+    table, and join_functions() reassembles the program. Variables named
+    in more than one function are its global_names: code elsewhere may
+    read them, so storing to one is an effect. Locals and parameters the
+    symbol table keeps apart are never shared, whatever their names.
+    """
+    buffer = instructions if isinstance(instructions, IRBuffer) else IRBuffer(instructions)
+    opcodes = buffer.opcodes
+    functions = []
+    count = len(buffer)
+    start = 0
+    index = 0
+    while index < count:
+        if opcodes[index] != _FUNC_BEGIN:
+            index += 1
+            continue
+        if index > start:
+            functions.append(IRFunction(MODULE_NAME, buffer.slice(start, index), start))
+        end = index + 1
+        while end < count and opcodes[end] not in (_FUNC_END, _FUNC_BEGIN):
+            end += 1
+        if end < count and opcodes[end] == _FUNC_END:
+            end += 1
+        name = buffer.operands(index)[0] if buffer.counts[index] else MODULE_NAME
+        functions.append(IRFunction(name, buffer.slice(index, end), index))
+        start = index = end
+    if start < count:
+        functions.append(IRFunction(MODULE_NAME, buffer.slice(start, count), start))
+    
+    kinds = buffer.kinds
+    seen: Dict[int, int] = {}
+    shared = set()
+    for number, function in enumerate(functions):
+        for symbol in variable_symbols(function.buffer):
+            if seen.setdefault(symbol, number) != number and kinds[symbol] in SHARED_KINDS:
+                shared.add(symbol)
+    for function in functions:
+        function.global_names = shared
+    return functions
+
+def variable_symbols(buffer: IRBuffer) -> Set[int]:
+    """Symbols of the variable names (not temporaries or labels) a buffer reads or assigns"""
+    kinds = buffer.kinds
+    found = {symbol for symbol in buffer.pool if symbol >= 0}
+    found.update(symbol for symbol in buffer.results if symbol >= 0)
+    return {symbol for symbol in found if kinds[symbol] in VARIABLE_KINDS}
+
+def join_functions(functions: List[IRFunction]) -> IRBuffer:
+    """Concatenate functions back into one program buffer"""
+    if not functions:
+        return IRBuffer()
+    program = functions[0].buffer.slice(0, 0)
+    for function in functions:
+        program.extend(function.buffer)
+    return program
+
+class CallGraph:
+    """
+    Which functions of a split program call or mention which
+    
+    Nodes are indices into the IRFunctions. A function's name mentioned
+    in another function (called, stored or passed along) references it,
+    or every function of that name when several share it. A CALL resolves
+    to its callee only when one function has the name and nothing in the
+    program assigns to it. Module stretches are the entries.
+    """
+    
+    def __init__(self, functions: List[IRFunction]):
+        self.functions = functions
+        self.entries = [node for node, function in enumerate(functions) if function.name == MODULE_NAME]
+        # Name symbol -> the functions declared with it
+        named: Dict[int, List[int]] = {}
+        for node, function in enumerate(functions):
+            part = function.buffer
+            if function.name != MODULE_NAME and part.opcodes[0] == _FUNC_BEGIN and part.counts[0]:
+                named.setdefault(part.pool[part.offsets[0]], []).append(node)
+        self.named = named
+        assigned = set()
+        for function in functions:
+            assigned.update(function.buffer.results)
+        # Functions each one references, the (instruction index, callee) of
+        # its resolved calls, and how often each function is mentioned
+        self.references: List[Set[int]] = []
+        self.calls: List[List[tuple]] = []
+        self.mentions = [0] * len(functions)
+        call = IROpCode.CALL.value
+        for function in functions:
+            part = function.buffer
+            opcodes, results, offsets, counts, pool = part.opcodes, part.results, part.offsets, part.counts, part.pool
+            references = set()
+            calls = []
+            for index in range(len(part)):
+                opcode = opcodes[index]
+                if opcode == _FUNC_BEGIN or opcode == _FUNC_END:
+                    continue
+                offset = offsets[index]
+                for symbol in chain(pool[offset:offset + counts[index]], (results[index],)):
+                    nodes = named.get(symbol)
+                    if nodes is not None:
+                        references.update(nodes)
+                        for node in nodes:
+                            self.mentions[node] += 1
+                if opcode == call and counts[index]:
+                    nodes = named.get(pool[offset])
+                    if nodes is not None and len(nodes) == 1 and pool[offset] not in assigned:
+                        calls.append((index, nodes[0]))
+            self.references.append(references)
+            self.calls.append(calls)
+    
+    def strongly_connected_components(self) -> List[List[int]]:
+        """
+        Tarjan's strongly connected components of the reference graph,
+        each listed after every component it references, so callees come
+        before their callers
+        """
+        references = self.references
+        number: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        stack: List[int] = []
+        on_stack = set()
+        components = []
+        for root in range(len(self.functions)):
+            if root in number:
+                continue
+            # Depth-first search without recursion: (node, its unvisited references)
+            work = [(root, iter(references[root]))]
+            number[root] = lowlink[root] = len(number)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in number:
+                        number[successor] = lowlink[successor] = len(number)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(references[successor])))
+                        break
+                    if successor in on_stack:
+                        lowlink[node] = min(lowlink[node], number[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == number[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+    
+    def recursive(self) -> Set[int]:
+        """Functions that can reach themselves: in a cycle of references, or referencing themselves"""
+        found = set()
+        for component in self.strongly_connected_components():
+            if len(component) > 1 or component[0] in self.references[component[0]]:
+                found.update(component)
+        return found
+    
+    def reachable(self, roots: Iterable[int]) -> Set[int]:
+        """Functions reachable from roots through references"""
+        seen = set(roots)
+        work = list(seen)
+        while work:
+            for successor in self.references[work.pop()]:
+                if successor not in seen:
+                    seen.add(successor)
+                    work.append(successor)
+        return seen
+
+def instruction_reads(buffer: IRBuffer, variables: Set[int]) -> List[List[int]]:
+    """Symbols of the variables (those in variables) and temporaries each instruction reads"""
+    opcodes, offsets, counts, pool = buffer.opcodes, buffer.offsets, buffer.counts, buffer.pool
+    reads: List[List[int]] = [[]] * len(buffer)
+    for index in range(len(buffer)):
+        opcode = opcodes[index]
+        if opcode in _NO_READS:
+            continue
+        offset = offsets[index]
+        stop = offset + counts[index]
+        if opcode in _BRANCHES:
+            stop -= 1
+        reads[index] = [symbol for symbol in pool[offset:stop] if symbol < -1 or symbol in variables]
+    return reads
+
+def block_local_symbols(cfg: ControlFlowGraph, reads: List[List[int]]) -> Dict[int, int]:
+    """
+    For every symbol read or assigned, the block holding all its mentions
+    when it is assigned there before being read, else -1: such block-local
+    values are never live at, or defined across, a block boundary
+    """
+    results, block_of = cfg.buffer.results, cfg.block_of
+    local: Dict[int, int] = {}
+    for index in range(len(reads)):
+        block = block_of[index]
+        for symbol in reads[index]:
+            if local.setdefault(symbol, -1) != block:
+                local[symbol] = -1
+        result = results[index]
+        if result != -1 and local.setdefault(result, block) != block:
+            local[result] = -1
+    return local
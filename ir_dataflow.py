@@ -0,0 +1,452 @@
+"""
+IR Dataflow
+Gen/kill dataflow problems over control-flow graphs, solved on bitsets:
+liveness (and the live intervals it gives) and reaching definitions
+"""
+
+from heapq import heappop, heappush
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ir_analysis import (
+    EFFECT_OPCODES, BasicBlock, ControlFlowGraph, block_local_symbols, instruction_reads, variable_symbols,
+)
+
+try:
+    import numpy as np
+except ImportError:  # Bitsets are then Python ints
+    np = None
+
+FORWARD = 'forward'
+BACKWARD = 'backward'
+UNION = 'union'
+INTERSECTION = 'intersection'
+
+class IntBitsets:
+    """Bitsets of a fixed width as Python ints, one per row of a list"""
+    
+    def __init__(self, width: int):
+        self.width = width
+        self.empty = 0
+        self.full = (1 << width) - 1
+    
+    def rows(self, count: int, value: int) -> List[int]:
+        return [value] * count
+    
+    def from_members(self, members: List[Iterable[int]]) -> List[int]:
+        """One row per iterable of bit numbers"""
+        rows = []
+        for bits in members:
+            row = 0
+            for bit in bits:
+                row |= 1 << bit
+            rows.append(row)
+        return rows
+    
+    def from_ints(self, rows: List[int]) -> List[int]:
+        """Rows from int bitsets"""
+        return rows
+    
+    def index(self, rows: List[int]) -> List[int]:
+        """Row numbers in the form union() and intersection() take"""
+        return rows
+    
+    def union(self, rows: List[int], indices: List[int]) -> int:
+        value = 0
+        for index in indices:
+            value |= rows[index]
+        return value
+    
+    def intersection(self, rows: List[int], indices: List[int]) -> int:
+        value = self.full
+        for index in indices:
+            value &= rows[index]
+        return value
+    
+    def complement(self, rows: List[int]) -> List[int]:
+        full = self.full
+        return [full & ~row for row in rows]
+    
+    def equal(self, left: int, right: int) -> bool:
+        return left == right
+    
+    def contains(self, row: int, bit: int) -> bool:
+        return row >> bit & 1 == 1
+    
+    def members(self, row: int) -> List[int]:
+        bits = []
+        while row:
+            low = row & -row
+            bits.append(low.bit_length() - 1)
+            row ^= low
+        return bits
+
+class PackedBitsets:
+    """
+    Bitsets of a fixed width packed into uint64 words, one row of a NumPy
+    matrix each, so a row operation is a few vectorized word operations
+    """
+    
+    def __init__(self, width: int):
+        self.width = width
+        self.words = max(1, -(-width // 64))
+        self.empty = np.zeros(self.words, dtype=np.uint64)
+        self.full = self.empty.copy()
+        self.full[:width // 64] = np.uint64(0xFFFFFFFFFFFFFFFF)
+        if width % 64:
+            self.full[width // 64] = np.uint64((1 << width % 64) - 1)
+    
+    def rows(self, count: int, value) -> 'np.ndarray':
+        return np.tile(value, (count, 1))
+    
+    def from_members(self, members: List[Iterable[int]]) -> 'np.ndarray':
+        """One row per iterable of bit numbers, set in one scatter"""
+        members = [list(bits) for bits in members]
+        matrix = np.zeros((len(members), self.words), dtype=np.uint64)
+        bits = np.fromiter(chain.from_iterable(members), dtype=np.int64)
+        if len(bits):
+            rows = np.repeat(np.arange(len(members)), [len(row) for row in members])
+            masks = np.left_shift(np.uint64(1), (bits & 63).astype(np.uint64))
+            np.bitwise_or.at(matrix, (rows, bits >> 6), masks)
+        return matrix
+    
+    def from_ints(self, rows: List[int]) -> 'np.ndarray':
+        """Rows from int bitsets, through their little-endian bytes"""
+        size = self.words * 8
+        data = b''.join(row.to_bytes(size, 'little') for row in rows)
+        return np.frombuffer(data, dtype='<u8').astype(np.uint64).reshape(len(rows), self.words)
+    
+    def index(self, rows: List[int]) -> 'np.ndarray':
+        return np.array(rows, dtype=np.intp)
+    
+    def union(self, rows: 'np.ndarray', indices: 'np.ndarray') -> 'np.ndarray':
+        if not len(indices):
+            return self.empty
+        return np.bitwise_or.reduce(rows[indices], axis=0)
+    
+    def intersection(self, rows: 'np.ndarray', indices: 'np.ndarray') -> 'np.ndarray':
+        if not len(indices):
+            return self.full
+        return np.bitwise_and.reduce(rows[indices], axis=0)
+    
+    def complement(self, rows: 'np.ndarray') -> 'np.ndarray':
+        return ~rows & self.full
+    
+    def equal(self, left: 'np.ndarray', right: 'np.ndarray') -> bool:
+        return np.array_equal(left, right)
+    
+    def contains(self, row: 'np.ndarray', bit: int) -> bool:
+        return bool(row[bit >> 6] >> np.uint64(bit & 63) & np.uint64(1))
+    
+    def members(self, row: 'np.ndarray') -> List[int]:
+        bits = np.unpackbits(row.astype('<u8').view(np.uint8), bitorder='little')
+        return np.flatnonzero(bits[:self.width]).tolist()
+
+class BitsetDataflow:
+    """
+    A gen/kill dataflow problem over a CFG's blocks, solved on bitsets
+    
+    A block's output is gen | (input & ~kill). Forward problems flow from
+    the input at the block's start to its end, backward ones the other
+    way; inputs meet over the neighbours flow comes from by union (may
+    problems) or intersection (must problems), and boundary enters at the
+    entry block (forward) or at blocks without successors (backward). The
+    worklist always takes the pending block earliest in reverse postorder
+    (postorder backward), so acyclic code settles in one sweep and each
+    loop in a few more before the code after it sees the result.
+    
+    Rows are Python ints by default: their bitwise operators already run
+    over packed machine words, with far less overhead per call than NumPy
+    at the widths IR produces. packed=True keeps them as rows of a NumPy
+    uint64 matrix instead (when NumPy is installed). Subclasses fill gen
+    and kill and call solve(); block_in and block_out then hold the sets
+    at the start and end of every block (empty for unreachable ones).
+    """
+    
+    direction = FORWARD
+    meet = UNION
+    
+    def __init__(self, cfg: ControlFlowGraph, width: int, packed: bool = False):
+        self.cfg = cfg
+        self.width = width
+        self.bitsets = PackedBitsets(width) if packed and np is not None else IntBitsets(width)
+        count = len(cfg.blocks)
+        self.gen = self.bitsets.rows(count, self.bitsets.empty)
+        self.kill = self.bitsets.rows(count, self.bitsets.empty)
+        self.boundary = self.bitsets.empty
+        self.block_in = self.bitsets.rows(count, self.bitsets.empty)
+        self.block_out = self.bitsets.rows(count, self.bitsets.empty)
+    
+    def transfer(self, block: int, value):
+        """The set at the far end of block, in the direction of flow, given value at the near end"""
+        return self.gen[block] | (value & self._keep[block])
+    
+    def solve(self):
+        cfg, bitsets = self.cfg, self.bitsets
+        blocks = cfg.blocks
+        forward = self.direction == FORWARD
+        meet = bitsets.union if self.meet == UNION else bitsets.intersection
+        reachable = cfg.order_index
+        self._keep = bitsets.complement(self.kill)
+        
+        # Values enter a block from its sources and leave to its targets
+        sources = []
+        targets = []
+        for block in blocks:
+            before, after = (block.predecessors, block.successors) if forward else (block.successors, block.predecessors)
+            sources.append(bitsets.index([other for other in before if reachable[other] >= 0]))
+            targets.append([other for other in after if reachable[other] >= 0])
+        
+        order = cfg.order if forward else cfg.order[::-1]
+        entering = self.block_in if forward else self.block_out
+        leaving = self.block_out if forward else self.block_in
+        if self.meet == INTERSECTION:
+            for block in order:
+                leaving[block] = bitsets.full
+        # Pending blocks by position in order, so a loop settles before the
+        # code after it is revisited
+        position = {block: number for number, block in enumerate(order)}
+        worklist = list(range(len(order)))
+        queued = bytearray(len(blocks))
+        for block in order:
+            queued[block] = 1
+        while worklist:
+            block = order[heappop(worklist)]
+            queued[block] = 0
+            value = meet(leaving, sources[block])
+            if (block == 0) if forward else not blocks[block].successors:
+                value = value | self.boundary if self.meet == UNION else value & self.boundary
+            entering[block] = value
+            value = self.transfer(block, value)
+            if not bitsets.equal(value, leaving[block]):
+                leaving[block] = value
+                for other in targets[block]:
+                    if not queued[other]:
+                        queued[other] = 1
+                        heappush(worklist, position[other])
+    
+    def members(self, row) -> List[int]:
+        """Bit numbers set in a row of block_in or block_out"""
+        return self.bitsets.members(row)
+
+class Liveness(BitsetDataflow):
+    """
+    Variables live into and out of each block
+    
+    Every variable and temporary that can be live across blocks gets a
+    bit (bits maps symbol to bit number); values assigned and read within
+    one block never are, so they stay out. Globals are live where the
+    function exits. With strong=True an instruction makes its operands
+    live only when it is needed, because it has an effect or its result is
+    live, so whole chains of dead computations (even ones feeding
+    themselves around a loop) come out dead together. That transfer looks
+    at each instruction, with block-local values on bits the blocks reuse,
+    so strong liveness is solved on int bitsets.
+    """
+    
+    direction = BACKWARD
+    
+    def __init__(self, cfg: ControlFlowGraph, global_names: Set[int] = frozenset(), strong: bool = False,
+                 packed: bool = False):
+        self.strong = strong
+        self.bits: Dict[int, int] = {}
+        reads = instruction_reads(cfg.buffer, variable_symbols(cfg.buffer))
+        for symbol, block in block_local_symbols(cfg, reads).items():
+            if block < 0 or symbol in global_names:
+                self.bits[symbol] = len(self.bits)
+        super().__init__(cfg, len(self.bits), False if strong else packed)
+        self.boundary = self.bitsets.from_members([[self.bits[symbol] for symbol in global_names if symbol in self.bits]])[0]
+        if strong:
+            self._prepare_instructions(reads, global_names)
+        else:
+            self._prepare_blocks(reads)
+        self.solve()
+        self.live_in, self.live_out = self.block_in, self.block_out
+    
+    def _prepare_blocks(self, reads: List[List[int]]):
+        """Each block's upward-exposed reads (gen) and assignments (kill)"""
+        bits, results = self.bits, self.cfg.buffer.results
+        gen = []
+        kill = []
+        for block in self.cfg.blocks:
+            used = assigned = 0
+            for index in range(block.end - 1, block.start - 1, -1):
+                bit = bits.get(results[index])
+                if bit is not None:
+                    used &= ~(1 << bit)
+                    assigned |= 1 << bit
+                for symbol in reads[index]:
+                    bit = bits.get(symbol)
+                    if bit is not None:
+                        used |= 1 << bit
+            gen.append(used)
+            kill.append(assigned)
+        self.gen = self.bitsets.from_ints(gen)
+        self.kill = self.bitsets.from_ints(kill)
+    
+    def _prepare_instructions(self, reads: List[List[int]], global_names: Set[int]):
+        """Per-instruction use and definition masks and which instructions are needed"""
+        buffer = self.cfg.buffer
+        opcodes, results = buffer.opcodes, buffer.results
+        block_of = self.cfg.block_of
+        bits = self.bits
+        count = len(buffer)
+        self.uses = uses = [0] * count
+        self.defs = defs = [0] * count
+        # Instructions kept whatever is live: effects, and no result to be dead
+        self.needed = needed = bytearray(count)
+        local_bits: Dict[int, int] = {}
+        current = -1
+        for index in range(count):
+            if block_of[index] != current:
+                current = block_of[index]
+                local_bits.clear()
+            mask = 0
+            for symbol in reads[index]:
+                bit = bits.get(symbol)
+                mask |= 1 << (local_bits[symbol] if bit is None else bit)
+            uses[index] = mask
+            result = results[index]
+            if result != -1:
+                bit = bits.get(result)
+                if bit is None:
+                    bit = local_bits.get(result)
+                    if bit is None:
+                        bit = local_bits[result] = len(bits) + len(local_bits)
+                defs[index] = 1 << bit
+            if result == -1 or opcodes[index] in EFFECT_OPCODES or result in global_names:
+                needed[index] = 1
+    
+    def transfer(self, block: int, value):
+        if not self.strong:
+            return super().transfer(block, value)
+        return self._sweep(self.cfg.blocks[block], value)
+    
+    def _sweep(self, block: BasicBlock, live: int, dead: Optional[bytearray] = None) -> int:
+        """Strong live set at the start of block given the set at its end; marks dead instructions"""
+        uses, defs, needed = self.uses, self.defs, self.needed
+        for index in range(block.end - 1, block.start - 1, -1):
+            definition = defs[index]
+            if not needed[index] and not live & definition:
+                if dead is not None:
+                    dead[index] = 1
+                continue
+            live = (live & ~definition) | uses[index]
+        return live
+    
+    def dead_instructions(self) -> bytearray:
+        """Flags of instructions whose results are never needed (strong liveness only)"""
+        dead = bytearray(len(self.cfg.buffer))
+        if self.strong:
+            for index in self.cfg.order:
+                self._sweep(self.cfg.blocks[index], self.live_out[index], dead)
+        return dead
+    
+    def is_live(self, symbol: int, live) -> bool:
+        """Whether symbol is in the live set"""
+        bit = self.bits.get(symbol)
+        return bit is not None and self.bitsets.contains(live, bit)
+    
+    def intervals(self, symbols: Set[int]) -> Dict[int, Tuple[int, int]]:
+        """
+        Live interval [start, end] of each of symbols the function mentions
+        
+        Instruction i reads its operands at position 2*i and writes its
+        result at 2*i + 1, so a value last read by an instruction ends
+        before the one it assigns starts. An interval spans every mention
+        and every block the value is live into or out of, so it holds each
+        point where the value is live, loops included.
+        """
+        buffer = self.cfg.buffer
+        results, offsets, counts, pool = buffer.results, buffer.offsets, buffer.counts, buffer.pool
+        starts: Dict[int, int] = {}
+        ends: Dict[int, int] = {}
+        for index in range(len(buffer)):
+            offset = offsets[index]
+            for symbol in pool[offset:offset + counts[index]]:
+                if symbol in symbols:
+                    starts.setdefault(symbol, 2 * index)
+                    ends[symbol] = 2 * index
+            result = results[index]
+            if result in symbols:
+                starts.setdefault(result, 2 * index + 1)
+                ends[result] = 2 * index + 1
+        
+        tracked = {bit: symbol for symbol, bit in self.bits.items() if symbol in starts}
+        if tracked:
+            for block in self.cfg.blocks:
+                for bit in self.members(self.live_in[block.index]):
+                    symbol = tracked.get(bit)
+                    if symbol is not None and starts[symbol] > 2 * block.start:
+                        starts[symbol] = 2 * block.start
+                for bit in self.members(self.live_out[block.index]):
+                    symbol = tracked.get(bit)
+                    if symbol is not None and ends[symbol] < 2 * block.end - 1:
+                        ends[symbol] = 2 * block.end - 1
+        return {symbol: (start, ends[symbol]) for symbol, start in starts.items()}
+
+class ReachingDefinitions(BitsetDataflow):
+    """
+    Assignments that may reach the start of each block
+    
+    Every instruction assigning a variable or temporary another block
+    mentions gets a bit; definitions lists their instruction indices by
+    bit and symbol_bits the bits of each symbol's definitions. Assignments
+    to block-local values reach no read outside their block, so they stay
+    out. A block generates its last definition of each symbol and kills
+    all the others.
+    """
+    
+    def __init__(self, cfg: ControlFlowGraph, packed: bool = False):
+        buffer = cfg.buffer
+        results = buffer.results
+        local = block_local_symbols(cfg, instruction_reads(buffer, variable_symbols(buffer)))
+        self.definitions: List[int] = []
+        self.symbol_bits: Dict[int, List[int]] = {}
+        for index in range(len(buffer)):
+            result = results[index]
+            if result != -1 and local[result] < 0:
+                self.symbol_bits.setdefault(result, []).append(len(self.definitions))
+                self.definitions.append(index)
+        super().__init__(cfg, len(self.definitions), packed)
+        
+        # Every definition of each symbol, killed together
+        masks: Dict[int, int] = {}
+        for symbol, symbol_bits in self.symbol_bits.items():
+            mask = 0
+            for bit in symbol_bits:
+                mask |= 1 << bit
+            masks[symbol] = mask
+        bit_of = {index: bit for bit, index in enumerate(self.definitions)}
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            last: Dict[int, int] = {}
+            for index in range(block.start, block.end):
+                bit = bit_of.get(index)
+                if bit is not None:
+                    last[results[index]] = bit
+            generated = killed = 0
+            for symbol, bit in last.items():
+                generated |= 1 << bit
+                killed |= masks[symbol]
+            gen.append(generated)
+            kill.append(killed)
+        self.gen = self.bitsets.from_ints(gen)
+        self.kill = self.bitsets.from_ints(kill)
+        self.solve()
+    
+    def reaching(self, block: int) -> List[int]:
+        """Instruction indices of the definitions reaching the start of block"""
+        definitions = self.definitions
+        return [definitions[bit] for bit in self.members(self.block_in[block])]
+    
+    def reaching_at(self, index: int, symbol: int) -> List[int]:
+        """Instruction indices of the definitions of symbol that may reach instruction index"""
+        results = self.cfg.buffer.results
+        block = self.cfg.blocks[self.cfg.block_of[index]]
+        for earlier in range(index - 1, block.start - 1, -1):
+            if results[earlier] == symbol:
+                return [earlier]
+        live = self.block_in[block.index]
+        contains = self.bitsets.contains
+        return [self.definitions[bit] for bit in self.symbol_bits.get(symbol, ()) if contains(live, bit)]
@@ -0,0 +1,338 @@
+"""
+Language Specifications for the Lexer
+Keywords, operators, comment syntax and string forms for every language
+the compiler executes
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, Tuple
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    """Lexical description of one programming language"""
+    name: str
+    keywords: Tuple[str, ...] = ()
+    # Built-in functions and types (never flagged as keyword typos)
+    built_ins: Tuple[str, ...] = ()
+    operators: Tuple[str, ...] = ()
+    delimiters: Tuple[str, ...] = ()
+    line_comments: Tuple[str, ...] = ()
+    # (opener, closer) pairs, e.g. ('/*', '*/')
+    block_comments: Tuple[Tuple[str, str], ...] = ()
+    # String delimiters; longer ones ('"""') take precedence over their prefixes
+    string_quotes: Tuple[str, ...] = ('"', "'")
+    # Delimiters whose strings take no backslash escapes (Go raw strings)
+    raw_quotes: Tuple[str, ...] = ()
+    # Letters glued to the opening quote (Python r/b/f, C L/u/U/u8)
+    string_prefixes: Tuple[str, ...] = ()
+    # A doubled quote stands for a quote instead of backslash escapes (SQL)
+    doubled_quote_escape: bool = False
+    # C++ R"delim( ... )delim" raw strings
+    delimited_raw_strings: bool = False
+    # Extra characters allowed to start / continue an identifier
+    identifier_start: str = ''
+    identifier_chars: str = ''
+    # Keywords match regardless of case (SQL)
+    case_insensitive: bool = False
+    aliases: Tuple[str, ...] = ()
+
+def case_variants(*prefixes: str) -> Tuple[str, ...]:
+    """Every upper/lower case spelling of the given prefixes"""
+    return tuple(dict.fromkeys(
+        ''.join(chars) for prefix in prefixes
+        for chars in product(*((char.lower(), char.upper()) for char in prefix))
+    ))
+
+C_BLOCK_COMMENTS = (('/*', '*/'),)
+
+# Operator and delimiter sets shared by the C family
+C_OPERATORS = (
+    '<<=', '>>=', '==', '!=', '<=', '>=', '&&', '||', '++', '--', '+=', '-=', '*=', '/=',
+    '%=', '&=', '|=', '^=', '<<', '>>', '->', '+', '-', '*', '/', '%', '=', '<', '>',
+    '!', '&', '|', '^', '~', '?'
+)
+C_DELIMITERS = ('(', ')', '{', '}', '[', ']', ';', ',', '.', ':')
+
+JAVASCRIPT_OPERATORS = C_OPERATORS + (
+    '>>>=', '===', '!==', '**=', '>>>', '&&=', '||=', '??=', '...', '**', '=>', '?.', '??'
+)
+
+JAVASCRIPT_KEYWORDS = (
+    'break', 'case', 'catch', 'class', 'const', 'continue', 'debugger', 'default',
+    'delete', 'do', 'else', 'export', 'extends', 'finally', 'for', 'function', 'if',
+    'import', 'in', 'instanceof', 'let', 'new', 'return', 'super', 'switch', 'this',
+    'throw', 'try', 'typeof', 'var', 'void', 'while', 'with', 'yield', 'async', 'await',
+    'of', 'true', 'false', 'null', 'undefined'
+)
+
+JAVASCRIPT_BUILT_INS = (
+    'console', 'log', 'error', 'warn', 'Math', 'JSON', 'Array', 'Object', 'String',
+    'Number', 'Boolean', 'Date', 'Promise', 'Map', 'Set', 'Symbol', 'Error',
+    'parseInt', 'parseFloat', 'isNaN', 'setTimeout', 'setInterval', 'require',
+    'module', 'exports', 'process', 'document', 'window', 'prompt', 'alert',
+    'length', 'push', 'pop', 'map', 'filter', 'reduce', 'forEach', 'readline'
+)
+
+C_KEYWORDS = (
+    'auto', 'break', 'case', 'char', 'const', 'continue', 'default', 'do', 'double',
+    'else', 'enum', 'extern', 'float', 'for', 'goto', 'if', 'inline', 'int', 'long',
+    'register', 'restrict', 'return', 'short', 'signed', 'sizeof', 'static', 'struct',
+    'switch', 'typedef', 'union', 'unsigned', 'void', 'volatile', 'while'
+)
+
+C_BUILT_INS = (
+    'include', 'define', 'ifdef', 'ifndef', 'endif', 'pragma', 'main', 'printf',
+    'scanf', 'puts', 'gets', 'fgets', 'getchar', 'putchar', 'malloc', 'calloc',
+    'realloc', 'free', 'strlen', 'strcpy', 'strcmp', 'strcat', 'memset', 'memcpy',
+    'stdin', 'stdout', 'stderr', 'stdio', 'stdlib', 'string', 'math', 'NULL',
+    'size_t', 'bool', 'true', 'false', 'exit', 'abs', 'sqrt', 'pow'
+)
+
+LANGUAGE_SPECS: Dict[str, LanguageSpec] = {
+    'python': LanguageSpec(
+        name='python',
+        keywords=(
+            'def', 'class', 'if', 'elif', 'else', 'while', 'for', 'in',
+            'return', 'import', 'from', 'as', 'try', 'except', 'finally',
+            'with', 'lambda', 'pass', 'break', 'continue', 'and', 'or', 'not',
+            'True', 'False', 'None', 'print', 'is', 'del', 'global', 'nonlocal',
+            'raise', 'yield', 'assert', 'async', 'await'
+        ),
+        built_ins=(
+            'int', 'str', 'float', 'bool', 'list', 'dict', 'tuple', 'set',
+            'input', 'print', 'len', 'range', 'type', 'isinstance', 'abs',
+            'sum', 'min', 'max', 'round', 'sorted', 'reversed', 'enumerate',
+            'zip', 'map', 'filter', 'all', 'any', 'open', 'file'
+        ),
+        operators=(
+            '**=', '//=', '>>=', '<<=', '==', '!=', '<=', '>=', '+=', '-=', '*=', '/=',
+            '%=', '&=', '|=', '^=', '**', '//', '<<', '>>', '->', ':=', '+', '-', '*',
+            '/', '%', '=', '<', '>', '&', '|', '^', '~', '@'
+        ),
+        delimiters=('(', ')', '{', '}', '[', ']', ';', ',', '.', ':'),
+        line_comments=('#',),
+        string_quotes=('"""', "'''", '"', "'"),
+        string_prefixes=case_variants('r', 'u', 'f', 'b', 'br', 'rb', 'fr', 'rf'),
+        aliases=('py', 'python3')
+    ),
+    'java': LanguageSpec(
+        name='java',
+        keywords=(
+            'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch',
+            'char', 'class', 'const', 'continue', 'default', 'do', 'double',
+            'else', 'enum', 'extends', 'final', 'finally', 'float', 'for',
+            'if', 'implements', 'import', 'instanceof', 'int', 'interface',
+            'long', 'native', 'new', 'package', 'private', 'protected', 'public',
+            'return', 'short', 'static', 'strictfp', 'super', 'switch',
+            'synchronized', 'this', 'throw', 'throws', 'transient', 'try',
+            'void', 'volatile', 'while', 'true', 'false', 'null'
+        ),
+        built_ins=(
+            'String', 'System', 'Scanner', 'ArrayList', 'HashMap', 'Integer',
+            'Double', 'Boolean', 'Math', 'Object', 'Exception', 'println',
+            'print', 'length', 'size', 'add', 'remove', 'get', 'set', 'equals',
+            'toString', 'indexOf', 'substring', 'charAt', 'split', 'trim'
+        ),
+        operators=C_OPERATORS + ('>>>=', '>>>', '::', '@'),
+        delimiters=C_DELIMITERS,
+        line_comments=('//',),
+        block_comments=C_BLOCK_COMMENTS,
+        string_quotes=('"""', '"', "'"),
+        identifier_start='$',
+        identifier_chars='$'
+    ),
+    'c': LanguageSpec(
+        name='c',
+        keywords=C_KEYWORDS,
+        built_ins=C_BUILT_INS,
+        operators=C_OPERATORS + ('##', '#'),
+        delimiters=C_DELIMITERS,
+        line_comments=('//',),
+        block_comments=C_BLOCK_COMMENTS,
+        string_prefixes=('u8', 'L', 'u', 'U')
+    ),
+    'cpp': LanguageSpec(
+        name='cpp',
+        keywords=C_KEYWORDS + (
+            'bool', 'class', 'namespace', 'using', 'public', 'private', 'protected',
+            'template', 'typename', 'virtual', 'new', 'delete', 'this', 'try', 'catch',
+            'throw', 'true', 'false', 'nullptr', 'operator', 'friend', 'explicit',
+            'constexpr', 'override', 'final', 'noexcept', 'decltype', 'mutable',
+            'static_cast', 'dynamic_cast', 'const_cast', 'reinterpret_cast'
+        ),
+        built_ins=C_BUILT_INS + (
+            'std', 'cout', 'cin', 'cerr', 'endl', 'iostream', 'vector', 'map',
+            'pair', 'make_pair', 'push_back', 'size', 'begin', 'end', 'getline'
+        ),
+        operators=C_OPERATORS + ('->*', '<=>', '::', '.*', '##', '#'),
+        delimiters=C_DELIMITERS,
+        line_comments=('//',),
+        block_comments=C_BLOCK_COMMENTS,
+        string_prefixes=('u8', 'L', 'u', 'U'),
+        delimited_raw_strings=True,
+        aliases=('c++', 'cxx')
+    ),
+    'javascript': LanguageSpec(
+        name='javascript',
+        keywords=JAVASCRIPT_KEYWORDS,
+        built_ins=JAVASCRIPT_BUILT_INS,
+        operators=JAVASCRIPT_OPERATORS,
+        delimiters=C_DELIMITERS,
+        line_comments=('//',),
+        block_comments=C_BLOCK_COMMENTS,
+        # Template literals may span lines
+        string_quotes=('"', "'", '`'),
+        identifier_start='$',
+        identifier_chars='$',
+        aliases=('js', 'node')
+    ),
+    'typescript': LanguageSpec(
+        name='typescript',
+        keywords=JAVASCRIPT_KEYWORDS + (
+            'type', 'interface', 'enum', 'implements', 'private', 'public',
+            'protected', 'readonly', 'declare', 'namespace', 'abstract', 'as',
+            'any', 'number', 'boolean', 'keyof', 'never', 'unknown', 'satisfies'
+        ),
+        built_ins=JAVASCRIPT_BUILT_INS + ('string', 'Record', 'Partial', 'Readonly'),
+        operators=JAVASCRIPT_OPERATORS + ('@',),
+        delimiters=C_DELIMITERS,
+        line_comments=('//',),
+        block_comments=C_BLOCK_COMMENTS,
+        # Template literals may span lines
+        string_quotes=('"', "'", '`'),
+        identifier_start='$',
+        identifier_chars='$',
+        aliases=('ts',)
+    ),
+    'go': LanguageSpec(
+        name='go',
+        keywords=(
+            'break', 'case', 'chan', 'const', 'continue', 'default', 'defer', 'else',
+            'fallthrough', 'for', 'func', 'go', 'goto', 'if', 'import', 'interface',
+            'map', 'package', 'range', 'return', 'select', 'struct', 'switch', 'type',
+            'var', 'true', 'false', 'nil', 'iota'
+        ),
+        built_ins=(
+            'fmt', 'Println', 'Printf', 'Print', 'Sprintf', 'Scan', 'Scanln', 'Scanf',
+            'main', 'make', 'len', 'cap', 'append', 'copy', 'delete', 'new', 'panic',
+            'recover', 'close', 'int', 'int64', 'int32', 'uint', 'float64', 'float32',
+            'string', 'bool', 'byte', 'rune', 'error', 'os', 'strings', 'strconv',
+            'math', 'bufio', 'Stdin', 'Stdout'
+        ),
+        operators=(
+            '<<=', '>>=', '&^=', '...', '==', '!=', '<=', '>=', '&&', '||', '++', '--',
+            '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<', '>>', '&^', ':=', '<-',
+            '+', '-', '*', '/', '%', '=', '<', '>', '!', '&', '|', '^', '~'
+        ),
+        delimiters=C_DELIMITERS,
+        line_comments=('//',),
+        block_comments=C_BLOCK_COMMENTS,
+        string_quotes=('"', "'", '`'),
+        raw_quotes=('`',),
+        aliases=('golang',)
+    ),
+    'php': LanguageSpec(
+        name='php',
+        keywords=(
+            'abstract', 'and', 'array', 'as', 'break', 'callable', 'case', 'catch',
+            'class', 'clone', 'const', 'continue', 'declare', 'default', 'do', 'echo',
+            'else', 'elseif', 'empty', 'extends', 'final', 'finally', 'fn', 'for',
+            'foreach', 'function', 'global', 'if', 'implements', 'include',
+            'include_once', 'instanceof', 'interface', 'isset', 'list', 'match',
+            'namespace', 'new', 'or', 'print', 'private', 'protected', 'public',
+            'readonly', 'require', 'require_once', 'return', 'static', 'switch',
+            'throw', 'trait', 'try', 'unset', 'use', 'var', 'while', 'xor', 'yield',
+            'true', 'false', 'null'
+        ),
+        built_ins=(
+            'php', 'printf', 'sprintf', 'strlen', 'count', 'explode', 'implode',
+            'trim', 'fgets', 'fscanf', 'STDIN', 'STDOUT', 'intval', 'floatval',
+            'strval', 'array_push', 'array_map', 'in_array', 'var_dump', 'print_r',
+            'readline', 'str_repeat', 'number_format', 'round', 'max', 'min', 'sum'
+        ),
+        operators=(
+            '<?php', '<=>', '===', '!==', '**=', '??=', '...', '<<=', '>>=', '?>',
+            '==', '!=', '<>', '<=', '>=', '&&', '||', '++', '--', '+=', '-=', '*=',
+            '/=', '.=', '%=', '&=', '|=', '^=', '**', '??', '<<', '>>', '->', '=>',
+            '::', '+', '-', '*', '/', '%', '=', '<', '>', '!', '&', '|', '^', '~',
+            '?', '@'
+        ),
+        delimiters=C_DELIMITERS,
+        line_comments=('//', '#'),
+        block_comments=C_BLOCK_COMMENTS,
+        identifier_start='$',
+        identifier_chars='$'
+    ),
+    'sql': LanguageSpec(
+        name='sql',
+        keywords=(
+            'select', 'from', 'where', 'insert', 'into', 'values', 'update', 'set',
+            'delete', 'create', 'table', 'drop', 'alter', 'add', 'column', 'index',
+            'view', 'primary', 'key', 'foreign', 'references', 'not', 'null',
+            'unique', 'default', 'check', 'and', 'or', 'in', 'is', 'like', 'between',
+            'exists', 'join', 'inner', 'left', 'right', 'outer', 'full', 'cross', 'on',
+            'as', 'group', 'by', 'order', 'having', 'limit', 'offset', 'distinct',
+            'union', 'all', 'case', 'when', 'then', 'else', 'end', 'asc', 'desc',
+            'integer', 'int', 'text', 'real', 'varchar', 'char', 'boolean', 'date',
+            'begin', 'commit', 'rollback', 'transaction', 'autoincrement', 'if'
+        ),
+        built_ins=(
+            'count', 'sum', 'avg', 'min', 'max', 'upper', 'lower', 'length',
+            'substr', 'round', 'coalesce', 'ifnull', 'now', 'abs', 'id', 'name'
+        ),
+        operators=('<>', '!=', '<=', '>=', '||', '=', '<', '>', '+', '-', '*', '/', '%'),
+        delimiters=('(', ')', ',', ';', '.'),
+        line_comments=('--',),
+        block_comments=C_BLOCK_COMMENTS,
+        doubled_quote_escape=True,
+        case_insensitive=True,
+        aliases=('sqlite',)
+    ),
+    'r': LanguageSpec(
+        name='r',
+        keywords=(
+            'if', 'else', 'repeat', 'while', 'function', 'for', 'in', 'next', 'break',
+            'return', 'TRUE', 'FALSE', 'NULL', 'Inf', 'NaN', 'NA', 'NA_integer_',
+            'NA_real_', 'NA_character_'
+        ),
+        built_ins=(
+            'cat', 'print', 'paste', 'paste0', 'c', 'list', 'vector', 'matrix',
+            'data', 'frame', 'length', 'sum', 'mean', 'median', 'max', 'min', 'seq',
+            'rep', 'scan', 'readline', 'readLines', 'as', 'numeric', 'integer',
+            'character', 'nchar', 'round', 'sqrt', 'abs', 'stdin', 'quiet', 'file',
+            'sprintf', 'format', 'is', 'na', 'T', 'F'
+        ),
+        operators=(
+            '<<-', '->>', '%/%', '%in%', '%*%', '%o%', '%>%', '%%', '<-', '->', '|>',
+            '==', '!=', '<=', '>=', '&&', '||', '+', '-', '*', '/', '^', '<', '>',
+            '!', '&', '|', '~', '?', '=', '$', '@', '::', ':'
+        ),
+        delimiters=('(', ')', '{', '}', '[', ']', ',', ';'),
+        line_comments=('#',),
+        identifier_chars='.'
+    ),
+}
+
+# Tables for languages without a spec (the lexer's original generic rules)
+GENERIC_SPEC = LanguageSpec(
+    name='generic',
+    operators=('==', '!=', '<=', '>=', '&&', '||', '++', '--', '+=', '-=', '*=', '/=',
+               '+', '-', '*', '/', '%', '=', '<', '>', '!', '&', '|', '^', '~'),
+    delimiters=('(', ')', '{', '}', '[', ']', ';', ',', '.', ':')
+)
+
+_ALIASES = {
+    alias: name
+    for name, spec in LANGUAGE_SPECS.items()
+    for alias in spec.aliases
+}
+
+def resolve_language(language: str) -> str:
+    """Canonical language name for a name or alias ('c++' -> 'cpp')"""
+    language = language.lower()
+    return _ALIASES.get(language, language)
+
+def get_language_spec(language: str) -> LanguageSpec:
+    """Spec for a language name or alias, falling back to the generic rules"""
+    return LANGUAGE_SPECS.get(resolve_language(language), GENERIC_SPEC)
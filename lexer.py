@@ -4,9 +4,26 @@ Performs tokenization with AI-enhanced error detection
 """
 
 import re
+import io
+import os
+import sys
+import tokenize as py_tokenize
+from array import array
 from enum import Enum, auto
-from typing import List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
+from functools import lru_cache
 import difflib
+from bisect import bisect_left, bisect_right
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from language_specs import LanguageSpec, LANGUAGE_SPECS, GENERIC_SPEC, resolve_language
+
+try:
+    import numpy as np
+except ImportError:  # The numpy engine then falls back to the regex engine
+    np = None
 
 class TokenType(Enum):
     # Keywords
@@ -28,6 +45,8 @@ class TokenType(Enum):
     ERROR = auto()
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+    
     def __init__(self, type: TokenType, value: str, line: int, column: int):
         self.type = type
         self.value = value
@@ -37,94 +56,821 @@ class Token:
     def __repr__(self):
         return f"Token({self.type.name}, '{self.value}', {self.line}:{self.column})"
 
-class Lexer:
-    """AI-Enhanced Lexical Analyzer"""
+class TokenView:
+    """Token-compatible view of one entry in a TokenBuffer"""
+    __slots__ = ('_buffer', '_index')
+    
+    def __init__(self, buffer: 'TokenBuffer', index: int):
+        self._buffer = buffer
+        self._index = index
+    
+    @property
+    def type(self) -> TokenType:
+        return _TYPE_BY_CODE[self._buffer.types[self._index]]
+    
+    @property
+    def value(self) -> str:
+        return self._buffer.value(self._index)
+    
+    @property
+    def line(self) -> int:
+        return self._buffer.lines[self._index]
+    
+    @property
+    def column(self) -> int:
+        return self._buffer.columns[self._index]
+    
+    def __repr__(self):
+        return f"Token({self.type.name}, '{self.value}', {self.line}:{self.column})"
+
+class TokenBuffer:
+    """
+    Struct-of-arrays token storage
     
-    # Language-specific keywords
-    KEYWORDS = {
-        'python': [
-            'def', 'class', 'if', 'elif', 'else', 'while', 'for', 'in',
-            'return', 'import', 'from', 'as', 'try', 'except', 'finally',
-            'with', 'lambda', 'pass', 'break', 'continue', 'and', 'or', 'not',
-            'True', 'False', 'None', 'print'
-        ],
-        'java': [
-            'abstract', 'assert', 'boolean', 'break', 'byte', 'case', 'catch',
-            'char', 'class', 'const', 'continue', 'default', 'do', 'double',
-            'else', 'enum', 'extends', 'final', 'finally', 'float', 'for',
-            'if', 'implements', 'import', 'instanceof', 'int', 'interface',
-            'long', 'native', 'new', 'package', 'private', 'protected', 'public',
-            'return', 'short', 'static', 'strictfp', 'super', 'switch',
-            'synchronized', 'this', 'throw', 'throws', 'transient', 'try',
-            'void', 'volatile', 'while', 'true', 'false', 'null'
+    Each token is a type code, the [start, end) offsets of its value in the
+    source, and its line/column, kept in parallel arrays (17 bytes per token).
+    Values are sliced from the source only when accessed.
+    """
+    __slots__ = ('source', 'types', 'starts', 'ends', 'lines', 'columns')
+    
+    # Column names and array typecodes, in serialization order
+    COLUMNS = (('types', 'B'), ('starts', 'I'), ('ends', 'I'), ('lines', 'I'), ('columns', 'I'))
+    
+    def __init__(self, source: str = ''):
+        self.source = source
+        for name, typecode in self.COLUMNS:
+            setattr(self, name, array(typecode))
+    
+    def append(self, token_type: TokenType, start: int, end: int, line: int, column: int):
+        """Append one token"""
+        self.types.append(token_type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.columns.append(column)
+    
+    def value(self, index: int) -> str:
+        """Slice the value of token index from the source"""
+        return self.source[self.starts[index]:self.ends[index]]
+    
+    def __len__(self):
+        return len(self.types)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TokenView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('token index out of range')
+        return TokenView(self, index)
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TokenView(self, index)
+    
+    def to_tokens(self) -> List[Token]:
+        """Materialize classic Token objects"""
+        source = self.source
+        return [
+            Token(_TYPE_BY_CODE[code], source[start:end], line, column)
+            for code, start, end, line, column
+            in zip(self.types, self.starts, self.ends, self.lines, self.columns)
+        ]
+    
+    def to_dicts(self) -> List[Dict]:
+        """Token dictionaries in the shape returned by the compile API"""
+        source = self.source
+        return [
+            {'type': _NAME_BY_CODE[code], 'value': source[start:end], 'line': line, 'column': column}
+            for code, start, end, line, column
+            in zip(self.types, self.starts, self.ends, self.lines, self.columns)
         ]
-    }
-    
-    # Built-in functions and types (should not be flagged as typos)
-    BUILT_INS = {
-        'python': [
-            'int', 'str', 'float', 'bool', 'list', 'dict', 'tuple', 'set',
-            'input', 'print', 'len', 'range', 'type', 'isinstance', 'abs',
-            'sum', 'min', 'max', 'round', 'sorted', 'reversed', 'enumerate',
-            'zip', 'map', 'filter', 'all', 'any', 'open', 'file'
-        ],
-        'java': [
-            'String', 'System', 'Scanner', 'ArrayList', 'HashMap', 'Integer',
-            'Double', 'Boolean', 'Math', 'Object', 'Exception', 'println',
-            'print', 'length', 'size', 'add', 'remove', 'get', 'set', 'equals',
-            'toString', 'indexOf', 'substring', 'charAt', 'split', 'trim'
-        ],
-        'javascript': [
-            'function', 'var', 'let', 'const', 'if', 'else', 'while', 'for',
-            'return', 'class', 'new', 'this', 'typeof', 'instanceof',
-            'try', 'catch', 'finally', 'throw', 'async', 'await',
-            'true', 'false', 'null', 'undefined', 'console'
-        ],
-        'cpp': [
-            'int', 'float', 'double', 'char', 'bool', 'void', 'string',
-            'if', 'else', 'while', 'for', 'return', 'class', 'struct',
-            'public', 'private', 'protected', 'namespace', 'using',
-            'include', 'cout', 'cin', 'endl', 'true', 'false'
+    
+    def to_json(self) -> str:
+        """Serialize straight to a JSON array of token objects"""
+        source = self.source
+        dumps = json.dumps
+        parts = [
+            '{"type": "%s", "value": %s, "line": %d, "column": %d}'
+            % (_NAME_BY_CODE[code], dumps(source[start:end]), line, column)
+            for code, start, end, line, column
+            in zip(self.types, self.starts, self.ends, self.lines, self.columns)
         ]
-    }
+        return '[' + ', '.join(parts) + ']'
+    
+    def to_columns(self) -> Dict[str, List]:
+        """Columnar form: one list per column plus the type name table"""
+        columns = {name: getattr(self, name).tolist() for name, _ in self.COLUMNS}
+        columns['type_names'] = dict(_NAME_BY_CODE)
+        return columns
+    
+    def to_bytes(self) -> bytes:
+        """Binary columnar serialization (the source is not included)"""
+        return len(self).to_bytes(4, 'little') + b''.join(
+            getattr(self, name).tobytes() for name, _ in self.COLUMNS
+        )
     
-    def __init__(self, source_code: str, language: str = 'python'):
+    @classmethod
+    def from_bytes(cls, data: bytes, source: str) -> 'TokenBuffer':
+        """Rebuild a buffer written by to_bytes() over the same source"""
+        buffer = cls(source)
+        count = int.from_bytes(data[:4], 'little')
+        offset = 4
+        for name, _ in cls.COLUMNS:
+            column = getattr(buffer, name)
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+        return buffer
+
+_TYPE_BY_CODE = {token_type.value: token_type for token_type in TokenType}
+_NAME_BY_CODE = {token_type.value: token_type.name for token_type in TokenType}
+
+class Lexer:
+    """AI-Enhanced Lexical Analyzer"""
+    
+    # Scanning engines: 'regex' drives one precompiled master pattern through
+    # finditer, 'char' is the original character-at-a-time scanner,
+    # 'tokenize' (Python only) maps the stdlib tokenizer, with real
+    # NEWLINE/INDENT/DEDENT tokens, and 'numpy' finds identifier, number,
+    # whitespace and one-character tokens with vectorized byte classification
+    ENGINES = ('regex', 'char', 'tokenize', 'numpy')
+    
+    # Sources smaller than this (in characters) are not worth a process pool
+    PARALLEL_THRESHOLD = 1 << 20
+    
+    # Sources smaller than this are lexed by the regex engine even with
+    # engine='numpy', whose fixed setup cost they would not pay back
+    NUMPY_THRESHOLD = 512
+    
+    # Language-specific keywords and built-ins (see language_specs.py)
+    KEYWORDS = {name: list(spec.keywords) for name, spec in LANGUAGE_SPECS.items()}
+    BUILT_INS = {name: list(spec.built_ins) for name, spec in LANGUAGE_SPECS.items()}
+    
+    def __init__(self, source_code: str, language: str = 'python', engine: str = 'regex'):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown lexer engine: {engine!r}")
         self.source = source_code
-        self.language = language.lower()
+        self.language = resolve_language(language)
+        if engine == 'tokenize' and self.language != 'python':
+            raise ValueError('The tokenize engine only lexes Python')
+        self.engine = engine
+        self.tables = lexer_tables(self.language)
+        self._typo_index = self.tables.typo_index
+        self._keyword_set = self.tables.keywords
+        self._built_in_set = self.tables.built_ins
         self.position = 0
         self.line = 1
         self.column = 1
         self.tokens: List[Token] = []
         self.errors: List[dict] = []
-        
+    
     def tokenize(self) -> Tuple[List[Token], List[dict]]:
         """Tokenize source code with AI-enhanced error detection"""
+        if self.engine == 'char':
+            return self._tokenize_chars()
+        self.tokens.extend(self.iter_tokens())
+        return self.tokens, self.errors
+    
+    def tokenize_buffer(self) -> Tuple['TokenBuffer', List[dict]]:
+        """Tokenize into a compact TokenBuffer instead of Token objects"""
+        if self.engine == 'char':
+            raise ValueError('TokenBuffer output requires the regex or tokenize engine')
+        if self.engine == 'numpy':
+            buffer = self._lex_numpy(self.source)
+            if buffer is not None:
+                return buffer, self.errors
+        scan = {'regex': self._scan, 'tokenize': self._scan_python, 'numpy': self._scan}[self.engine]
+        buffer = TokenBuffer(self.source)
+        append = buffer.append
+        for token_type, start, end, line, column in scan(self.source):
+            append(token_type, start, end, line, column)
+        return buffer, self.errors
+    
+    def tokenize_parallel(self, workers: Optional[int] = None, threshold: Optional[int] = None,
+                          executor=None) -> Tuple['TokenBuffer', List[dict]]:
+        """
+        Tokenize a large source across a process pool
+        
+        The source is split at line starts outside strings and comments, the
+        pieces are lexed by worker processes and their buffers and errors are
+        merged with shifted offsets and line numbers. Sources shorter than
+        threshold (default PARALLEL_THRESHOLD) are lexed in-process. An
+        existing executor may be passed to avoid starting a pool per call.
+        Returns the same buffer and errors as tokenize_buffer().
+        """
+        if self.engine != 'regex':
+            raise ValueError('Parallel lexing requires the regex engine')
+        if threshold is None:
+            threshold = self.PARALLEL_THRESHOLD
+        workers = workers or os.cpu_count() or 1
+        
+        source = self.source
+        if len(source) < threshold or not self.tables.splittable:
+            return self.tokenize_buffer()
+        # A few pieces per worker keeps the pool busy when pieces lex unevenly
+        points = _split_points(source, self.tables.boundary_pattern, workers * 4)
+        if len(points) < 3:
+            return self.tokenize_buffer()
+        pieces = [source[start:end] for start, end in zip(points, points[1:])]
+        
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            results = list(executor.map(_lex_piece, pieces, repeat(self.language)))
+        finally:
+            if own_executor:
+                executor.shutdown()
+        
+        buffer = TokenBuffer(source)
+        errors = []
+        line_offset = 0
+        last = len(pieces) - 1
+        for index, (piece, start, (data, piece_errors)) in enumerate(zip(pieces, points, results)):
+            part = TokenBuffer.from_bytes(data, piece)
+            # Pieces start at a line start, so only offsets and lines shift
+            count = len(part) if index == last else len(part) - 1  # Drop inner EOFs
+            buffer.types += part.types[:count]
+            buffer.starts += array('I', map(start.__add__, part.starts[:count]))
+            buffer.ends += array('I', map(start.__add__, part.ends[:count]))
+            buffer.lines += array('I', map(line_offset.__add__, part.lines[:count]))
+            buffer.columns += part.columns[:count]
+            for error in piece_errors:
+                error['line'] += line_offset
+                errors.append(error)
+            line_offset += piece.count('\n')
+        
+        self.position = len(source)
+        self.line = buffer.lines[-1]
+        self.column = buffer.columns[-1]
+        self.errors = errors
+        return buffer, errors
+    
+    def relex(self, previous: 'TokenBuffer', previous_errors: List[dict], offset: int,
+              deleted: int, inserted: str) -> Tuple['TokenBuffer', List[dict]]:
+        """
+        Incrementally re-tokenize after an editor edit
+        
+        The edit replaces previous.source[offset:offset + deleted] with
+        inserted. Scanning restarts after the last token that ends before the
+        edited line and stops at the first token, on a line past the edit,
+        that lines up with a token of the previous buffer; everything after
+        it is spliced in with shifted offsets and line numbers. Returns the
+        new buffer and lexer errors, equal to a full tokenize_buffer() run.
+        An edit reaching outside previous.source raises ValueError.
+        """
+        if self.engine != 'regex':
+            raise ValueError('Incremental lexing requires the regex engine')
+        old_source = previous.source
+        if not (0 <= offset and 0 <= deleted and offset + deleted <= len(old_source)):
+            raise ValueError(f'Edit deleting {deleted} characters at offset {offset} is outside '
+                             f'the {len(old_source)}-character source')
+        
+        source = old_source[:offset] + inserted + old_source[offset + deleted:]
+        self.source = source
+        self.errors = []
+        delta = len(inserted) - deleted
+        line_delta = inserted.count('\n') - old_source.count('\n', offset, offset + deleted)
+        edit_end = offset + len(inserted)
+        
+        STRING = TokenType.STRING.value
+        old_types, old_starts, old_ends = previous.types, previous.starts, previous.ends
+        old_count = len(previous)
+        
+        # Restart point: end of the last token finished before the edited line
+        line_start = old_source.rfind('\n', 0, offset) + 1
+        keep = min(bisect_right(old_ends, line_start), old_count - 1)
+        if keep and old_types[keep - 1] == STRING and self._token_extent(previous, keep - 1)[1] > line_start:
+            keep -= 1
+        if keep:
+            last = keep - 1
+            start, end = self._token_extent(previous, last)
+            line = previous.lines[last]
+            if old_types[last] == STRING:
+                newline = old_source.rfind('\n', start, end)
+                column = end - newline if newline >= 0 else previous.columns[last] + end - start
+            else:
+                column = previous.columns[last] + end - start
+            restart = end
+        else:
+            restart, line, column = 0, 1, 1
+        
+        # Tokens may resynchronize once they start on a line that begins after
+        # the edit in both the old and the new source
+        clean_from = max(_next_line_start(source, edit_end),
+                         _next_line_start(old_source, offset + deleted) + delta)
+        
+        region = TokenBuffer(source)
+        resume = old_count
+        stop_at = None
+        for token_type, start, end, token_line, token_column in self._scan(
+                source, offset=restart, line=line, column=column):
+            if token_type is TokenType.STRING:
+                # The quotes and any prefix precede the value on its first line
+                real_start = source.rfind('\n', 0, start) + token_column
+            else:
+                real_start = start
+            if real_start >= clean_from and token_type is not TokenType.EOF:
+                old_start = real_start - delta
+                # Tokens never overlap, so a token starting there is the first one at or after it
+                index = bisect_left(old_starts, old_start)
+                if index < old_count and self._token_extent(previous, index)[0] == old_start:
+                    resume = index
+                    stop_at = (token_line - source.count('\n', start, end), token_column)
+                    break
+            region.append(token_type, start, end, token_line, token_column)
+        
+        buffer = TokenBuffer(source)
+        suffix = slice(resume, old_count)
+        buffer.types = old_types[:keep] + region.types + old_types[suffix]
+        buffer.columns = previous.columns[:keep] + region.columns + previous.columns[suffix]
+        buffer.starts = old_starts[:keep] + region.starts + array('I', map(delta.__add__, old_starts[suffix]))
+        buffer.ends = old_ends[:keep] + region.ends + array('I', map(delta.__add__, old_ends[suffix]))
+        buffer.lines = (previous.lines[:keep] + region.lines
+                        + array('I', map(line_delta.__add__, previous.lines[suffix])))
+        
+        # Errors before the restart point are kept, later ones shift with their tokens
+        errors = [e for e in previous_errors if (e['line'], e['column']) < (line, column)]
+        if stop_at is None:
+            errors.extend(self.errors)
+        else:
+            errors.extend(e for e in self.errors if (e['line'], e['column']) < stop_at)
+            # A string token reports its last line; compare against its first
+            resume_at = (previous.lines[resume] - old_source.count('\n', old_starts[resume], old_ends[resume]),
+                         previous.columns[resume])
+            for error in previous_errors:
+                if (error['line'], error['column']) >= resume_at:
+                    shifted = error.copy()
+                    shifted['line'] += line_delta
+                    errors.append(shifted)
+        self.errors = errors
+        return buffer, errors
+    
+    def _token_extent(self, buffer: 'TokenBuffer', index: int) -> Tuple[int, int]:
+        """Source span of a token including the prefix and quotes of a string"""
+        start, end = buffer.starts[index], buffer.ends[index]
+        if buffer.types[index] != TokenType.STRING.value:
+            return start, end
+        source = buffer.source
+        start = source.rfind('\n', 0, start) + buffer.columns[index]
+        return start, self.tables.pattern.match(source, start).end()
+    
+    def iter_tokens(self, source=None, chunk_size: int = 65536) -> Iterator[Token]:
+        """
+        Yield tokens lazily, ending with EOF
+        
+        source may be a string, a text file object or an iterable of string
+        chunks (defaults to the source given to the constructor). Only the
+        unfinished tail of the current chunk is buffered, so memory stays flat
+        on large inputs; errors are appended to self.errors as they are found.
+        """
+        if source is None:
+            source = self.source
+        
+        if self.engine != 'regex':
+            # The other engines need the whole source up front
+            if not isinstance(source, str):
+                source = ''.join(_iter_chunks(source, chunk_size))
+            self.source = source
+            if self.engine == 'char':
+                tokens, _ = self._tokenize_chars()
+                yield from tokens
+                return
+            if self.engine == 'numpy':
+                buffer = self._lex_numpy(source)
+                if buffer is not None:
+                    yield from buffer.to_tokens()
+                    return
+            scan = self._scan_python if self.engine == 'tokenize' else self._scan
+            for token_type, start, end, line, column in scan(source):
+                yield Token(token_type, source[start:end], line, column)
+            return
+        
+        for token_type, start, end, line, column in self._scan(source, chunk_size):
+            buf, base = self._window
+            yield Token(token_type, buf[start - base:end - base], line, column)
+    
+    def _scan(self, source, chunk_size: int = 65536, offset: int = 0, line: int = 1,
+              column: int = 1) -> Iterator[Tuple[TokenType, int, int, int, int]]:
+        """
+        Core of the regex engine
+        
+        Yields (type, start, end, line, column) with absolute source offsets
+        of the token value; while suspended, self._window holds the current
+        (buffer, offset of buffer[0]) pair so callers can slice values.
+        Scanning may resume at a token boundary given by offset/line/column.
+        """
+        tables = self.tables
+        pattern = tables.pattern
+        opener_pattern = tables.string_opener
+        word_pattern = tables.word_pattern
+        keyword_set = self._keyword_set
+        # Without keywords there is nothing to flag as a typo
+        check_typos = bool(keyword_set)
+        chunks = _iter_chunks(source, chunk_size)
+        
+        KEYWORD, IDENTIFIER = TokenType.KEYWORD, TokenType.IDENTIFIER
+        OPERATOR, DELIMITER = TokenType.OPERATOR, TokenType.DELIMITER
+        NUMBER, STRING = TokenType.NUMBER, TokenType.STRING
+        
+        buf = ''
+        base = 0                    # Absolute offset of buf[0]
+        col_base = column - offset  # A token starting at buf[i] is in column i + col_base
+        pos = offset
+        final = False
+        self._window = (buf, base)
+        
+        while not final:
+            chunk = next(chunks, None)
+            if chunk is None:
+                final = True
+            elif not chunk:
+                continue
+            else:
+                buf += chunk
+                self._window = (buf, base)
+            
+            length = len(buf)
+            if final:
+                edge = limit = length
+            else:
+                # A token reaching the end, or an operator that could still
+                # grow into a longer one, may continue in the next chunk
+                edge = length - 1
+                limit = length - tables.lookahead
+            deferred = False
+            while pos < length and not deferred:
+                restart = None
+                for match in pattern.finditer(buf, pos):
+                    start, end = match.span()
+                    if end > edge or start > limit:
+                        restart = start
+                        deferred = True
+                        break
+                    
+                    kind = match.lastgroup
+                    if kind == 'IDENT':
+                        if check_typos:
+                            token_type = self._identifier_type(match.group(), line, start + col_base)
+                        elif match.group() in keyword_set:
+                            token_type = KEYWORD
+                        else:
+                            token_type = IDENTIFIER
+                        yield token_type, start + base, end + base, line, start + col_base
+                    elif kind == 'WS' or kind == 'COMMENT':
+                        newlines = buf.count('\n', start, end)
+                        if newlines:
+                            line += newlines
+                            col_base = -buf.rindex('\n', start, end)
+                    elif kind == 'OPERATOR':
+                        yield OPERATOR, start + base, end + base, line, start + col_base
+                    elif kind == 'DELIMITER':
+                        yield DELIMITER, start + base, end + base, line, start + col_base
+                    elif kind == 'NUMBER':
+                        # Non-ASCII digits (e.g. superscripts) continue a number too
+                        if end < length and buf[end] > '\x7f' and buf[end].isdigit():
+                            restart = _scan_number_tail(buf, end)
+                            if restart == length and not final:
+                                restart = start
+                                deferred = True
+                                break
+                            yield NUMBER, start + base, restart + base, line, start + col_base
+                            break
+                        yield NUMBER, start + base, end + base, line, start + col_base
+                    elif kind == 'STRING' or kind == 'UNTERMINATED' or kind == 'UNCLOSED_COMMENT':
+                        column = start + col_base
+                        newlines = buf.count('\n', start, end)
+                        if newlines:
+                            line += newlines
+                            col_base = -buf.rindex('\n', start, end)
+                        if kind == 'STRING':
+                            opener, closer = _string_delimiters(opener_pattern.match(buf, start))
+                            yield STRING, start + len(opener) + base, end - len(closer) + base, line, column
+                        elif kind == 'UNTERMINATED':
+                            _, closer = _string_delimiters(opener_pattern.match(buf, start))
+                            self._record_unterminated_string(closer, line, column)
+                        else:
+                            self._record_unterminated_comment(buf[start:end], line, column)
+                    elif kind == 'OTHER':
+                        # Non-ASCII characters are classified exactly like the char engine
+                        char = buf[start]
+                        column = start + col_base
+                        if char.isdigit() or char.isalpha():
+                            if char.isdigit():
+                                restart = _scan_number_tail(buf, start)
+                            else:
+                                restart = word_pattern.match(buf, start).end()
+                            if restart == length and not final:
+                                restart = start
+                                deferred = True
+                                break
+                            if char.isdigit():
+                                token_type = NUMBER
+                            else:
+                                token_type = self._identifier_type(buf[start:restart], line, column)
+                            yield token_type, start + base, restart + base, line, column
+                            break
+                        # A run of unexpected characters becomes one ranged error;
+                        # past limit, the next chunk may turn a character into
+                        # the start of an operator
+                        restart = end
+                        while restart < limit and _is_unexpected(pattern.match(buf, restart)):
+                            restart += 1
+                        if restart >= limit and not final:
+                            restart = start
+                            deferred = True
+                            break
+                        self._record_unexpected_char(buf[start:restart], line, column)
+                        yield TokenType.ERROR, start + base, restart + base, line, column
+                        break
+                
+                pos = length if restart is None else restart
+            
+            # Keep only the unfinished tail for the next chunk
+            if pos:
+                buf = buf[pos:]
+                base += pos
+                col_base += pos
+                pos = 0
+                self._window = (buf, base)
+        
+        self.position = base
+        self.line = line
+        self.column = col_base
+        yield TokenType.EOF, base, base, line, col_base
+    
+    def _lex_numpy(self, source: str) -> Optional['TokenBuffer']:
+        """
+        Core of the numpy engine
+        
+        Every character is classified through the ASCII lookup tables of
+        LexerTables and the end of the whitespace, identifier or number run
+        starting at every character is found with vectorized searches, so
+        tokens of those kinds cost one table lookup each; tokens starting
+        with any other character, or running into a non-ASCII one, go
+        through the master pattern. The walk records just type codes and
+        offsets: lines and columns are computed afterwards for all tokens at
+        once from the newline offsets, and the buffer columns are filled in
+        bulk. Builds exactly what _scan() yields; returns None when NumPy is
+        not installed or the source is below NUMPY_THRESHOLD (callers then
+        use _scan()).
+        """
+        if np is None or len(source) < self.NUMPY_THRESHOLD:
+            return None
+        
+        tables = self.tables
+        pattern = tables.pattern
+        opener_pattern = tables.string_opener
+        word_pattern = tables.word_pattern
+        check_typos = bool(self._keyword_set)
+        classes, token_ends, nexts, newlines = _numpy_runs(source, tables)
+        newline_list = newlines.tolist()
+        
+        def position(offset: int) -> Tuple[int, int]:
+            """Line and column of a source offset"""
+            before = bisect_left(newline_list, offset)
+            return before + 1, offset - (newline_list[before - 1] if before else -1)
+        
+        IDENTIFIER, NUMBER = TokenType.IDENTIFIER.value, TokenType.NUMBER.value
+        OPERATOR, DELIMITER = TokenType.OPERATOR.value, TokenType.DELIMITER.value
+        STRING, ERROR = TokenType.STRING.value, TokenType.ERROR.value
+        codes = {'OPERATOR': OPERATOR, 'DELIMITER': DELIMITER, 'NUMBER': NUMBER}
+        run_codes = {_RUN_NUMBER: NUMBER, _RUN_OPERATOR: OPERATOR, _RUN_DELIMITER: DELIMITER}
+        # Type codes of identifiers that raised no typo warning
+        word_codes = {}
+        types, starts, ends = [], [], []
+        types_append, starts_append, ends_append = types.append, starts.append, ends.append
+        # (token index, match start, match end) of strings, whose value
+        # excludes the quotes and whose line is that of the closing quote
+        strings = []
+        errors = self.errors
+        
+        length = len(source)
+        pos = 0
+        while pos < length:
+            start = pos
+            run = classes[pos]
+            if run:
+                end = token_ends[pos]
+                # Trailing whitespace is skipped along with the token
+                pos = nexts[pos]
+                if run == _RUN_WS:
+                    continue
+                if run != _RUN_WORD:
+                    types_append(run_codes[run])
+                    starts_append(start)
+                    ends_append(end)
+                    continue
+                kind = 'IDENT'
+            else:
+                match = pattern.match(source, pos)
+                kind = match.lastgroup
+                pos = end = match.end()
+                if kind == 'OTHER':
+                    # Non-ASCII characters are classified exactly like the char engine
+                    char = source[start]
+                    if char.isdigit():
+                        kind = 'NUMBER'
+                        pos = end = _scan_number_tail(source, start)
+                    elif char.isalpha():
+                        kind = 'IDENT'
+                        pos = end = word_pattern.match(source, start).end()
+                elif kind == 'NUMBER' and end < length and source[end] > '\x7f' and source[end].isdigit():
+                    # Non-ASCII digits (e.g. superscripts) continue a number too
+                    pos = end = _scan_number_tail(source, end)
+            
+            if kind == 'IDENT':
+                if not check_typos:
+                    code = IDENTIFIER
+                else:
+                    value = source[start:end]
+                    code = word_codes.get(value)
+                    if code is None:
+                        warnings = len(errors)
+                        code = self._identifier_type(value, *position(start)).value
+                        if len(errors) == warnings:
+                            word_codes[value] = code
+            elif kind in codes:
+                code = codes[kind]
+            elif kind == 'STRING':
+                opener, closer = _string_delimiters(opener_pattern.match(source, start))
+                strings.append((len(types), start, end))
+                types_append(STRING)
+                starts_append(start + len(opener))
+                ends_append(end - len(closer))
+                continue
+            elif kind == 'OTHER':
+                while pos < length and _is_unexpected(pattern.match(source, pos)):
+                    pos += 1
+                end = pos
+                self._record_unexpected_char(source[start:end], *position(start))
+                code = ERROR
+            else:
+                if kind == 'UNTERMINATED':
+                    _, closer = _string_delimiters(opener_pattern.match(source, start))
+                    self._record_unterminated_string(closer, position(end)[0], position(start)[1])
+                elif kind == 'UNCLOSED_COMMENT':
+                    self._record_unterminated_comment(source[start:end], position(end)[0], position(start)[1])
+                # WS and COMMENT matches are skipped
+                continue
+            types_append(code)
+            starts_append(start)
+            ends_append(end)
+        
+        self.position = length
+        self.line, self.column = position(length)
+        types.append(TokenType.EOF.value)
+        starts.append(length)
+        ends.append(length)
+        
+        offsets = np.array(starts, dtype=np.int64)
+        if strings:
+            indices, string_starts, string_ends = np.array(strings, dtype=np.int64).T
+        else:
+            indices = string_starts = string_ends = np.zeros(0, dtype=np.int64)
+        # Tokens are on the line of their first character (strings: of the
+        # closing quote) and in the column of their first character
+        # (strings: of the opening quote)
+        line_offsets, column_offsets = offsets.copy(), offsets.copy()
+        line_offsets[indices] = string_ends
+        column_offsets[indices] = string_starts
+        lines = np.searchsorted(newlines, line_offsets)
+        previous = np.concatenate(([-1], newlines))[np.searchsorted(newlines, column_offsets)]
+        
+        buffer = TokenBuffer(source)
+        buffer.types = array('B', types)
+        buffer.starts = array('I', starts)
+        buffer.ends = array('I', ends)
+        buffer.lines = array('I', (lines + 1).tolist())
+        buffer.columns = array('I', (column_offsets - previous).tolist())
+        return buffer
+    
+    def _scan_python(self, source: str) -> Iterator[Tuple[TokenType, int, int, int, int]]:
+        """
+        Core of the tokenize engine (Python only)
+        
+        Maps the stdlib tokenizer onto TokenType with the same (type, start,
+        end, line, column) shape as _scan(). NEWLINE ends each logical line
+        and INDENT/DEDENT follow the block structure; comments and blank-line
+        NL tokens are dropped. Strings report their first line. Should the
+        tokenizer give up (bad dedent, unclosed bracket or string), the error
+        is recorded and the rest of the source is scanned by the regex engine.
+        """
+        NAME, NUMBER, STRING = py_tokenize.NAME, py_tokenize.NUMBER, py_tokenize.STRING
+        OP, ERRORTOKEN = py_tokenize.OP, py_tokenize.ERRORTOKEN
+        # Python 3.12+ splits f-strings into pieces; they are merged back into one STRING
+        FSTRING_START = getattr(py_tokenize, 'FSTRING_START', None)
+        FSTRING_END = getattr(py_tokenize, 'FSTRING_END', None)
+        structure = {
+            py_tokenize.NEWLINE: TokenType.NEWLINE,
+            py_tokenize.INDENT: TokenType.INDENT,
+            py_tokenize.DEDENT: TokenType.DEDENT
+        }
+        delimiters = self.tables.delimiters
+        quote_chars = self.tables.quote_chars
+        
+        # Offset of the start of every line; the sentinel covers tokens
+        # placed past the last line (trailing DEDENTs)
+        line_starts = [0]
+        line_starts.extend(match.end() for match in _NEWLINE_PATTERN.finditer(source))
+        line_starts.append(len(source))
+        self._window = (source, 0)
+        
+        consumed = 0    # Offset just past the last token handled
+        fstring_depth = 0
+        failure = None
+        try:
+            for token_type, text, (line, column), _, _ in py_tokenize.generate_tokens(
+                    io.StringIO(source).readline):
+                start = line_starts[line - 1] + column
+                end = start + len(text)
+                column += 1
+                
+                if fstring_depth and token_type != FSTRING_START and token_type != FSTRING_END:
+                    continue
+                if token_type == NAME:
+                    yield self._identifier_type(text, line, column), start, end, line, column
+                elif token_type == OP:
+                    kind = TokenType.DELIMITER if text in delimiters else TokenType.OPERATOR
+                    yield kind, start, end, line, column
+                elif token_type == NUMBER:
+                    yield TokenType.NUMBER, start, end, line, column
+                elif token_type == STRING:
+                    body_start, body_end = _string_body(text)
+                    yield TokenType.STRING, start + body_start, start + body_end, line, column
+                elif token_type in structure:
+                    yield structure[token_type], start, end, line, column
+                elif token_type == FSTRING_START:
+                    if not fstring_depth:
+                        fstring_at = (start, line, column)
+                    fstring_depth += 1
+                elif token_type == FSTRING_END:
+                    fstring_depth -= 1
+                    if not fstring_depth:
+                        first, line, column = fstring_at
+                        body_start, body_end = _string_body(source[first:end])
+                        yield TokenType.STRING, first + body_start, first + body_end, line, column
+                elif token_type == ERRORTOKEN:
+                    if text in quote_chars:
+                        self._record_unterminated_string(text, line, column)
+                    elif not text.isspace():
+                        self._record_unexpected_char(text, line, column)
+                        yield TokenType.ERROR, start, end, line, column
+                elif token_type == py_tokenize.ENDMARKER:
+                    break
+                # COMMENT and NL tokens carry nothing for later phases
+                consumed = max(consumed, end)
+        except (py_tokenize.TokenError, IndentationError) as error:
+            failure = error
+        
+        if failure is not None:
+            if isinstance(failure, IndentationError):
+                message, line, column = failure.msg, failure.lineno, failure.offset or 1
+            else:
+                message, (line, column) = failure.args[0], failure.args[1]
+                column += 1
+            line_start = source.rfind('\n', 0, consumed) + 1
+            errors_before = len(self.errors)
+            for token in self._scan(source, offset=consumed, line=source.count('\n', 0, consumed) + 1,
+                                    column=consumed - line_start + 1):
+                # Report the tokenizer's reason unless the regex engine found one itself
+                if token[0] is TokenType.EOF and len(self.errors) == errors_before:
+                    self._record_tokenizer_error(message, line, column)
+                yield token
+            return
+        
+        length = len(source)
+        self.position = length
+        self.line = source.count('\n') + 1
+        self.column = length - source.rfind('\n')
+        yield TokenType.EOF, length, length, self.line, self.column
+    
+    def _tokenize_chars(self) -> Tuple[List[Token], List[dict]]:
+        """Character-at-a-time scanner (reference engine)"""
         while self.position < len(self.source):
             self._skip_whitespace()
             
             if self.position >= len(self.source):
                 break
-                
+            
             # Skip comments
             if self._check_comment():
                 continue
             
             # Try to match tokens
             if not self._match_token():
-                # AI-enhanced error handling
-                error_char = self.source[self.position]
-                suggestion = self._get_ai_suggestion(error_char)
-                
-                self.errors.append({
-                    'line': self.line,
-                    'column': self.column,
-                    'message': f"Unexpected character: '{error_char}'",
-                    'suggestion': suggestion,
-                    'severity': 'error'
-                })
-                
-                self.tokens.append(Token(TokenType.ERROR, error_char, self.line, self.column))
+                # AI-enhanced error handling; a run of unexpected characters
+                # is reported once
+                start_pos = self.position
+                start_col = self.column
                 self._advance()
+                while self.position < len(self.source) and self._is_unexpected_char():
+                    self._advance()
+                error_chars = self.source[start_pos:self.position]
+                self._record_unexpected_char(error_chars, self.line, start_col)
+                self.tokens.append(Token(TokenType.ERROR, error_chars, self.line, start_col))
         
         self.tokens.append(Token(TokenType.EOF, '', self.line, self.column))
         return self.tokens, self.errors
@@ -136,13 +882,14 @@ class Lexer:
             self._read_number()
             return True
         
-        # Strings
-        if self._current_char() in '"\'':
-            self._read_string()
+        # Strings (an opening quote, possibly after a prefix such as r or u8)
+        opener = self.tables.string_opener.match(self.source, self.position)
+        if opener:
+            self._read_string(opener)
             return True
         
         # Identifiers and keywords
-        if self._current_char().isalpha() or self._current_char() == '_':
+        if self._current_char().isalpha() or self._current_char() in self.tables.identifier_start:
             self._read_identifier()
             return True
         
@@ -165,90 +912,147 @@ class Lexer:
         value = self.source[start_pos:self.position]
         self.tokens.append(Token(TokenType.NUMBER, value, self.line, start_col))
     
-    def _read_string(self):
-        """Read string literals"""
-        quote = self._current_char()
+    def _read_string(self, opener_match):
+        """Read string literals, including multi-line, raw and prefixed forms"""
+        opener, closer = _string_delimiters(opener_match)
         start_col = self.column
-        self._advance()  # Skip opening quote
+        for _ in opener:
+            self._advance()  # Skip prefix and opening quote
         
         start_pos = self.position
-        while self.position < len(self.source) and self._current_char() != quote:
-            if self._current_char() == '\\':
-                self._advance()  # Skip escape character
-            self._advance()
+        source = self.source
+        if opener_match.lastgroup != 'QUOTE' or closer in self.tables.raw_quotes:
+            # Raw strings end at the first closer, backslashes included
+            while self.position < len(source) and not source.startswith(closer, self.position):
+                self._advance()
+        elif self.tables.doubled_quote_escape:
+            # '' stands for a quote inside the string
+            while self.position < len(source) and not (
+                source.startswith(closer, self.position)
+                and not source.startswith(closer, self.position + len(closer))
+            ):
+                if source.startswith(closer, self.position):
+                    self._advance()
+                self._advance()
+        else:
+            while self.position < len(source) and not source.startswith(closer, self.position):
+                if self._current_char() == '\\':
+                    self._advance()  # Skip escape character
+                self._advance()
         
-        value = self.source[start_pos:self.position]
+        value = source[start_pos:self.position]
         
-        if self.position < len(self.source):
-            self._advance()  # Skip closing quote
+        if self.position < len(source):
+            for _ in closer:
+                self._advance()  # Skip closing quote
             self.tokens.append(Token(TokenType.STRING, value, self.line, start_col))
         else:
-            self.errors.append({
-                'line': self.line,
-                'column': start_col,
-                'message': 'Unterminated string literal',
-                'suggestion': f'Add closing {quote} at the end of the string',
-                'severity': 'error'
-            })
+            self._record_unterminated_string(closer, self.line, start_col)
     
     def _read_identifier(self):
         """Read identifiers and keywords"""
         start_pos = self.position
         start_col = self.column
         
+        identifier_chars = self.tables.identifier_chars
         while self.position < len(self.source) and (
-            self._current_char().isalnum() or self._current_char() == '_'
+            self._current_char().isalnum() or self._current_char() in identifier_chars
         ):
             self._advance()
         
         value = self.source[start_pos:self.position]
-        
-        # Check if it's a keyword with AI-enhanced typo detection
-        keywords = self.KEYWORDS.get(self.language, [])
-        built_ins = self.BUILT_INS.get(self.language, [])
-        
-        if value in keywords:
+        token_type = self._identifier_type(value, self.line, start_col)
+        self.tokens.append(Token(token_type, value, self.line, start_col))
+    
+    def _identifier_type(self, value: str, line: int, column: int) -> TokenType:
+        """Classify an identifier or keyword with AI-enhanced typo detection"""
+        if self.tables.case_insensitive:
+            value = value.lower()
+        if value in self._keyword_set:
             token_type = TokenType.KEYWORD
         else:
             # Check for typos in keywords (but ignore built-in functions)
-            if value not in built_ins:
-                close_matches = difflib.get_close_matches(value, keywords, n=1, cutoff=0.8)
-                if close_matches:
+            if self._typo_index and value not in self._built_in_set:
+                close_match = self._typo_index.suggest(value)
+                if close_match:
                     self.errors.append({
-                        'line': self.line,
-                        'column': start_col,
+                        'line': line,
+                        'column': column,
                         'message': f"Possible typo: '{value}'",
-                        'suggestion': f"Did you mean '{close_matches[0]}'?",
+                        'suggestion': f"Did you mean '{close_match}'?",
                         'severity': 'warning'
                     })
             token_type = TokenType.IDENTIFIER
         
-        self.tokens.append(Token(token_type, value, self.line, start_col))
+        return token_type
+    
+    def _record_unterminated_string(self, quote: str, line: int, column: int):
+        """Record an unterminated string literal"""
+        self.errors.append({
+            'line': line,
+            'column': column,
+            'message': 'Unterminated string literal',
+            'suggestion': f'Add closing {quote} at the end of the string',
+            'severity': 'error'
+        })
+    
+    def _record_unterminated_comment(self, comment: str, line: int, column: int):
+        """Record a block comment that is never closed"""
+        closer = next(close for open_, close in self.tables.block_comments if comment.startswith(open_))
+        self.errors.append({
+            'line': line,
+            'column': column,
+            'message': 'Unterminated block comment',
+            'suggestion': f'Add closing {closer} at the end of the comment',
+            'severity': 'error'
+        })
+    
+    def _record_tokenizer_error(self, message: str, line: int, column: int):
+        """Record a structural error reported by the stdlib tokenizer"""
+        if 'indent' in message:
+            suggestion = 'Indent this line to match an enclosing block'
+        elif 'string' in message:
+            suggestion = 'Close the string with matching quotes'
+        else:
+            suggestion = 'Close every open bracket before the end of the file'
+        self.errors.append({
+            'line': line,
+            'column': column,
+            'message': f'{message[0].upper()}{message[1:]}',
+            'suggestion': suggestion,
+            'severity': 'error'
+        })
+    
+    def _record_unexpected_char(self, chars: str, line: int, column: int):
+        """Record a run of unexpected characters as one lexer error"""
+        self.errors.append({
+            'line': line,
+            'column': column,
+            'end_column': column + len(chars),
+            'message': f"Unexpected character{'s' if len(chars) > 1 else ''}: '{chars}'",
+            'suggestion': self._get_ai_suggestion(chars[0]),
+            'severity': 'error'
+        })
     
     def _match_operator(self) -> bool:
         """Match operators and delimiters"""
-        operators = ['==', '!=', '<=', '>=', '&&', '||', '++', '--', '+=', '-=', '*=', '/=',
-                    '+', '-', '*', '/', '%', '=', '<', '>', '!', '&', '|', '^', '~']
-        delimiters = ['(', ')', '{', '}', '[', ']', ';', ',', '.', ':']
+        operators = self.tables.operators
+        delimiters = self.tables.delimiters
         
         start_col = self.column
         
-        # Try two-character operators first
-        if self.position + 1 < len(self.source):
-            two_char = self.source[self.position:self.position + 2]
-            if two_char in operators:
-                self.tokens.append(Token(TokenType.OPERATOR, two_char, self.line, start_col))
-                self._advance()
-                self._advance()
+        # Try the longest operators first
+        for size in self.tables.operator_lengths:
+            candidate = self.source[self.position:self.position + size]
+            if len(candidate) == size and candidate in operators:
+                self.tokens.append(Token(TokenType.OPERATOR, candidate, self.line, start_col))
+                for _ in range(size):
+                    self._advance()
                 return True
         
-        # Single character operators and delimiters
+        # Delimiters
         char = self._current_char()
-        if char in operators:
-            self.tokens.append(Token(TokenType.OPERATOR, char, self.line, start_col))
-            self._advance()
-            return True
-        elif char in delimiters:
+        if char in delimiters:
             self.tokens.append(Token(TokenType.DELIMITER, char, self.line, start_col))
             self._advance()
             return True
@@ -257,20 +1061,36 @@ class Lexer:
     
     def _check_comment(self) -> bool:
         """Skip comments based on language"""
-        if self.language == 'python' and self._current_char() == '#':
+        if self.source.startswith(self.tables.line_comments, self.position):
             while self.position < len(self.source) and self._current_char() != '\n':
                 self._advance()
             return True
         
-        if self.language in ['javascript', 'cpp']:
-            if self.position + 1 < len(self.source):
-                if self.source[self.position:self.position + 2] == '//':
-                    while self.position < len(self.source) and self._current_char() != '\n':
-                        self._advance()
-                    return True
+        for opener, closer in self.tables.block_comments:
+            if self.source.startswith(opener, self.position):
+                start_col = self.column
+                end = self.source.find(closer, self.position + len(opener))
+                end = len(self.source) if end < 0 else end + len(closer)
+                comment = self.source[self.position:end]
+                while self.position < end:
+                    self._advance()
+                if not comment.endswith(closer) or len(comment) < len(opener) + len(closer):
+                    self._record_unterminated_comment(comment, self.line, start_col)
+                return True
         
         return False
     
+    def _is_unexpected_char(self) -> bool:
+        """Whether no token, comment or whitespace can start at the current position"""
+        source, position, tables = self.source, self.position, self.tables
+        char = source[position]
+        if (char in ' \t\r\n' or char.isdigit() or char.isalpha() or char in tables.identifier_start
+                or char in tables.delimiters):
+            return False
+        if source.startswith(tables.comment_openers, position) or tables.string_opener.match(source, position):
+            return False
+        return not any(source[position:position + size] in tables.operators for size in tables.operator_lengths)
+    
     def _skip_whitespace(self):
         """Skip whitespace characters"""
         while self.position < len(self.source) and self._current_char() in ' \t\r\n':
@@ -306,3 +1126,502 @@ class Lexer:
             '`': 'Use single \' or double " quotes for strings',
         }
         return suggestions.get(error_char, 'Check for typos or invalid syntax')
+
+
+class TypoIndex:
+    """
+    Precomputed keyword typo index for one language
+    
+    suggest() returns exactly what difflib.get_close_matches(word, keywords,
+    n=1, cutoff) would, but only scores keywords that can reach the cutoff.
+    Keywords are bucketed by length and posted per character with their
+    counts, so a word's matching-character upper bound (difflib's
+    quick_ratio) against every keyword is summed from the postings of its
+    own characters. Recent answers are kept in a bounded LRU memo.
+    """
+    
+    def __init__(self, keywords: List[str], cutoff: float = 0.8, memo_size: int = 4096):
+        self.keywords = list(keywords)
+        self.cutoff = cutoff
+        self.memo_size = memo_size
+        self.lengths = [len(keyword) for keyword in self.keywords]
+        # character -> [(keyword index, count of the character in the keyword)]
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for index, keyword in enumerate(self.keywords):
+            for char in set(keyword):
+                self.postings.setdefault(char, []).append((index, keyword.count(char)))
+        self.suggest = lru_cache(maxsize=memo_size)(self._suggest)
+    
+    def __getstate__(self):
+        # The memo is per process; it is recreated empty when unpickled
+        state = self.__dict__.copy()
+        del state['suggest']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.suggest = lru_cache(maxsize=self.memo_size)(self._suggest)
+    
+    def _suggest(self, word: str) -> Optional[str]:
+        """Closest keyword to word with a ratio of at least cutoff, if any"""
+        cutoff = self.cutoff
+        lengths = self.lengths
+        size = len(word)
+        
+        common = [0] * len(self.keywords)
+        for char in set(word):
+            postings = self.postings.get(char)
+            if postings:
+                count = word.count(char)
+                for index, keyword_count in postings:
+                    common[index] += count if count < keyword_count else keyword_count
+        
+        best = None
+        matcher = None
+        for index, matches in enumerate(common):
+            total = size + lengths[index]
+            # quick_ratio bounds ratio from above; it also implies the length check
+            if not matches or 2.0 * matches / total < cutoff:
+                continue
+            if matcher is None:
+                matcher = difflib.SequenceMatcher()
+                matcher.set_seq2(word)
+            keyword = self.keywords[index]
+            matcher.set_seq1(keyword)
+            score = matcher.ratio()
+            # get_close_matches keeps the largest (score, keyword) pair
+            if score >= cutoff and (best is None or (score, keyword) > best):
+                best = (score, keyword)
+        
+        return best[1] if best else None
+
+
+class LexerTables:
+    """
+    Lookup tables and scanner patterns compiled from one LanguageSpec
+    
+    Everything a Lexer needs per language: frozen keyword, built-in,
+    operator and delimiter sets, the typo index and the master pattern of
+    the regex engine. Instances are built once and kept in the disk cache
+    as plain JSON (to_json/from_json), so loading it runs no stored code.
+    """
+    
+    def __init__(self, spec: LanguageSpec):
+        self.language = spec.name
+        self.case_insensitive = spec.case_insensitive
+        keywords = list(dict.fromkeys(
+            keyword.lower() if spec.case_insensitive else keyword for keyword in spec.keywords
+        ))
+        self.keywords = frozenset(keywords)
+        self.built_ins = frozenset(
+            name.lower() if spec.case_insensitive else name for name in spec.built_ins
+        )
+        self.typo_index = TypoIndex(keywords) if keywords else None
+        self.operators = frozenset(spec.operators)
+        self.delimiters = frozenset(spec.delimiters)
+        self.operator_lengths = tuple(sorted({len(op) for op in spec.operators}, reverse=True))
+        self.line_comments = tuple(spec.line_comments)
+        self.block_comments = tuple(spec.block_comments)
+        self.comment_openers = self.line_comments + tuple(opener for opener, _ in spec.block_comments)
+        self.quote_chars = frozenset(quote[0] for quote in spec.string_quotes)
+        self.raw_quotes = frozenset(spec.raw_quotes)
+        self.doubled_quote_escape = spec.doubled_quote_escape
+        self.string_opener = re.compile(_string_opener_pattern(spec))
+        # Raw string openers carry a delimiter of up to 16 characters
+        longest_opener = max(
+            [len(opener) for opener in self.comment_openers]
+            + [len(prefix) + len(quote) for prefix in spec.string_prefixes + ('',) for quote in spec.string_quotes]
+            + [21 if spec.delimited_raw_strings else 0]
+        )
+        self.identifier_start = '_' + spec.identifier_start
+        self.identifier_chars = '_' + spec.identifier_start + spec.identifier_chars
+        self.word_pattern = re.compile(r'[\w' + re.escape(self.identifier_chars) + ']+')
+        self.pattern = _scanner_pattern(spec)
+        # Byte lookup tables for the numpy engine: the runs (_RUN_* flags)
+        # each ASCII character continues, and the run a token starting with
+        # it must be (0 when strings, comments or longer operators may start
+        # there)
+        openers = self.comment_openers + tuple(spec.operators) + tuple(spec.delimiters) \
+            + tuple(spec.string_quotes) + tuple(spec.string_prefixes)
+        first_chars = {text[0] for text in openers}
+        if spec.delimited_raw_strings:
+            first_chars.update('uULR')
+        longer_first_chars = {text[0] for text in openers if len(text) > 1}
+        runs = bytearray(128)
+        starts = bytearray(128)
+        for code in range(128):
+            char = chr(code)
+            if char in ' \t\r\n':
+                runs[code] = starts[code] = _RUN_WS
+                continue
+            if char.isalnum() or char in self.identifier_chars:
+                runs[code] |= _RUN_WORD
+            if char.isdigit() or char == '.':
+                runs[code] |= _RUN_NUMBER
+            if char in first_chars:
+                if char not in longer_first_chars and not runs[code]:
+                    # A one-character operator or delimiter, whatever follows
+                    kinds = {
+                        (match.lastgroup, match.end())
+                        for match in map(self.pattern.match, (char + chr(follower) for follower in range(129)))
+                    }
+                    if kinds == {('OPERATOR', 1)}:
+                        starts[code] = _RUN_OPERATOR
+                    elif kinds == {('DELIMITER', 1)}:
+                        starts[code] = _RUN_DELIMITER
+                continue
+            if char.isdigit():
+                starts[code] = _RUN_NUMBER
+            elif char.isalpha() or char in self.identifier_start:
+                starts[code] = _RUN_WORD
+        self.ascii_runs = bytes(runs)
+        self.ascii_starts = bytes(starts)
+        # Characters a chunk boundary must leave unscanned so that operators,
+        # comment openers and string openers are not split
+        self.lookahead = max(self.operator_lengths + (longest_opener, 1))
+        # Strings and comments alone, for finding safe split points
+        self.boundary_pattern = re.compile('|'.join(_literal_patterns(spec, standalone=True)), re.DOTALL)
+        # That scan is exact only if no operator can swallow a quote or the
+        # start of a comment opener
+        self.splittable = not any(
+            quote in op for op in spec.operators for quote in self.quote_chars
+        ) and not any(
+            op[i:].startswith(prefix) or prefix.startswith(op[i:])
+            for op in spec.operators for prefix in self.comment_openers for i in range(1, len(op))
+        )
+    
+    def to_json(self) -> dict:
+        """The tables as JSON-serializable data for from_json"""
+        return {name: _encode_table(value) for name, value in vars(self).items()}
+    
+    @classmethod
+    def from_json(cls, data: dict) -> 'LexerTables':
+        """Rebuild tables from to_json data; ValueError if it is not such data"""
+        if not isinstance(data, dict):
+            raise ValueError('Lexer tables must be a JSON object')
+        tables = cls.__new__(cls)
+        tables.__dict__.update((str(name), _decode_table(value)) for name, value in data.items())
+        return tables
+
+
+def _encode_table(value):
+    """A LexerTables attribute as JSON: scalars as they are, anything else tagged with its type"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, re.Pattern):
+        return ['pattern', value.pattern, value.flags]
+    if isinstance(value, TypoIndex):
+        return ['typo_index', value.keywords, value.cutoff, value.memo_size]
+    if isinstance(value, bytes):
+        return ['bytes', value.decode('latin-1')]
+    if isinstance(value, frozenset):
+        return ['frozenset', sorted(value)]
+    if isinstance(value, tuple):
+        return ['tuple', [_encode_table(item) for item in value]]
+    raise TypeError(f'Cannot store {type(value).__name__} in the lexer tables cache')
+
+
+def _decode_table(value):
+    """Inverse of _encode_table; ValueError for anything it does not produce"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if not isinstance(value, list) or not value:
+        raise ValueError(f'Unexpected lexer tables value {value!r}')
+    tag, *fields = value
+    if tag == 'pattern' and len(fields) == 2 and isinstance(fields[0], str) and type(fields[1]) is int:
+        return re.compile(fields[0], fields[1])
+    if (tag == 'typo_index' and len(fields) == 3 and isinstance(fields[0], list)
+            and all(isinstance(keyword, str) for keyword in fields[0])):
+        return TypoIndex(fields[0], float(fields[1]), int(fields[2]))
+    if tag == 'bytes' and len(fields) == 1 and isinstance(fields[0], str):
+        return fields[0].encode('latin-1')
+    if tag == 'frozenset' and len(fields) == 1 and isinstance(fields[0], list):
+        return frozenset(_decode_table(item) for item in fields[0])
+    if tag == 'tuple' and len(fields) == 1 and isinstance(fields[0], list):
+        return tuple(_decode_table(item) for item in fields[0])
+    raise ValueError(f'Unexpected lexer tables value {value!r}')
+
+
+def lexer_tables(language: str) -> LexerTables:
+    """Compiled tables for a language name or alias (generic rules if unknown)"""
+    return _LEXER_TABLES.get(resolve_language(language), _LEXER_TABLES[GENERIC_SPEC.name])
+
+
+# Bump when LexerTables or the scanner pattern change shape
+TABLES_VERSION = 7
+
+
+def _tables_cache_path() -> str:
+    """Disk cache location, overridable with LEXER_TABLES_CACHE"""
+    return os.environ.get('LEXER_TABLES_CACHE') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'lexer_tables.json'
+    )
+
+
+def _tables_fingerprint() -> str:
+    """Hash of everything the compiled tables depend on"""
+    payload = repr((TABLES_VERSION, sys.version_info[:2], GENERIC_SPEC, sorted(LANGUAGE_SPECS.items())))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _load_lexer_tables() -> Dict[str, LexerTables]:
+    """
+    Load the compiled tables from the disk cache, rebuilding it when stale
+    
+    The cache is JSON: patterns are recompiled from their source and the
+    other tables rebuilt from plain values, so a tampered file can at worst
+    fail to load.
+    """
+    path = _tables_cache_path()
+    fingerprint = _tables_fingerprint()
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            cached = json.load(handle)
+        if cached['fingerprint'] == fingerprint:
+            return {str(name): LexerTables.from_json(data) for name, data in cached['tables'].items()}
+    except Exception:
+        pass  # Missing, stale or unreadable cache: rebuild below
+    
+    tables = {name: LexerTables(spec) for name, spec in LANGUAGE_SPECS.items()}
+    tables[GENERIC_SPEC.name] = LexerTables(GENERIC_SPEC)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump({'fingerprint': fingerprint, 'tables': {name: table.to_json() for name, table in tables.items()}},
+                      handle)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # A read-only install still works, it just rebuilds each start
+    return tables
+
+
+def _iter_chunks(source, chunk_size: int) -> Iterator[str]:
+    """Normalize a string, file object or chunk iterable into string chunks"""
+    if isinstance(source, str):
+        return iter((source,))
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(chunk_size), '')
+    return iter(source)
+
+
+def _next_line_start(text: str, pos: int) -> int:
+    """Offset of the first line starting at or after pos (past the end if none)"""
+    if pos == 0:
+        return 0
+    newline = text.find('\n', pos - 1)
+    return newline + 1 if newline >= 0 else len(text) + 1
+
+
+def _split_points(source: str, boundary_pattern, parts: int) -> List[int]:
+    """
+    Offsets cutting source into about parts pieces for parallel lexing
+    
+    Every inner point is a line start that is not inside a string literal;
+    boundary_pattern matches the strings and comments in scanning order.
+    The first point is 0 and the last is len(source).
+    """
+    length = len(source)
+    step = max(length // parts, 1)
+    points = [0]
+    candidate = _next_line_start(source, step)
+    for match in boundary_pattern.finditer(source):
+        while candidate <= match.start():
+            points.append(candidate)
+            candidate = _next_line_start(source, candidate + step)
+        if candidate < match.end():
+            candidate = _next_line_start(source, match.end())
+    while candidate < length:
+        points.append(candidate)
+        candidate = _next_line_start(source, candidate + step)
+    points.append(length)
+    return points
+
+
+def _lex_piece(piece: str, language: str) -> Tuple[bytes, List[dict]]:
+    """Process pool worker: lex one piece of a split source"""
+    buffer, errors = Lexer(piece, language).tokenize_buffer()
+    return buffer.to_bytes(), errors
+
+
+def _string_body(literal: str) -> Tuple[int, int]:
+    """Offsets of the contents of a Python string literal (prefix and quotes excluded)"""
+    prefix = len(literal) - len(literal.lstrip('rRbBuUfF'))
+    quote = 3 if literal.startswith(('"""', "'''"), prefix) else 1
+    return prefix + quote, len(literal) - quote
+
+
+def _scan_number_tail(text: str, pos: int) -> int:
+    """Return the end of a numeric literal using str.isdigit semantics"""
+    length = len(text)
+    while pos < length and (text[pos].isdigit() or text[pos] == '.'):
+        pos += 1
+    return pos
+
+
+def _string_opener_pattern(spec: LanguageSpec) -> str:
+    """Pattern matching the prefix and opening delimiter of a string literal"""
+    quotes = '|'.join(re.escape(quote) for quote in sorted(spec.string_quotes, key=len, reverse=True))
+    prefixes = sorted(spec.string_prefixes, key=len, reverse=True)
+    prefix = '(?P<PREFIX>' + '|'.join(re.escape(p) for p in prefixes) + ')?' if prefixes else ''
+    pattern = prefix + '(?P<QUOTE>' + quotes + ')'
+    if spec.delimited_raw_strings:
+        pattern = r'(?P<RAW>(?:u8|[uUL])?R)"(?P<DELIM>[^()\\ \t\r\n]{0,16})\(|' + pattern
+    return pattern
+
+
+def _string_delimiters(opener) -> Tuple[str, str]:
+    """Opening (prefix included) and closing delimiters for a string_opener match"""
+    if opener.lastgroup == 'QUOTE':
+        return opener.group(), opener.group('QUOTE')
+    return opener.group(), ')' + opener.group('DELIM') + '"'
+
+
+# Character runs found by the numpy engine, and start classes of
+# characters that are always a one-character operator or delimiter
+_RUN_WS, _RUN_WORD, _RUN_NUMBER = 1, 2, 4
+_RUN_OPERATOR, _RUN_DELIMITER = 8, 16
+
+
+def _numpy_runs(source: str, tables: LexerTables) -> Tuple[bytes, array, array, 'np.ndarray']:
+    """
+    Vectorized pre-scan of a source for the numpy engine
+    
+    Returns the token start class of every character (see
+    LexerTables.ascii_starts; 0 for non-ASCII ones), and for every
+    character of such a class the offset just past the whitespace,
+    identifier, number or one-character token starting there and that
+    offset moved past any whitespace that follows; then the offsets of all
+    newlines. An identifier or number run followed by a non-ASCII character
+    may continue through it, so it is left to the master pattern (class 0).
+    """
+    if source.isascii():
+        data = np.frombuffer(source.encode('ascii'), dtype=np.uint8)
+    else:
+        # One 32-bit code point per character keeps offsets in step with the str
+        data = np.minimum(np.frombuffer(source.encode('utf-32-le'), dtype=np.uint32), 128)
+    # Entry 128 stands for every non-ASCII character
+    starts = np.frombuffer(tables.ascii_starts + b'\0', dtype=np.uint8)[data]
+    runs = np.frombuffer(tables.ascii_runs + b'\0', dtype=np.uint8)[data]
+    ends = np.arange(len(data) + 1, dtype=np.int64)
+    for flag in (_RUN_WS, _RUN_WORD, _RUN_NUMBER):
+        inside = np.append((runs & flag) != 0, False)
+        # A run ends where a member is followed by a non-member
+        run_ends = np.flatnonzero(inside[:-1] & ~inside[1:]) + 1
+        heads = np.flatnonzero(starts == flag)
+        ends[heads] = run_ends[np.searchsorted(run_ends, heads, side='right')]
+    heads = np.flatnonzero((starts == _RUN_OPERATOR) | (starts == _RUN_DELIMITER))
+    ends[heads] += 1
+    if data.dtype == np.uint32:
+        ascii = np.append(data < 128, True)
+        heads = np.flatnonzero((starts == _RUN_WORD) | (starts == _RUN_NUMBER))
+        starts[heads[~ascii[ends[heads]]]] = 0
+    # Whitespace ends where it starts everywhere but inside whitespace
+    after_ws = np.where(np.append(starts == _RUN_WS, False), ends, np.arange(len(data) + 1))
+    token_ends, nexts = array('q'), array('q')
+    token_ends.frombytes(ends[:-1].tobytes())
+    nexts.frombytes(after_ws[ends[:-1]].tobytes())
+    return starts.tobytes(), token_ends, nexts, np.flatnonzero(data == 10)
+
+
+def _is_unexpected(match) -> bool:
+    """Whether a master pattern match at a position is an unexpected character"""
+    if match.lastgroup != 'OTHER':
+        return False
+    char = match.group()
+    return not (char.isdigit() or char.isalpha())
+
+
+def _literal_patterns(spec: LanguageSpec, standalone: bool = False) -> List[str]:
+    """
+    COMMENT, STRING and UNTERMINATED alternatives for one language
+    
+    standalone patterns are searched for without the rest of the scanner,
+    so a raw string prefix must not be the tail of an identifier: a WORD
+    alternative, tried after the strings like the scanner's IDENT rule,
+    consumes an identifier that ends in one.
+    """
+    comments = [re.escape(prefix) + r'[^\n]*' for prefix in sorted(set(spec.line_comments), key=len, reverse=True)]
+    comments += [re.escape(opener) + '.*?' + re.escape(closer) for opener, closer in spec.block_comments]
+    quotes = sorted(spec.string_quotes, key=len, reverse=True)
+    prefixes = sorted(spec.string_prefixes, key=len, reverse=True)
+    prefix = '(?:' + '|'.join(re.escape(p) for p in prefixes) + ')?' if prefixes else ''
+    
+    strings = []
+    if spec.delimited_raw_strings:
+        strings.append(r'(?:u8|[uUL])?R"(?P<RAW_DELIM>[^()\\ \t\r\n]{0,16})\(.*?\)(?P=RAW_DELIM)"')
+    for quote in quotes:
+        q = re.escape(quote)
+        # A quote never opens where a longer one starting with it does ('"' vs '"""')
+        longer = [re.escape(other[len(quote):]) for other in quotes
+                  if len(other) > len(quote) and other.startswith(quote)]
+        guard = '(?!' + '|'.join(longer) + ')' if longer else ''
+        if quote in spec.raw_quotes:
+            body = '.*?'
+        elif spec.doubled_quote_escape and len(quote) == 1:
+            body = '(?:[^' + q + ']|' + q + q + ')*' + q + '(?!' + q + ')'
+            strings.append(prefix + q + guard + body)
+            continue
+        elif len(quote) == 1:
+            body = '(?:[^' + q + r'\\]|\\.)*'
+        else:
+            body = r'(?:[^\\]|\\.)*?'
+        strings.append(prefix + q + guard + body + q)
+    
+    unterminated = [prefix + '(?:' + '|'.join(re.escape(quote) for quote in quotes) + ')']
+    if spec.delimited_raw_strings:
+        unterminated.insert(0, r'(?:u8|[uUL])?R"[^()\\ \t\r\n]{0,16}\(')
+    
+    parts = []
+    if comments:
+        parts.append('(?P<COMMENT>' + '|'.join(comments) + ')')
+    parts += [
+        '(?P<STRING>' + '|'.join(strings) + ')',
+        '(?P<UNTERMINATED>(?:' + '|'.join(unterminated) + ').*)',
+    ]
+    if spec.block_comments:
+        parts.append('(?P<UNCLOSED_COMMENT>(?:' + '|'.join(re.escape(opener) for opener, _ in spec.block_comments) + ').*)')
+    if standalone and spec.delimited_raw_strings:
+        # The scanner also starts an identifier at any letter outside ASCII
+        start, chars = _identifier_classes(spec)
+        letter = r'[^\W\d' + re.escape(_numeric_word_chars()) + ']'
+        parts.append('(?P<WORD>(?:' + start + '|' + letter + ')' + chars + r'*?(?:u8|[uUL])?R(?="))')
+    return parts
+
+
+def _identifier_classes(spec: LanguageSpec) -> Tuple[str, str]:
+    """Start and continuation character classes of the IDENT rule"""
+    extra_start = re.escape(spec.identifier_start)
+    extra_chars = re.escape(spec.identifier_start + spec.identifier_chars)
+    return '[A-Za-z_' + extra_start + ']', r'[\w' + extra_chars + ']'
+
+
+@lru_cache(maxsize=None)
+def _numeric_word_chars() -> str:
+    """Characters \\w matches that are neither letters nor \\d digits (², ½, Ⅻ)"""
+    return ''.join(char for char in map(chr, range(sys.maxunicode + 1))
+                   if char.isalnum() and not char.isalpha() and not char.isdecimal())
+
+
+def _scanner_pattern(spec: LanguageSpec):
+    """Build the master pattern used by the regex engine for one language"""
+    # Longest operators first so '==' wins over '='
+    operators = sorted(set(spec.operators), key=len, reverse=True)
+    
+    parts = [r'(?P<WS>[ \t\r\n]+)'] + _literal_patterns(spec) + [
+        r'(?P<NUMBER>[0-9][0-9.]*)',
+        r'(?P<IDENT>' + ''.join(_identifier_classes(spec)) + '*)',
+        r'(?P<OPERATOR>' + '|'.join(re.escape(op) for op in operators) + ')',
+        r'(?P<DELIMITER>[' + re.escape(''.join(spec.delimiters)) + '])',
+        r'(?P<OTHER>.)',
+    ]
+    return re.compile('|'.join(parts), re.DOTALL)
+
+
+_LEXER_TABLES = _load_lexer_tables()
+_NEWLINE_PATTERN = re.compile('\n')
+
+# Identifies the tokens and errors produced for a given source; bump the
+# revision whenever scanning behaviour changes (caches key on LEXER_VERSION)
+LEXER_REVISION = 2
+LEXER_VERSION = f'{LEXER_REVISION}.{_tables_fingerprint()[:12]}'
@@ -0,0 +1,445 @@
+"""
+Lexer Benchmark Suite
+Measures Lexer.tokenize throughput and memory on generated corpora for
+every supported language, and diffs runs against a saved JSON baseline
+
+Usage:
+    python lexer_benchmark.py --save lexer_baseline.json
+    python lexer_benchmark.py --compare lexer_baseline.json --threshold 0.1
+    python lexer_benchmark.py --speedup numpy --sizes 1MB,10MB --buffer
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from typing import Dict, List, Optional
+from lexer import Lexer, LEXER_VERSION, np
+from language_specs import LANGUAGE_SPECS
+
+SIZES = {
+    '1KB': 1 << 10,
+    '10KB': 10 << 10,
+    '100KB': 100 << 10,
+    '1MB': 1 << 20,
+    '10MB': 10 << 20
+}
+
+# Metrics checked for regressions (seconds and bytes_per_sec move with tokens_per_sec)
+HIGHER_IS_BETTER = ('tokens_per_sec',)
+LOWER_IS_BETTER = ('peak_memory_bytes', 'allocations_per_token')
+
+# Small but representative programs, repeated to build the realistic corpora
+REALISTIC_SAMPLES = {
+    'python': '''import math
+
+class Account:
+    """Bank account with interest"""
+    def __init__(self, owner, balance=0.0):
+        self.owner = owner
+        self.balance = balance  # current balance
+    
+    def deposit(self, amount):
+        if amount <= 0:
+            raise ValueError("amount must be positive")
+        self.balance += amount
+        return self.balance
+
+def compound(principal, rate, years):
+    return principal * math.pow(1 + rate / 100, years)
+
+for year in range(1, 11):
+    print(f"Year {year}: {compound(1000, 5, year):.2f}")
+''',
+    'java': '''import java.util.*;
+
+public class Main {
+    // Sum of squares of the even numbers
+    static int sumEvenSquares(List<Integer> values) {
+        int total = 0;
+        for (int value : values) {
+            if (value % 2 == 0) {
+                total += value * value;
+            }
+        }
+        return total;
+    }
+    
+    public static void main(String[] args) {
+        Scanner scanner = new Scanner(System.in);
+        List<Integer> values = new ArrayList<>();
+        for (int i = 0; i < 10; i++) values.add(i);
+        System.out.println("Result: " + sumEvenSquares(values));
+    }
+}
+''',
+    'c': '''#include <stdio.h>
+#include <stdlib.h>
+
+/* single linked list node */
+struct node { int value; struct node *next; };
+
+int sum(struct node *head) {
+    int total = 0;
+    while (head != NULL) { total += head->value; head = head->next; }
+    return total;
+}
+
+int main(void) {
+    struct node *head = NULL;
+    for (int i = 0; i < 10; i++) {
+        struct node *n = malloc(sizeof(struct node));
+        n->value = i << 1; n->next = head; head = n;
+    }
+    printf("sum = %d\\n", sum(head)); // done
+    return 0;
+}
+''',
+    'cpp': '''#include <iostream>
+#include <vector>
+using namespace std;
+
+template <typename T>
+T maxValue(const vector<T>& values) {
+    T best = values[0];
+    for (const auto& v : values) if (v > best) best = v;
+    return best;
+}
+
+int main() {
+    vector<int> data = {3, 1, 4, 1, 5, 9, 2, 6};
+    cout << "max: " << maxValue(data) << endl; // prints 9
+    return 0;
+}
+''',
+    'javascript': '''const readline = require('readline');
+
+// Fibonacci with memoization
+function fib(n, memo = {}) {
+    if (n <= 1) return n;
+    if (memo[n] !== undefined) return memo[n];
+    return (memo[n] = fib(n - 1, memo) + fib(n - 2, memo));
+}
+
+const values = [1, 2, 3].map((x) => x ** 2).filter((x) => x > 1);
+console.log(`fib(30) = ${fib(30)}`, values?.length ?? 0);
+''',
+    'typescript': '''interface Student {
+    name: string;
+    grade: number;
+}
+
+// Average grade of a class
+function average(students: Student[]): number {
+    const total = students.reduce((sum, s) => sum + s.grade, 0);
+    return students.length === 0 ? 0 : total / students.length;
+}
+
+const students: Student[] = [{ name: "Ada", grade: 91 }, { name: "Alan", grade: 84 }];
+console.log(`Average: ${average(students).toFixed(1)}`);
+''',
+    'go': '''package main
+
+import "fmt"
+
+// Grade keeps a student's score
+type Grade struct {
+    Name  string
+    Score int
+}
+
+func main() {
+    grades := []Grade{{"Ada", 91}, {"Alan", 84}}
+    total := 0
+    for _, g := range grades {
+        total += g.Score
+    }
+    ch := make(chan int, 1)
+    ch <- total
+    fmt.Printf("average: %d\\n", <-ch/len(grades))
+}
+''',
+    'php': '''<?php
+// Simple grade report
+function average(array $scores): float {
+    return count($scores) ? array_sum($scores) / count($scores) : 0.0;
+}
+
+$students = ['Ada' => [91, 88], 'Alan' => [84, 79]];
+foreach ($students as $name => $scores) {
+    $avg = average($scores);
+    echo "$name: " . number_format($avg, 1) . "\\n"; # report line
+}
+?>
+''',
+    'sql': '''-- Students and their grades
+CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT NOT NULL, grade REAL);
+INSERT INTO students (name, grade) VALUES ('Ada', 91.5), ('Alan', 84.0);
+SELECT name, grade
+FROM students
+WHERE grade >= 85 AND name <> 'Bob'
+ORDER BY grade DESC
+LIMIT 10;
+''',
+    'r': '''# Summary statistics of scores
+scores <- c(91, 84, 77, 68, 95)
+names(scores) <- c("Ada", "Alan", "Grace", "Linus", "Ken")
+passed <- scores[scores >= 70]
+report <- function(x) {
+  cat("mean:", mean(x), "\\n")
+  cat("max:", max(x), "\\n")
+}
+report(passed)
+high <- names(scores) %in% c("Ada", "Ken")
+'''
+}
+
+def synthetic_source(language: str, size: int, seed: int = 0) -> str:
+    """Random but lexically valid token soup drawn from the language spec"""
+    spec = LANGUAGE_SPECS[language]
+    rng = random.Random(seed)
+    words = list(spec.keywords) + list(spec.built_ins)
+    operators = list(spec.operators) or ['+']
+    delimiters = list(spec.delimiters) or [',']
+    quote = spec.string_quotes[0]
+    comment = spec.line_comments[0] if spec.line_comments else None
+    
+    parts = []
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.35:
+            part = rng.choice(words) if rng.random() < 0.4 else f'name_{rng.randrange(1000)}'
+        elif kind < 0.55:
+            part = rng.choice(operators)
+        elif kind < 0.7:
+            part = rng.choice(delimiters)
+        elif kind < 0.82:
+            part = str(rng.randrange(100000)) if rng.random() < 0.7 else f'{rng.random():.4f}'
+        elif kind < 0.9:
+            part = f'{quote}text {rng.randrange(1000)}{quote}'
+        elif kind < 0.93 and comment:
+            part = f'{comment} note {rng.randrange(1000)}\n'
+        else:
+            part = '\n' + '    ' * rng.randrange(3)
+        parts.append(part)
+        parts.append(' ')
+        length += len(part) + 1
+    return ''.join(parts)[:size]
+
+def realistic_source(language: str, size: int) -> str:
+    """The language's sample program repeated up to size characters"""
+    sample = REALISTIC_SAMPLES[language]
+    source = sample * (size // len(sample) + 1)
+    # Cut at a line break so the corpus does not end mid-token
+    cut = source.rfind('\n', 0, size)
+    return source[:cut + 1] if cut > 0 else source[:size]
+
+def measure(source: str, language: str, repeat: int = 3, engine: str = 'regex', buffer: bool = False) -> Dict:
+    """
+    Time Lexer.tokenize on source, then measure its memory in a separate run
+    
+    With buffer, Lexer.tokenize_buffer (what the compiler lexes with) is
+    measured instead.
+    """
+    best = None
+    tokens = 0
+    for _ in range(repeat):
+        lexer = Lexer(source, language, engine)
+        start = time.perf_counter()
+        token_list, _ = lexer.tokenize_buffer() if buffer else lexer.tokenize()
+        elapsed = time.perf_counter() - start
+        tokens = len(token_list)
+        best = elapsed if best is None else min(best, elapsed)
+        del lexer, token_list
+    
+    # tracemalloc slows lexing down, so memory is measured on its own run
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    lexer = Lexer(source, language, engine)
+    token_list, _ = lexer.tokenize_buffer() if buffer else lexer.tokenize()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    live_blocks = sys.getallocatedblocks() - blocks_before
+    del lexer, token_list
+    
+    size = len(source.encode('utf-8'))
+    best = max(best, 1e-9)
+    return {
+        'bytes': size,
+        'tokens': tokens,
+        'seconds': round(best, 6),
+        'tokens_per_sec': round(tokens / best, 1),
+        'bytes_per_sec': round(size / best, 1),
+        'peak_memory_bytes': peak,
+        # Blocks still allocated after tokenize(), i.e. what each token costs to keep
+        'allocations_per_token': round(live_blocks / max(tokens, 1), 3)
+    }
+
+def corpus_source(corpus: str, language: str, size: int) -> str:
+    """Source of the named corpus ('synthetic' or 'realistic')"""
+    if corpus == 'synthetic':
+        return synthetic_source(language, size)
+    return realistic_source(language, size)
+
+def run_suite(languages: List[str], sizes: List[str], corpora: List[str], repeat: int = 3,
+              verbose: bool = True, engine: str = 'regex', buffer: bool = False) -> Dict:
+    """Benchmark every (language, corpus, size) combination"""
+    results = {}
+    for language in languages:
+        for corpus in corpora:
+            for size_name in sizes:
+                size = SIZES[size_name]
+                source = corpus_source(corpus, language, size)
+                # Fewer repeats on the largest corpora keeps a full run practical
+                runs = repeat if size <= SIZES['1MB'] else 1
+                result = measure(source, language, runs, engine, buffer)
+                name = f'{language}/{corpus}/{size_name}'
+                results[name] = result
+                if verbose:
+                    print(f"{name:<30} {result['tokens_per_sec']:>12,.0f} tok/s "
+                          f"{result['bytes_per_sec'] / 1e6:>8.2f} MB/s "
+                          f"peak {result['peak_memory_bytes'] / 1e6:>8.2f} MB "
+                          f"{result['allocations_per_token']:>6.2f} alloc/tok")
+    
+    return {
+        'lexer_version': LEXER_VERSION,
+        'engine': engine,
+        'output': 'buffer' if buffer else 'tokens',
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+
+def speedup(languages: List[str], sizes: List[str], corpora: List[str], engine: str,
+            baseline_engine: str = 'regex', repeat: int = 3, verbose: bool = True, buffer: bool = False) -> Dict:
+    """
+    Throughput of engine relative to baseline_engine on the same corpora
+    
+    Speedups above 1 mean engine is faster. The token counts of both
+    engines must agree, which guards against timing a broken scan.
+    """
+    results = {}
+    for language in languages:
+        if engine == 'tokenize' and language != 'python':
+            continue
+        for corpus in corpora:
+            for size_name in sizes:
+                source = corpus_source(corpus, language, SIZES[size_name])
+                runs = repeat if SIZES[size_name] <= SIZES['1MB'] else 1
+                before = measure(source, language, runs, baseline_engine, buffer)
+                after = measure(source, language, runs, engine, buffer)
+                if before['tokens'] != after['tokens']:
+                    raise RuntimeError(f'{engine} and {baseline_engine} disagree on {language}/{corpus}/{size_name}')
+                name = f'{language}/{corpus}/{size_name}'
+                results[name] = {
+                    f'{baseline_engine}_tokens_per_sec': before['tokens_per_sec'],
+                    f'{engine}_tokens_per_sec': after['tokens_per_sec'],
+                    'speedup': round(before['seconds'] / max(after['seconds'], 1e-9), 2)
+                }
+                if verbose:
+                    print(f"{name:<30} {baseline_engine} {before['tokens_per_sec']:>12,.0f} tok/s "
+                          f"{engine} {after['tokens_per_sec']:>12,.0f} tok/s "
+                          f"x{results[name]['speedup']:.2f}")
+    return results
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Regressions of current against baseline
+    
+    A metric regresses when it is worse than the baseline by more than
+    threshold (0.1 = 10%). Only benchmarks present in both runs are compared.
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': f"{change * 100:+.1f}% worse"
+                })
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the lexer')
+    parser.add_argument('--languages', default=','.join(LANGUAGE_SPECS),
+                        help='comma separated languages (default: all)')
+    parser.add_argument('--sizes', default=','.join(SIZES),
+                        help='comma separated sizes out of ' + ', '.join(SIZES))
+    parser.add_argument('--corpora', default='synthetic,realistic',
+                        help='synthetic, realistic or both')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark (best is kept)')
+    parser.add_argument('--engine', default='regex', choices=Lexer.ENGINES, help='lexer engine to benchmark')
+    parser.add_argument('--speedup', metavar='ENGINE', choices=Lexer.ENGINES,
+                        help='only report the speedup of ENGINE over --engine')
+    parser.add_argument('--buffer', action='store_true',
+                        help='time tokenize_buffer(), which the compiler uses, instead of tokenize()')
+    parser.add_argument('--save', metavar='FILE', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='baseline JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown before a metric counts as regressed (default 0.1)')
+    args = parser.parse_args(argv)
+    if args.buffer and 'char' in (args.engine, args.speedup):
+        parser.error('the char engine has no TokenBuffer output')
+    
+    if args.speedup:
+        if args.speedup == 'numpy' and np is None:
+            print('NumPy is not installed; the numpy engine would only time the regex fallback')
+            return 1
+        speedup(
+            args.languages.split(','),
+            args.sizes.split(','),
+            args.corpora.split(','),
+            args.speedup,
+            args.engine,
+            args.repeat,
+            buffer=args.buffer
+        )
+        return 0
+    
+    current = run_suite(
+        args.languages.split(','),
+        args.sizes.split(','),
+        args.corpora.split(','),
+        args.repeat,
+        engine=args.engine,
+        buffer=args.buffer
+    )
+    
+    if args.save:
+        with open(args.save, 'w') as handle:
+            json.dump(current, handle, indent=2)
+        print(f"\nSaved baseline to {args.save}")
+    
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regressions beyond {args.threshold * 100:.0f}%:")
+            for regression in regressions:
+                print(f"  • {regression['benchmark']} {regression['metric']}: "
+                      f"{regression['baseline']} -> {regression['current']} ({regression['change']})")
+            return 1
+        print(f"\n✓ No regressions beyond {args.threshold * 100:.0f}% against {args.compare}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
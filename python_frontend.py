@@ -0,0 +1,857 @@
+"""
+Python Frontend
+Lowers Python source to three-address IR through the ast module
+"""
+
+import ast
+from typing import Any, Dict, List, Optional, Tuple
+from intermediate_representation import IRGenerator, IRInstruction, IROpCode, Scope, SymbolKind, ir_name, is_temp
+
+# Expressions whose evaluation can rebind a variable: calls run arbitrary
+# code and walruses assign (comprehension targets are temporaries)
+_REBINDING = (ast.Call, ast.NamedExpr)
+
+class PythonFrontend(IRGenerator):
+    """
+    Lowers a parsed Python module into IRInstructions in a single pass
+    
+    Expressions become three-address instructions over temporaries, control
+    flow becomes LABEL/JUMP/JUMP_IF_FALSE/JUMP_IF_TRUE and every function
+    (lambdas included) becomes a FUNC_BEGIN ... FUNC_END region after the
+    module code. Constructs the IR cannot express (classes, try, with, ...)
+    are kept as a NOP naming them and listed in self.unsupported. Each
+    function gets a scope in symbol_table, nested in the one it was
+    defined in, and names are bound by Python's rules once all are lowered.
+    """
+    
+    BINARY_OPS = {
+        ast.Add: IROpCode.ADD,
+        ast.Sub: IROpCode.SUB,
+        ast.Mult: IROpCode.MUL,
+        ast.Div: IROpCode.DIV,
+        ast.FloorDiv: IROpCode.FLOOR_DIV,
+        ast.Mod: IROpCode.MOD,
+        ast.Pow: IROpCode.POW,
+        ast.BitAnd: IROpCode.BIT_AND,
+        ast.BitOr: IROpCode.BIT_OR,
+        ast.BitXor: IROpCode.BIT_XOR,
+        ast.LShift: IROpCode.SHL,
+        ast.RShift: IROpCode.SHR
+    }
+    
+    # Augmented assignment -> the operator function running it in place
+    INPLACE_OPS = {
+        ast.Add: 'operator.iadd',
+        ast.Sub: 'operator.isub',
+        ast.Mult: 'operator.imul',
+        ast.Div: 'operator.itruediv',
+        ast.FloorDiv: 'operator.ifloordiv',
+        ast.Mod: 'operator.imod',
+        ast.Pow: 'operator.ipow',
+        ast.BitAnd: 'operator.iand',
+        ast.BitOr: 'operator.ior',
+        ast.BitXor: 'operator.ixor',
+        ast.LShift: 'operator.ilshift',
+        ast.RShift: 'operator.irshift'
+    }
+    
+    # Comparison operator -> (opcode, whether the result is negated)
+    COMPARE_OPS = {
+        ast.Eq: (IROpCode.EQ, False),
+        ast.NotEq: (IROpCode.NE, False),
+        ast.Lt: (IROpCode.LT, False),
+        ast.LtE: (IROpCode.LE, False),
+        ast.Gt: (IROpCode.GT, False),
+        ast.GtE: (IROpCode.GE, False),
+        ast.Is: (IROpCode.IS, False),
+        ast.IsNot: (IROpCode.IS, True),
+        ast.In: (IROpCode.IN, False),
+        ast.NotIn: (IROpCode.IN, True)
+    }
+    
+    # f-string conversions (!s, !r, !a)
+    CONVERSIONS = {115: 'str', 114: 'repr', 97: 'ascii'}
+    
+    def __init__(self):
+        super().__init__()
+        self.unsupported: List[Dict] = []
+        self._loops: List[Tuple[str, str]] = []  # (continue label, break label)
+        self._pending: List[Tuple[ast.AST, str, Scope]] = []
+        self._lambda_counter = 0
+        self._line = 0
+        # Names declared global or nonlocal anywhere, and the names of the
+        # scope being lowered that only ever hold numbers
+        self._shared = set()
+        self._numbers = set()
+        # Comprehension targets being lowered -> the temporaries holding them
+        self._renames: Dict[str, str] = {}
+        self._stmt_handlers = {
+            ast.Expr: self._expr_stmt,
+            ast.Assign: self._assign_stmt,
+            ast.AugAssign: self._aug_assign,
+            ast.AnnAssign: self._ann_assign,
+            ast.If: self._if,
+            ast.While: self._while,
+            ast.For: self._for,
+            ast.Break: self._break,
+            ast.Continue: self._continue,
+            ast.Return: self._return,
+            ast.FunctionDef: self._function_def,
+            ast.Import: self._import,
+            ast.ImportFrom: self._import_from,
+            ast.Try: self._try,
+            ast.With: self._with,
+            ast.ClassDef: self._class_def,
+            ast.Pass: self._nothing,
+            ast.Global: self._global,
+            ast.Nonlocal: self._nonlocal
+        }
+        self._expr_handlers = {
+            ast.Constant: self._constant,
+            ast.Name: self._name_load,
+            ast.BinOp: self._binary,
+            ast.UnaryOp: self._unary,
+            ast.BoolOp: self._bool_op,
+            ast.Compare: self._compare,
+            ast.IfExp: self._if_exp,
+            ast.Call: self._call,
+            ast.Attribute: self._attribute,
+            ast.Subscript: self._subscript,
+            ast.Slice: self._slice,
+            ast.List: self._display,
+            ast.Tuple: self._display,
+            ast.Set: self._display,
+            ast.Dict: self._dict,
+            ast.JoinedStr: self._joined_str,
+            ast.FormattedValue: self._formatted_value,
+            ast.NamedExpr: self._named_expr,
+            ast.Lambda: self._lambda,
+            ast.ListComp: self._comprehension,
+            ast.SetComp: self._comprehension,
+            ast.DictComp: self._comprehension,
+            ast.GeneratorExp: self._comprehension
+        }
+    
+    def generate_from_source(self, source: str, filename: str = '<source>') -> List[IRInstruction]:
+        """Parse and lower Python source; a SyntaxError propagates to the caller"""
+        return self.generate_from_ast(ast.parse(source, filename))
+    
+    def generate_from_ast(self, tree: ast.Module) -> List[IRInstruction]:
+        """Lower a parsed module: its code first, then one region per function"""
+        self.instructions = []
+        self.temp_counter = 0
+        self.label_counter = 0
+        self.unsupported = []
+        self._pending = []
+        self._lambda_counter = 0
+        self._renames = {}
+        self._reset_symbols()
+        self._shared = {name for node in ast.walk(tree) if isinstance(node, (ast.Global, ast.Nonlocal))
+                        for name in node.names}
+        self._numbers = _number_names(tree.body, self._shared)
+        
+        self._body(tree.body)
+        if self._pending:
+            self._emit(IROpCode.HALT, [])
+        # Nested functions are queued while their parent is lowered
+        index = 0
+        while index < len(self._pending):
+            self._function(*self._pending[index])
+            index += 1
+        self._bind_symbols(assignments_declare=True)
+        return self.instructions
+    
+    def _emit(self, opcode: IROpCode, operands: List[Any], result: Optional[str] = None) -> IRInstruction:
+        """Emit at the line of the statement being lowered"""
+        instruction = IRInstruction(opcode, operands, result, self._line)
+        self.instructions.append(instruction)
+        return instruction
+    
+    def _temp_op(self, opcode: IROpCode, operands: List[Any]) -> str:
+        """Emit an instruction into a fresh temporary and return it"""
+        temp = self.generate_temp()
+        self.instructions.append(IRInstruction(opcode, operands, temp, self._line))
+        return temp
+    
+    def _label(self, label: str):
+        self.instructions.append(IRInstruction(IROpCode.LABEL, [label], None, self._line))
+    
+    def _jump(self, label: str):
+        self.instructions.append(IRInstruction(IROpCode.JUMP, [label], None, self._line))
+    
+    @staticmethod
+    def _name(identifier: str) -> str:
+        """IR name of a Python identifier"""
+        return ir_name(identifier)
+    
+    @staticmethod
+    def _literal(value: Any) -> Any:
+        """Constant operand for a Python value (strings and bytes as their repr)"""
+        return repr(value) if isinstance(value, (str, bytes)) else value
+    
+    def _unsupported(self, node: ast.AST, construct: Optional[str] = None) -> Optional[str]:
+        """Record a construct the IR cannot express; expressions get an opaque NOP value"""
+        construct = construct or type(node).__name__
+        self.unsupported.append({'line': getattr(node, 'lineno', self._line), 'construct': construct})
+        if isinstance(node, ast.expr):
+            return self._temp_op(IROpCode.NOP, [construct])
+        self._emit(IROpCode.NOP, [construct])
+        return None
+    
+    def _body(self, statements: List[ast.stmt]):
+        handlers = self._stmt_handlers
+        for statement in statements:
+            self._line = statement.lineno
+            handler = handlers.get(type(statement))
+            if handler is None:
+                self._unsupported(statement)
+            else:
+                handler(statement)
+    
+    def _nothing(self, node: ast.stmt):
+        """Statements without runtime effect in the IR"""
+    
+    def _global(self, node: ast.Global):
+        for name in node.names:
+            self.symbol_table.bind_global(self._name(name))
+    
+    def _nonlocal(self, node: ast.Nonlocal):
+        self.symbol_table.scope.free.update(self._name(name) for name in node.names)
+    
+    def _expr_stmt(self, node: ast.Expr):
+        value = node.value
+        if isinstance(value, ast.Constant):
+            return  # Docstrings and bare literals do nothing
+        if (isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == 'print'
+                and not value.keywords and not any(isinstance(arg, ast.Starred) for arg in value.args)):
+            self._emit(IROpCode.PRINT, self._operands(value.args))
+            return
+        self._expr(value)
+    
+    def _assign_stmt(self, node: ast.Assign):
+        targets = node.targets
+        value = node.value
+        if (len(targets) == 1 and isinstance(targets[0], (ast.Tuple, ast.List))
+                and isinstance(value, (ast.Tuple, ast.List)) and len(targets[0].elts) == len(value.elts)
+                and not any(isinstance(elt, ast.Starred) for elt in targets[0].elts + value.elts)):
+            # a, b = b, a: every value is read before any target is written
+            operands = []
+            for elt in value.elts:
+                operand = self._expr(elt)
+                if isinstance(operand, str) and not is_temp(operand):
+                    operand = self._temp_op(IROpCode.STORE, [operand])
+                operands.append(operand)
+            for target, operand in zip(targets[0].elts, operands):
+                self._assign(target, operand)
+            return
+        
+        operand = self._expr(value)
+        for target in targets:
+            self._assign(target, operand, retarget=len(targets) == 1)
+    
+    def _assign(self, target: ast.expr, value: Any, retarget: bool = True):
+        """Store value into an assignment target"""
+        if isinstance(target, ast.Name):
+            name = self._renames.get(target.id) or self._name(target.id)
+            last = self.instructions[-1] if self.instructions else None
+            if retarget and last is not None and last.result == value and is_temp(value):
+                # The temporary was just computed for this assignment alone
+                last.result = name
+            else:
+                self._emit(IROpCode.STORE, [value], name)
+        elif isinstance(target, ast.Attribute):
+            obj = self._expr(target.value)
+            self._emit(IROpCode.SET_ATTR, [obj, repr(target.attr), value])
+        elif isinstance(target, ast.Subscript):
+            obj, index = self._operands([target.value, target.slice])
+            self._emit(IROpCode.SET_ITEM, [obj, index, value])
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            if any(isinstance(elt, ast.Starred) for elt in target.elts):
+                self._unsupported(target, 'starred assignment')
+                return
+            for index, elt in enumerate(target.elts):
+                self._assign(elt, self._temp_op(IROpCode.GET_ITEM, [value, index]))
+        else:
+            self._unsupported(target, f'{type(target).__name__} target')
+    
+    def _aug_assign(self, node: ast.AugAssign):
+        """
+        A name that only ever holds numbers gets the plain operation; any
+        other target is updated in place (x += [3] extends the list x, which
+        its aliases see) by a CALL of the operator module's function
+        """
+        inplace = self.INPLACE_OPS.get(type(node.op))
+        if inplace is None:
+            self._unsupported(node, type(node.op).__name__)
+            return
+        target = node.target
+        if isinstance(target, ast.Name):
+            name = self._name(target.id)
+            current = self._operands([target], (node.value,))[0]
+            if target.id in self._numbers:
+                self._emit(self.BINARY_OPS[type(node.op)], [current, self._expr(node.value)], name)
+            else:
+                self._emit(IROpCode.CALL, [inplace, current, self._expr(node.value)], name)
+        elif isinstance(target, ast.Attribute):
+            obj = self._operands([target.value], (node.value,))[0]
+            attr = repr(target.attr)
+            current = self._temp_op(IROpCode.GET_ATTR, [obj, attr])
+            updated = self._temp_op(IROpCode.CALL, [inplace, current, self._expr(node.value)])
+            self._emit(IROpCode.SET_ATTR, [obj, attr, updated])
+        elif isinstance(target, ast.Subscript):
+            obj, index = self._operands([target.value, target.slice], (node.value,))
+            current = self._temp_op(IROpCode.GET_ITEM, [obj, index])
+            updated = self._temp_op(IROpCode.CALL, [inplace, current, self._expr(node.value)])
+            self._emit(IROpCode.SET_ITEM, [obj, index, updated])
+        else:
+            self._unsupported(node)
+    
+    def _ann_assign(self, node: ast.AnnAssign):
+        if node.value is not None:
+            self._assign(node.target, self._expr(node.value))
+    
+    def _if(self, node: ast.If):
+        else_label = self.generate_label()
+        self._branch(node.test, else_label, False)
+        self._body(node.body)
+        if node.orelse:
+            end_label = self.generate_label()
+            if not self._ends_in_jump():
+                self._jump(end_label)
+            self._label(else_label)
+            self._body(node.orelse)
+            self._label(end_label)
+        else:
+            self._label(else_label)
+    
+    def _while(self, node: ast.While):
+        start_label = self.generate_label()
+        end_label = self.generate_label()
+        else_label = self.generate_label() if node.orelse else end_label
+        self._label(start_label)
+        self._branch(node.test, else_label, False)
+        self._loop_body(node.body, start_label, end_label)
+        self._jump(start_label)
+        if node.orelse:
+            self._label(else_label)
+            self._body(node.orelse)
+        self._label(end_label)
+    
+    def _for(self, node: ast.For):
+        if self._for_range(node):
+            return
+        iterator = self._temp_op(IROpCode.GET_ITER, [self._expr(node.iter)])
+        start_label = self.generate_label()
+        end_label = self.generate_label()
+        else_label = self.generate_label() if node.orelse else end_label
+        self._label(start_label)
+        item = self._temp_op(IROpCode.FOR_ITER, [iterator, else_label])
+        self._assign(node.target, item)
+        self._loop_body(node.body, start_label, end_label)
+        self._jump(start_label)
+        if node.orelse:
+            self._label(else_label)
+            self._body(node.orelse)
+        self._label(end_label)
+    
+    def _for_range(self, node: ast.For) -> bool:
+        """Lower 'for name in range(...)' with a constant step as a counted loop"""
+        call = node.iter
+        if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == 'range'
+                and 1 <= len(call.args) <= 3 and not call.keywords and isinstance(node.target, ast.Name)
+                and not any(isinstance(arg, ast.Starred) for arg in call.args)):
+            return False
+        step = _constant_int(call.args[2]) if len(call.args) == 3 else 1
+        if not step:
+            return False
+        
+        start = self._expr(call.args[0]) if len(call.args) > 1 else 0
+        stop = self._expr(call.args[1] if len(call.args) > 1 else call.args[0])
+        if isinstance(stop, str) and not is_temp(stop):
+            # range() reads its bounds once
+            stop = self._temp_op(IROpCode.STORE, [stop])
+        counter = self._temp_op(IROpCode.STORE, [start])
+        
+        start_label = self.generate_label()
+        next_label = self.generate_label()
+        end_label = self.generate_label()
+        else_label = self.generate_label() if node.orelse else end_label
+        self._label(start_label)
+        in_range = self._temp_op(IROpCode.LT if step > 0 else IROpCode.GT, [counter, stop])
+        self._emit(IROpCode.JUMP_IF_FALSE, [in_range, else_label])
+        self._emit(IROpCode.STORE, [counter], self._name(node.target.id))
+        self._loop_body(node.body, next_label, end_label)
+        self._label(next_label)
+        self._emit(IROpCode.ADD, [counter, step], counter)
+        self._jump(start_label)
+        if node.orelse:
+            self._label(else_label)
+            self._body(node.orelse)
+        self._label(end_label)
+        return True
+    
+    def _loop_body(self, body: List[ast.stmt], continue_label: str, break_label: str):
+        self._loops.append((continue_label, break_label))
+        self._body(body)
+        self._loops.pop()
+    
+    def _break(self, node: ast.Break):
+        if not self._loops:
+            self._unsupported(node, "'break' outside loop")
+        else:
+            self._jump(self._loops[-1][1])
+    
+    def _continue(self, node: ast.Continue):
+        if not self._loops:
+            self._unsupported(node, "'continue' outside loop")
+        else:
+            self._jump(self._loops[-1][0])
+    
+    def _return(self, node: ast.Return):
+        if node.value is None:
+            self._emit(IROpCode.RETURN, [])
+        else:
+            self._emit(IROpCode.RETURN, [self._expr(node.value)])
+    
+    def _function_def(self, node: ast.FunctionDef):
+        name = self._name(node.name)
+        self.symbol_table.declare(name, SymbolKind.FUNCTION)
+        self._pending.append((node, name, self.symbol_table.scope))
+        if node.decorator_list:
+            # The name holds whatever the decorators return, not the function lowered here
+            self._emit(IROpCode.STORE, [self._unsupported(node.decorator_list[0], 'decorator')], name)
+    
+    def _function(self, node, name: str, parent: Scope):
+        """Lower one function (or lambda) body into its own region, in a scope nested in parent"""
+        self._line = node.lineno
+        self._loops = []
+        self._begin_scope(name, parent)
+        self._emit(IROpCode.FUNC_BEGIN, [name])
+        
+        args = node.args
+        body = [node.body] if isinstance(node, ast.Lambda) else node.body
+        self._numbers = _number_names(body, self._shared,
+                                      frozenset(arg.arg for arg in ast.walk(args) if isinstance(arg, ast.arg)))
+        positional = args.posonlyargs + args.args
+        defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+        params = [(arg, default, None) for arg, default in zip(positional, defaults)]
+        if args.vararg:
+            params.append((args.vararg, None, '*'))
+        params += [(arg, default, None) for arg, default in zip(args.kwonlyargs, args.kw_defaults)]
+        if args.kwarg:
+            params.append((args.kwarg, None, '**'))
+        for index, (arg, default, marker) in enumerate(params):
+            operands = [index]
+            if marker:
+                operands.append(marker)
+            elif isinstance(default, ast.Constant):
+                operands.append(self._literal(default.value))
+            elif default is not None:
+                self._unsupported(default, 'non-constant default')
+            self._emit(IROpCode.PARAM, operands, self._name(arg.arg))
+        
+        if isinstance(node, ast.Lambda):
+            self._emit(IROpCode.RETURN, [self._expr(node.body)])
+        else:
+            self._body(node.body)
+            if not self.instructions or self.instructions[-1].opcode != IROpCode.RETURN:
+                self._emit(IROpCode.RETURN, [])
+        self._emit(IROpCode.FUNC_END, [name])
+        self._end_scope()
+    
+    def _class_def(self, node: ast.ClassDef):
+        """Classes have no IR form, but their methods are lowered as 'Class.method'"""
+        self._unsupported(node)
+        for statement in node.body:
+            if isinstance(statement, ast.FunctionDef):
+                self._pending.append((statement, f'{self._name(node.name)}.{statement.name}', self.symbol_table.scope))
+    
+    def _try(self, node: ast.Try):
+        """The IR has no exception edges: handlers are recorded, the other blocks run in order"""
+        self._body(node.body)
+        for handler in node.handlers:
+            self._line = handler.lineno
+            self._unsupported(handler, 'except handler')
+        self._body(node.orelse)
+        self._body(node.finalbody)
+    
+    def _with(self, node: ast.With):
+        """Context managers are entered and exited around the body (exceptional exits are not modelled)"""
+        managers = []
+        for item in node.items:
+            manager = self._expr(item.context_expr)
+            enter = self._temp_op(IROpCode.GET_ATTR, [manager, "'__enter__'"])
+            value = self._temp_op(IROpCode.CALL, [enter])
+            if item.optional_vars is not None:
+                self._assign(item.optional_vars, value)
+            managers.append(manager)
+        self._body(node.body)
+        for manager in reversed(managers):
+            exit_ = self._temp_op(IROpCode.GET_ATTR, [manager, "'__exit__'"])
+            self._temp_op(IROpCode.CALL, [exit_, None, None, None])
+    
+    def _import(self, node: ast.Import):
+        for alias in node.names:
+            module = self._temp_op(IROpCode.CALL, ['__import__', repr(alias.name)])
+            if alias.asname:
+                # __import__ returns the top-level package
+                for part in alias.name.split('.')[1:]:
+                    module = self._temp_op(IROpCode.GET_ATTR, [module, repr(part)])
+                self._emit(IROpCode.STORE, [module], self._name(alias.asname))
+            else:
+                self._emit(IROpCode.STORE, [module], self._name(alias.name.split('.')[0]))
+    
+    def _import_from(self, node: ast.ImportFrom):
+        if node.level or any(alias.name == '*' for alias in node.names):
+            self._unsupported(node, 'relative or star import')
+            return
+        module = self._temp_op(IROpCode.CALL, ['__import__', repr(node.module)])
+        for part in node.module.split('.')[1:]:
+            module = self._temp_op(IROpCode.GET_ATTR, [module, repr(part)])
+        for alias in node.names:
+            self._emit(IROpCode.GET_ATTR, [module, repr(alias.name)], self._name(alias.asname or alias.name))
+    
+    def _ends_in_jump(self) -> bool:
+        """Whether the last instruction never falls through"""
+        return bool(self.instructions) and self.instructions[-1].opcode in (IROpCode.JUMP, IROpCode.RETURN)
+    
+    def _branch(self, test: ast.expr, label: str, jump_if: bool):
+        """Jump to label when test is truthy (jump_if) or falsy, else fall through"""
+        if isinstance(test, ast.BoolOp):
+            if isinstance(test.op, ast.And) != jump_if:
+                # 'and' fails, or 'or' succeeds, as soon as one operand does
+                for value in test.values:
+                    self._branch(value, label, jump_if)
+            else:
+                skip = self.generate_label()
+                for value in test.values[:-1]:
+                    self._branch(value, skip, not jump_if)
+                self._branch(test.values[-1], label, jump_if)
+                self._label(skip)
+        elif isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+            self._branch(test.operand, label, not jump_if)
+        elif isinstance(test, ast.Constant):
+            if bool(test.value) == jump_if:
+                self._jump(label)
+        else:
+            value = self._expr(test)
+            self._emit(IROpCode.JUMP_IF_TRUE if jump_if else IROpCode.JUMP_IF_FALSE, [value, label])
+    
+    def _expr(self, node: ast.expr) -> Any:
+        """Lower an expression and return the operand holding its value"""
+        handler = self._expr_handlers.get(type(node))
+        if handler is None:
+            return self._unsupported(node)
+        return handler(node)
+    
+    def _operands(self, nodes: List[ast.expr], later: Tuple[ast.expr, ...] = ()) -> List[Any]:
+        """
+        Lower sibling expressions left to right
+        
+        A variable operand is only read when its instruction runs, so one
+        that a later sibling (or a node of later, evaluated afterwards)
+        may rebind is copied into a temporary first.
+        """
+        if not any(isinstance(node, (ast.Name, ast.NamedExpr)) for node in nodes):
+            return [self._expr(node) for node in nodes]
+        # Whether anything after each node may rebind a variable
+        held = []
+        rebinds = any(_may_rebind(node) for node in later)
+        for node in reversed(nodes):
+            held.append(rebinds)
+            rebinds = rebinds or _may_rebind(node)
+        operands = []
+        for node, hold in zip(nodes, reversed(held)):
+            operand = self._expr(node)
+            if hold and isinstance(node, (ast.Name, ast.NamedExpr)):
+                operand = self._temp_op(IROpCode.STORE, [operand])
+            operands.append(operand)
+        return operands
+    
+    def _constant(self, node: ast.Constant) -> str:
+        return self._temp_op(IROpCode.LOAD_CONST, [self._literal(node.value)])
+    
+    def _name_load(self, node: ast.Name) -> str:
+        return self._renames.get(node.id) or self._name(node.id)
+    
+    def _binary(self, node: ast.BinOp) -> str:
+        opcode = self.BINARY_OPS.get(type(node.op))
+        if opcode is None:
+            return self._unsupported(node, type(node.op).__name__)
+        return self._temp_op(opcode, self._operands([node.left, node.right]))
+    
+    def _unary(self, node: ast.UnaryOp) -> str:
+        operand = self._expr(node.operand)
+        op = type(node.op)
+        if op is ast.USub:
+            return self._temp_op(IROpCode.NEG, [operand])
+        if op is ast.Not:
+            return self._temp_op(IROpCode.NOT, [operand])
+        if op is ast.Invert:
+            return self._temp_op(IROpCode.BIT_XOR, [operand, -1])
+        return self._temp_op(IROpCode.ADD, [0, operand])
+    
+    def _bool_op(self, node: ast.BoolOp) -> str:
+        """Short-circuit 'and'/'or' yielding the deciding operand"""
+        jump = IROpCode.JUMP_IF_FALSE if isinstance(node.op, ast.And) else IROpCode.JUMP_IF_TRUE
+        result = self.generate_temp()
+        end_label = self.generate_label()
+        self._emit(IROpCode.STORE, [self._expr(node.values[0])], result)
+        for value in node.values[1:]:
+            self._emit(jump, [result, end_label])
+            self._emit(IROpCode.STORE, [self._expr(value)], result)
+        self._label(end_label)
+        return result
+    
+    def _compare(self, node: ast.Compare) -> str:
+        """Comparisons; a chain stops at the first false link like Python does"""
+        left = self._operands([node.left], tuple(node.comparators))[0]
+        result = self.generate_temp()
+        end_label = self.generate_label() if len(node.ops) > 1 else None
+        for index, (op, comparator) in enumerate(zip(node.ops, node.comparators)):
+            right = self._operands([comparator], tuple(node.comparators[index + 1:]))[0]
+            opcode, negated = self.COMPARE_OPS[type(op)]
+            if negated:
+                self._emit(IROpCode.NOT, [self._temp_op(opcode, [left, right])], result)
+            else:
+                self._emit(opcode, [left, right], result)
+            if end_label and index < len(node.ops) - 1:
+                self._emit(IROpCode.JUMP_IF_FALSE, [result, end_label])
+            left = right
+        if end_label:
+            self._label(end_label)
+        return result
+    
+    def _if_exp(self, node: ast.IfExp) -> str:
+        result = self.generate_temp()
+        else_label = self.generate_label()
+        end_label = self.generate_label()
+        self._branch(node.test, else_label, False)
+        self._emit(IROpCode.STORE, [self._expr(node.body)], result)
+        self._jump(end_label)
+        self._label(else_label)
+        self._emit(IROpCode.STORE, [self._expr(node.orelse)], result)
+        self._label(end_label)
+        return result
+    
+    def _call(self, node: ast.Call) -> str:
+        """CALL [callee, args...]; '*' and '**' mark unpacked arguments"""
+        args = [arg.value if isinstance(arg, ast.Starred) else arg for arg in node.args]
+        values = self._operands([node.func] + args + [keyword.value for keyword in node.keywords])
+        operands = [values[0]]
+        for arg, value in zip(node.args, values[1:]):
+            if isinstance(arg, ast.Starred):
+                operands += ['*', value]
+            else:
+                operands.append(value)
+        named = []
+        for keyword, value in zip(node.keywords, values[1 + len(args):]):
+            if keyword.arg is None:
+                operands += ['**', value]
+            else:
+                named += [repr(keyword.arg), value]
+        if named:
+            operands += ['**', self._temp_op(IROpCode.BUILD_DICT, named)]
+        return self._temp_op(IROpCode.CALL, operands)
+    
+    def _attribute(self, node: ast.Attribute) -> str:
+        return self._temp_op(IROpCode.GET_ATTR, [self._expr(node.value), repr(node.attr)])
+    
+    def _subscript(self, node: ast.Subscript) -> str:
+        return self._temp_op(IROpCode.GET_ITEM, self._operands([node.value, node.slice]))
+    
+    def _slice(self, node: ast.Slice) -> str:
+        parts = [part for part in (node.lower, node.upper, node.step) if part is not None]
+        values = iter(self._operands(parts))
+        bounds = [None if part is None else next(values) for part in (node.lower, node.upper, node.step)]
+        return self._temp_op(IROpCode.CALL, ['slice'] + bounds)
+    
+    def _display(self, node) -> str:
+        """List, tuple and set displays"""
+        if any(isinstance(elt, ast.Starred) for elt in node.elts):
+            return self._unsupported(node, 'starred display')
+        opcode = {ast.List: IROpCode.BUILD_LIST, ast.Tuple: IROpCode.BUILD_TUPLE, ast.Set: IROpCode.BUILD_SET}
+        return self._temp_op(opcode[type(node)], self._operands(node.elts))
+    
+    def _dict(self, node: ast.Dict) -> str:
+        if any(key is None for key in node.keys):
+            return self._unsupported(node, 'dict unpacking')
+        pairs = [part for key, value in zip(node.keys, node.values) for part in (key, value)]
+        return self._temp_op(IROpCode.BUILD_DICT, self._operands(pairs))
+    
+    def _joined_str(self, node: ast.JoinedStr) -> str:
+        """f-strings concatenate their literal parts and formatted values"""
+        parts = [self._expr(value) for value in node.values]
+        if not parts:
+            return self._temp_op(IROpCode.LOAD_CONST, ["''"])
+        result = parts[0]
+        for part in parts[1:]:
+            result = self._temp_op(IROpCode.ADD, [result, part])
+        return result
+    
+    def _formatted_value(self, node: ast.FormattedValue) -> str:
+        value = self._expr(node.value)
+        if node.conversion in self.CONVERSIONS:
+            value = self._temp_op(IROpCode.CALL, [self.CONVERSIONS[node.conversion], value])
+        operands = ['format', value]
+        if node.format_spec is not None:
+            operands.append(self._expr(node.format_spec))
+        return self._temp_op(IROpCode.CALL, operands)
+    
+    def _named_expr(self, node: ast.NamedExpr) -> str:
+        name = self._name(node.target.id)
+        self._emit(IROpCode.STORE, [self._expr(node.value)], name)
+        return name
+    
+    def _lambda(self, node: ast.Lambda) -> str:
+        name = f'<lambda{self._lambda_counter}>'
+        self._lambda_counter += 1
+        self.symbol_table.declare(name, SymbolKind.FUNCTION)
+        self._pending.append((node, name, self.symbol_table.scope))
+        return name
+    
+    def _comprehension(self, node) -> str:
+        """
+        Comprehensions become loops appending to a fresh container
+        
+        Generator expressions are evaluated eagerly into a list. The loop
+        variables live in the comprehension's own scope, so they are fresh
+        temporaries; a lambda closing over one has no IR form.
+        """
+        targets = {child.id for generator in node.generators for child in ast.walk(generator.target)
+                   if isinstance(child, ast.Name)}
+        if any(isinstance(child, ast.Name) and child.id in targets
+               for lambda_ in ast.walk(node) if isinstance(lambda_, ast.Lambda) for child in ast.walk(lambda_.body)):
+            return self._unsupported(node, 'lambda over a comprehension variable')
+        
+        if isinstance(node, ast.DictComp):
+            result = self._temp_op(IROpCode.BUILD_DICT, [])
+            add = None
+        else:
+            is_set = isinstance(node, ast.SetComp)
+            result = self._temp_op(IROpCode.BUILD_SET if is_set else IROpCode.BUILD_LIST, [])
+            add = self._temp_op(IROpCode.GET_ATTR, [result, "'add'" if is_set else "'append'"])
+        
+        loops = []
+        outer_renames = self._renames
+        for generator in node.generators:
+            if generator.is_async:
+                self._unsupported(node, 'async comprehension')
+            # The first iterable is evaluated in the enclosing scope
+            iterator = self._temp_op(IROpCode.GET_ITER, [self._expr(generator.iter)])
+            if self._renames is outer_renames:
+                self._renames = dict(outer_renames)
+                self._renames.update((target, self.generate_temp()) for target in sorted(targets))
+            start_label = self.generate_label()
+            end_label = self.generate_label()
+            self._label(start_label)
+            self._assign(generator.target, self._temp_op(IROpCode.FOR_ITER, [iterator, end_label]))
+            for condition in generator.ifs:
+                self._branch(condition, start_label, False)
+            loops.append((start_label, end_label))
+        
+        if add is None:
+            key = self._expr(node.key)
+            self._emit(IROpCode.SET_ITEM, [result, key, self._expr(node.value)])
+        else:
+            self._temp_op(IROpCode.CALL, [add, self._expr(node.elt)])
+        for start_label, end_label in reversed(loops):
+            self._jump(start_label)
+            self._label(end_label)
+        self._renames = outer_renames
+        
+        if isinstance(node, ast.GeneratorExp):
+            return self._temp_op(IROpCode.GET_ITER, [result])
+        return result
+
+def _may_rebind(node: ast.expr) -> bool:
+    """Whether evaluating node may assign a variable: it calls, or binds names itself"""
+    return any(isinstance(child, _REBINDING) for child in ast.walk(node))
+
+def _constant_int(node: ast.expr) -> Optional[int]:
+    """Value of an integer literal, possibly negated, else None"""
+    negate = False
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        negate, node = True, node.operand
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return -node.value if negate else node.value
+    return None
+
+def _is_range_call(node: ast.expr) -> bool:
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range'
+            and not node.keywords)
+
+def _scope_nodes(roots: List[ast.AST]):
+    """Nodes evaluated in the scope of roots: the bodies of nested functions and classes are not"""
+    pending = list(roots)
+    while pending:
+        node = pending.pop()
+        yield node
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            pending += node.args.defaults + [default for default in node.args.kw_defaults if default is not None]
+            pending += getattr(node, 'decorator_list', [])
+        elif isinstance(node, ast.ClassDef):
+            pending += node.decorator_list + node.bases + [keyword.value for keyword in node.keywords]
+        else:
+            pending += ast.iter_child_nodes(node)
+
+def _number_names(roots: List[ast.AST], shared: set, params: frozenset = frozenset()) -> set:
+    """
+    Names bound in the scope of roots that only ever hold numbers
+    
+    Every binding must be a numeric literal, a range() loop counter or
+    arithmetic on such values. Parameters and names another scope may
+    rebind (global, nonlocal) never count.
+    """
+    bindings = []  # (name, value node, or None for a value of unknown type)
+    named = set()
+    excluded = set(shared) | set(params)
+    for node in _scope_nodes(roots):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            bindings.append((node.targets[0].id, node.value))
+            named.add(id(node.targets[0]))
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            bindings.append((node.target.id, node.value))
+            named.add(id(node.target))
+        elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            bindings.append((node.target.id, ast.BinOp(ast.Name(node.target.id), node.op, node.value)))
+            named.add(id(node.target))
+        elif isinstance(node, ast.NamedExpr):
+            bindings.append((node.target.id, node.value))
+            named.add(id(node.target))
+        elif isinstance(node, ast.For) and isinstance(node.target, ast.Name) and _is_range_call(node.iter):
+            bindings.append((node.target.id, ast.Constant(0)))
+            named.add(id(node.target))
+        elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load) and id(node) not in named:
+            bindings.append((node.id, None))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            excluded.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            excluded.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            excluded.add(node.name)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            excluded.add(node.name)
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            excluded.add(node.rest)
+    numbers = {name for name, _ in bindings} - excluded
+    changed = True
+    while changed:
+        changed = False
+        for name, value in bindings:
+            if name in numbers and not _is_number(value, numbers):
+                numbers.discard(name)
+                changed = True
+    return numbers
+
+def _is_number(node: Optional[ast.expr], numbers: set) -> bool:
+    """Whether node evaluates to a number when the names in numbers hold numbers"""
+    if isinstance(node, ast.Constant):
+        return type(node.value) in (bool, int, float, complex)
+    if isinstance(node, ast.Name):
+        return node.id in numbers
+    if isinstance(node, ast.UnaryOp):
+        return _is_number(node.operand, numbers)
+    if isinstance(node, ast.BinOp):
+        return _is_number(node.left, numbers) and _is_number(node.right, numbers)
+    return False
@@ -0,0 +1,31 @@
+"""
+Error handler regression tests
+The Python structure check reads the tokens the lexer already produced, in
+whichever form the caller has them
+"""
+
+import pytest
+from ai_error_handler import AIErrorHandler
+from lexer import Lexer
+
+def warnings(source: str, form: str):
+    lexer = Lexer(source, 'python')
+    if form == 'buffer':
+        tokens, errors = lexer.tokenize_buffer()
+    elif form == 'list':
+        tokens, errors = lexer.tokenize()
+    else:
+        tokens, errors = lexer.iter_tokens(), []
+    result = AIErrorHandler('python').analyze_errors(source, tokens, errors)
+    return [(warning['type'], warning['line']) for warning in result['warnings']]
+
+@pytest.mark.parametrize('form', ['buffer', 'list', 'iterator'])
+@pytest.mark.parametrize('source, expected', [
+    ('if x\n    y = 1\n', [('missing_colon', 1)]),
+    ('def f():\nreturn 1\n', [('indentation', 2)]),
+    ('x = (1,\n     2)\nif x:\n    pass\n', []),
+    ('for i in (1,\n          2):\n    pass\n', []),
+    ('x = 1 + \\\n    2\nwhile x:\n    x = 0\n', []),
+])
+def test_structure_warnings(source, expected, form):
+    assert warnings(source, form) == expected
@@ -0,0 +1,81 @@
+"""
+API server regression tests
+Incremental lexing through /api/tokenize: bad edits are refused and
+documents stay private to the session that opened them
+"""
+
+import pytest
+
+pytest.importorskip('flask')
+import api_server
+from lexer import Lexer
+
+SOURCE = 'x = 1\n'
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api_server, 'lex_documents', api_server.LexDocuments())
+    return api_server.app.test_client()
+
+def tokenize(client, **body):
+    return client.post('/api/tokenize', json=body)
+
+def test_edit_relexes_the_document(client):
+    assert tokenize(client, document_id='a', language='python', code=SOURCE).status_code == 200
+    response = tokenize(client, document_id='a', edit={'offset': 4, 'deleted': 1, 'inserted': 'foo'})
+    assert response.status_code == 200
+    assert response.get_json()['tokens'] == Lexer('x = foo\n', 'python').tokenize_buffer()[0].to_dicts()
+
+@pytest.mark.parametrize('edit', [
+    {'offset': 100, 'deleted': 0, 'inserted': 'y'},
+    {'offset': -3, 'deleted': 0, 'inserted': 'y'},
+    {'offset': 0, 'deleted': -5, 'inserted': 'y'},
+    {'offset': 4, 'deleted': 3, 'inserted': ''},
+    {'offset': 'four', 'deleted': 0},
+    {'offset': 1.5, 'deleted': 0},
+    {'offset': 0, 'deleted': 0, 'inserted': 7},
+    'not an edit',
+])
+def test_bad_edits_are_refused(client, edit):
+    tokenize(client, document_id='a', language='python', code=SOURCE)
+    response = tokenize(client, document_id='a', edit=edit)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    # The document is unchanged
+    response = tokenize(client, document_id='a', edit={'offset': 0, 'deleted': 0, 'inserted': ''})
+    assert response.get_json()['tokens'] == Lexer(SOURCE, 'python').tokenize_buffer()[0].to_dicts()
+
+@pytest.mark.parametrize('body', [
+    {'document_id': ['a'], 'code': SOURCE},
+    {'document_id': 'a' * 257, 'code': SOURCE},
+    {'document_id': 'a', 'code': 5},
+])
+def test_bad_requests_are_refused(client, body):
+    assert tokenize(client, **body).status_code == 400
+
+def test_documents_are_private_to_a_session(client):
+    tokenize(client, document_id='shared', language='python', code=SOURCE)
+    other = api_server.app.test_client()
+    response = tokenize(other, document_id='shared', edit={'offset': 0, 'deleted': 0, 'inserted': 'y'})
+    assert response.status_code == 409
+    tokenize(other, document_id='shared', language='python', code='z = 2\n')
+    response = tokenize(client, document_id='shared', edit={'offset': 0, 'deleted': 0, 'inserted': ''})
+    assert response.get_json()['tokens'] == Lexer(SOURCE, 'python').tokenize_buffer()[0].to_dicts()
+
+def test_documents_are_bounded(monkeypatch):
+    documents = api_server.LexDocuments(max_documents=3, max_chars=20)
+    buffer, errors = Lexer(SOURCE, 'python').tokenize_buffer()
+    for index in range(5):
+        documents.put('session', str(index), 'python', buffer, errors)
+    assert len(documents) == 3 and documents.get('session', '0') is None
+    documents.get('session', '2')
+    documents.put('session', 'big', 'python', *Lexer('y = 22\n' * 2, 'python').tokenize_buffer())
+    # 14 + 6 characters fit; the least recently used of the rest go
+    assert [key[1] for key in documents.entries] == ['2', 'big']
+    assert documents.chars == 20
+    
+    clock = iter([0.0, 0.0, 10.0, 10.0])
+    monkeypatch.setattr(api_server.time, 'monotonic', lambda: next(clock))
+    documents = api_server.LexDocuments(ttl=5.0)
+    documents.put('session', 'old', 'python', buffer, errors)
+    assert documents.get('session', 'old') is None and len(documents) == 0
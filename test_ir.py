@@ -0,0 +1,304 @@
+"""
+IR regression tests
+Lowers small programs with both frontends, runs the IR before and after
+optimization and compares the output with what the language prints
+"""
+
+import builtins
+import contextlib
+import importlib
+import io
+import pytest
+from cfamily_frontend import CFamilyFrontend
+from intermediate_representation import IRBuffer, IROpCode, IROptimizer, constant_value, is_constant
+from lexer import Lexer
+from python_frontend import PythonFrontend
+
+_BINARY = {
+    IROpCode.ADD: lambda a, b: a + b, IROpCode.SUB: lambda a, b: a - b, IROpCode.MUL: lambda a, b: a * b,
+    IROpCode.DIV: lambda a, b: a / b, IROpCode.FLOOR_DIV: lambda a, b: a // b, IROpCode.MOD: lambda a, b: a % b,
+    IROpCode.POW: lambda a, b: a ** b, IROpCode.BIT_AND: lambda a, b: a & b, IROpCode.BIT_OR: lambda a, b: a | b,
+    IROpCode.BIT_XOR: lambda a, b: a ^ b, IROpCode.SHL: lambda a, b: a << b, IROpCode.SHR: lambda a, b: a >> b,
+    IROpCode.EQ: lambda a, b: a == b, IROpCode.NE: lambda a, b: a != b, IROpCode.LT: lambda a, b: a < b,
+    IROpCode.STRICT_EQ: lambda a, b: (type(a) is bool) == (type(b) is bool) and a == b,
+    IROpCode.STRICT_NE: lambda a, b: (type(a) is bool) != (type(b) is bool) or a != b,
+    IROpCode.LE: lambda a, b: a <= b, IROpCode.GT: lambda a, b: a > b, IROpCode.GE: lambda a, b: a >= b,
+    IROpCode.IS: lambda a, b: a is b, IROpCode.IN: lambda a, b: a in b,
+    IROpCode.AND: lambda a, b: a and b, IROpCode.OR: lambda a, b: a or b,
+}
+
+def _printf(template, *args):
+    print(constant_value(repr(template)).replace('\\n', '\n') % tuple(int(arg) for arg in args), end='')
+
+class _Machine:
+    """Runs IR; a function's locals (as its symbol table scope declares them) live in its own frame"""
+    
+    def __init__(self, instructions, symbol_table):
+        self.instructions = list(instructions)
+        self.table = symbol_table
+        self.labels = {}
+        self.functions = {}
+        for index, instruction in enumerate(self.instructions):
+            if instruction.opcode == IROpCode.LABEL:
+                self.labels[instruction.operands[0]] = index
+            elif instruction.opcode == IROpCode.FUNC_BEGIN:
+                self.functions[instruction.operands[0]] = index
+        self.globals = {'printf': _printf, 'String': str}
+        self.steps = 0
+    
+    def call(self, name, args):
+        scope = self.table.functions.get(name) if self.table is not None else None
+        local = set() if scope is None else {
+            variable for variable, symbol in scope.symbols.items() if self.table.scopes[symbol] is scope}
+        return self.execute(self.functions[name] + 1, {}, local, args)
+    
+    def execute(self, pc, frame, local, args=()):
+        def value(operand):
+            if is_constant(operand):
+                return constant_value(operand)
+            for names in (frame, self.globals):
+                if operand in names:
+                    return names[operand]
+            if operand in self.functions:
+                return lambda *given: self.call(operand, given)
+            module, _, attribute = operand.rpartition('.')
+            return getattr(importlib.import_module(module) if module else builtins, attribute)
+        
+        def store(name, result):
+            (frame if name[:1] == 't' and name[1:].isdigit() or name in local else self.globals)[name] = result
+        
+        while True:
+            self.steps += 1
+            assert self.steps < 100_000, 'program ran too long'
+            if pc == len(self.instructions):
+                return None
+            instruction = self.instructions[pc]
+            opcode, operands, result = instruction.opcode, instruction.operands, instruction.result
+            pc += 1
+            if opcode in _BINARY:
+                store(result, _BINARY[opcode](value(operands[0]), value(operands[1])))
+            elif opcode in (IROpCode.STORE, IROpCode.LOAD, IROpCode.LOAD_CONST):
+                store(result, value(operands[0]))
+            elif opcode == IROpCode.NEG:
+                store(result, -value(operands[0]))
+            elif opcode == IROpCode.NOT:
+                store(result, not value(operands[0]))
+            elif opcode == IROpCode.PARAM:
+                position = operands[0]
+                store(result, args[position] if position < len(args) else value(operands[1]))
+            elif opcode == IROpCode.JUMP:
+                pc = self.labels[operands[0]]
+            elif opcode in (IROpCode.JUMP_IF_FALSE, IROpCode.JUMP_IF_TRUE):
+                if bool(value(operands[0])) == (opcode == IROpCode.JUMP_IF_TRUE):
+                    pc = self.labels[operands[1]]
+            elif opcode == IROpCode.GET_ITER:
+                store(result, iter(value(operands[0])))
+            elif opcode == IROpCode.FOR_ITER:
+                try:
+                    store(result, next(value(operands[0])))
+                except StopIteration:
+                    pc = self.labels[operands[1]]
+            elif opcode == IROpCode.CALL:
+                returned = value(operands[0])(*[value(operand) for operand in operands[1:]])
+                if result:
+                    store(result, returned)
+            elif opcode == IROpCode.PRINT:
+                print(*[value(operand) for operand in operands])
+            elif opcode == IROpCode.GET_ITEM:
+                store(result, value(operands[0])[value(operands[1])])
+            elif opcode == IROpCode.SET_ITEM:
+                value(operands[0])[value(operands[1])] = value(operands[2])
+            elif opcode == IROpCode.GET_ATTR:
+                store(result, getattr(value(operands[0]), value(operands[1])))
+            elif opcode == IROpCode.BUILD_LIST:
+                store(result, [value(operand) for operand in operands])
+            elif opcode == IROpCode.BUILD_TUPLE:
+                store(result, tuple(value(operand) for operand in operands))
+            elif opcode == IROpCode.BUILD_DICT:
+                store(result, dict(zip(*[iter([value(operand) for operand in operands])] * 2)))
+            elif opcode == IROpCode.RETURN:
+                return value(operands[0]) if operands else None
+            elif opcode in (IROpCode.HALT, IROpCode.FUNC_BEGIN, IROpCode.FUNC_END):
+                return None
+            elif opcode != IROpCode.LABEL:
+                raise NotImplementedError(str(instruction))
+
+def run_ir(instructions, symbol_table=None) -> str:
+    """What a program in IR prints"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        _Machine(instructions, symbol_table).execute(0, {}, set())
+    return output.getvalue()
+
+def run_python(source: str) -> str:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(compile(source, '<test>', 'exec'), {})
+    return output.getvalue()
+
+def lower_python(source: str) -> PythonFrontend:
+    frontend = PythonFrontend()
+    frontend.generate_from_source(source)
+    return frontend
+
+def lower_cfamily(source: str, language: str) -> CFamilyFrontend:
+    frontend = CFamilyFrontend(language)
+    frontend.generate_from_buffer(Lexer(source, language).tokenize_buffer()[0])
+    return frontend
+
+def optimized(frontend, language: str = 'python', level: int = 2) -> IRBuffer:
+    optimizer = IROptimizer(language, level)
+    return optimizer.optimize_ir(IRBuffer(frontend.instructions, frontend.symbol_table))
+
+def assert_runs(source: str, expected: str, lower, language: str):
+    """The program prints expected unoptimized and at every level"""
+    assert run_ir(lower(source).instructions, lower(source).symbol_table) == expected
+    for level in IROptimizer.LEVELS[1:]:
+        frontend = lower(source)
+        assert run_ir(optimized(frontend, language, level), frontend.symbol_table) == expected, f'O{level}'
+
+@pytest.mark.parametrize('source', [
+    'x = 1\nprint(x + (x := 5))\n',
+    'k = 1\ndef inc():\n    global k\n    k += 1\n    return 0\nprint(k, inc())\nprint(k + inc(), k)\n',
+    'k = 1\ndef inc():\n    global k\n    k += 1\n    return 10\nk += inc()\nprint(k)\n',
+    'k = 1\ndef inc():\n    global k\n    k += 1\n    return k\nprint([k, inc(), k], k < inc() < k)\n',
+])
+def test_python_operands_read_before_later_siblings_run(source):
+    assert_runs(source, run_python(source), lower_python, 'python')
+
+@pytest.mark.parametrize('source', [
+    'x = [1, 2]\ny = x\nx += [3]\nprint(y)\n',
+    'd = {"a": [1]}\ne = d["a"]\nd["a"] += [2]\nprint(e)\n',
+    'def f(xs):\n    total = []\n    for x in xs:\n        alias = total\n        total += [x * 2]\n    return alias\nprint(f([1, 2]))\n',
+    's = "a"\ns += "b"\nn = 0\nfor i in range(4):\n    n += i\nprint(s, n)\n',
+])
+def test_python_augmented_assignment_updates_in_place(source):
+    assert_runs(source, run_python(source), lower_python, 'python')
+
+def test_python_augmented_assignment_on_numbers_stays_arithmetic():
+    instructions = [str(instruction) for instruction in lower_python('n = 0\nfor i in range(4):\n    n += i\n').instructions]
+    assert 'n = ADD n, i' in instructions
+    assert [str(instruction) for instruction in lower_python('x = []\nx += [1]\n').instructions][-1].startswith(
+        'x = CALL operator.iadd, x, ')
+
+@pytest.mark.parametrize('source', [
+    'i = 5\nxs = [i * 2 for i in range(3)]\nprint(i, xs)\n',
+    'i = 5\nprint({i: j for i in range(2) for j in range(i)}, i)\n',
+    'x = [[1, 2], [3]]\nprint([y for x in x for y in x], x)\n',
+    'pairs = [(1, 2), (3, 4)]\na = 0\nprint([a + b for a, b in pairs], a)\n',
+    'i = 9\ndef f(n):\n    i = 7\n    return sum([i for i in range(n)]) + i\nprint(f(4), i)\n',
+    'print([[j for j in range(i)] for i in range(3)])\n',
+    'total = 0\nprint([total := total + v for v in [1, 2, 3]], total)\n',
+])
+def test_python_comprehension_variables_stay_in_the_comprehension(source):
+    assert_runs(source, run_python(source), lower_python, 'python')
+
+def test_python_lambda_over_a_comprehension_variable_is_unsupported():
+    frontend = lower_python('i = 5\nfs = [lambda: i for i in range(3)]\n')
+    assert [entry['construct'] for entry in frontend.unsupported] == ['lambda over a comprehension variable']
+
+@pytest.mark.parametrize('source, expected', [
+    ('t0 = 1\n_t0 = 2\nprint(t0, _t0)\n', '1 2\n'),
+    ('L1 = 1\n_L1 = 2\n__L1 = 3\nprint(L1, _L1, __L1)\n', '1 2 3\n'),
+])
+def test_python_names_that_look_like_temporaries_stay_distinct(source, expected):
+    assert_runs(source, expected, lower_python, 'python')
+
+def test_c_names_that_look_like_temporaries_stay_distinct():
+    source = 'int t0 = 1;\nint _t0 = 2;\nint main() {\n  printf("%d %d\\n", t0, _t0);\n  return 0;\n}\n'
+    assert_runs(source, '1 2\n', lambda source: lower_cfamily(source, 'c'), 'c')
+
+def test_c_logical_operators_give_zero_or_one():
+    source = 'int main() {\n  int x = 5 && 3;\n  int y = 0 || 7;\n  printf("%d %d\\n", x, y);\n  return 0;\n}\n'
+    assert_runs(source, '1 1\n', lambda source: lower_cfamily(source, 'c'), 'c')
+
+def test_javascript_logical_operators_give_an_operand():
+    source = 'let x = 5 && 3;\nlet y = 0 || "d";\nconsole.log(x, y);\n'
+    assert_runs(source, '3 d\n', lambda source: lower_cfamily(source, 'javascript'), 'javascript')
+
+@pytest.mark.parametrize('source, expected', [
+    ('function f(a, b) {\n  let x = a == b;\n  let y = a === b;\n  return [x, y];\n}\nconsole.log(f(1, true));\n',
+     '[True, False]\n'),
+    ('let a = 1 === true;\nlet b = 1 == true;\nlet c = "x" !== "x";\nconsole.log(a, b, c);\n', 'False True False\n'),
+    ('function g(v) {\n  switch (v) {\n    case 1: return "one";\n    default: return "other";\n  }\n}\n'
+     'console.log(g(true), g(1));\n', 'other one\n'),
+])
+def test_javascript_strict_equality_does_not_coerce(source, expected):
+    assert_runs(source, expected, lambda source: lower_cfamily(source, 'javascript'), 'javascript')
+
+@pytest.mark.parametrize('language', ['javascript', 'typescript'])
+def test_template_literal_substitutions_are_evaluated(language):
+    source = 'let x = 4;\nlet s = `v=${x + 1}!`;\nconsole.log(s);\n'
+    assert_runs(source, 'v=5!\n', lambda source: lower_cfamily(source, language), language)
+
+def run_pass(frontend, name: str, language: str = 'python'):
+    """The optimizer, and the IR text before and after one pass run on its own"""
+    optimizer = IROptimizer(language)
+    buffer = IRBuffer(frontend.instructions, frontend.symbol_table)
+    before = [str(instruction) for instruction in buffer]
+    output = run_ir(buffer, frontend.symbol_table)
+    getattr(optimizer, name)(buffer)
+    assert run_ir(buffer, frontend.symbol_table) == output
+    return optimizer, before, [str(instruction) for instruction in buffer]
+
+def test_fold_constants():
+    _, before, after = run_pass(lower_python('x = 2 * 3 + 1\nprint(x)\n'), '_fold_constants')
+    assert 'x = LOAD_CONST 7' not in before
+    assert 'x = LOAD_CONST 7' in after
+
+def test_constant_propagation():
+    _, before, after = run_pass(lower_python('x = 2 * 3 + 1\nprint(x)\n'), '_constant_propagation')
+    assert 't2 = MUL t0, t1' in before
+    assert 't2 = MUL 2, 3' in after
+
+def test_global_value_numbering():
+    source = 'def f(a, b):\n    c = a * b\n    d = a * b\n    return c + d\nprint(f(2, 3))\n'
+    _, before, after = run_pass(lower_python(source), '_global_value_numbering')
+    assert 'd = MUL a, b' in before
+    assert 'd = STORE c' in after and any(line.endswith('ADD c, c') for line in after)
+
+def test_eliminate_dead_code():
+    source = 'def f(a):\n    y = a + 1\n    return a\nprint(f(2))\n'
+    _, before, after = run_pass(lower_python(source), '_eliminate_dead_code')
+    assert any(line.startswith('y = ') for line in before)
+    assert not any(line.startswith('y = ') for line in after)
+
+def test_optimize_loops_hoists_invariants():
+    source = ('int f(int a, int b) {\n  int s = 0;\n  for (int i = 0; i < 3; i++) {\n    s = s + a * b;\n  }\n'
+              '  return s;\n}\nint main() {\n  printf("%d\\n", f(2, 3));\n  return 0;\n}\n')
+    optimizer, before, after = run_pass(lower_cfamily(source, 'c'), '_optimize_loops', 'c')
+    product = next(line for line in before if line.endswith('MUL a, b'))
+    assert before.index(product) > before.index('LABEL L0')
+    assert after.index(product) < after.index('LABEL L0')
+    assert [record['transformation'] for record in optimizer.loop_transformations] == ['hoisted']
+
+def test_inline_functions():
+    source = 'def sq(n):\n    return n * n\nprint(sq(3))\n'
+    optimizer, before, after = run_pass(lower_python(source), '_inline_functions')
+    assert any('CALL sq' in line for line in before)
+    assert not any('CALL sq' in line for line in after)
+    assert optimizer.inlined_calls
+
+def test_eliminate_dead_functions():
+    source = 'def f():\n    return 1\ndef g():\n    return 2\nprint(f())\n'
+    optimizer, before, after = run_pass(lower_python(source), '_eliminate_dead_functions')
+    assert 'FUNC_BEGIN g' in before
+    assert 'FUNC_BEGIN g' not in after and 'FUNC_BEGIN f' in after
+    assert optimizer.removed_functions == ['g']
+
+def test_allocate_temporaries():
+    def temporaries(lines):
+        return {word.rstrip(',') for line in lines for word in line.split()
+                if word[:1] == 't' and word.rstrip(',')[1:].isdigit()}
+    
+    source = 'x = 1 + 2\ny = x * 3\nz = y - 4\nprint(z)\n'
+    _, before, after = run_pass(lower_python(source), '_allocate_temporaries')
+    assert len(temporaries(after)) < len(temporaries(before))
+
+def test_buffer_holds_instructions_with_many_operands():
+    source = 'x = [' + ', '.join(map(str, range(70000))) + ']\nprint(len(x))\n'
+    frontend = lower_python(source)
+    buffer = IRBuffer(frontend.instructions, frontend.symbol_table)
+    build = next(instruction for instruction in buffer.to_instructions() if instruction.opcode == IROpCode.BUILD_LIST)
+    assert len(build.operands) == 70000
+    assert run_ir(buffer, frontend.symbol_table) == '70000\n'
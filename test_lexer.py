@@ -0,0 +1,157 @@
+"""
+Lexer regression tests
+Every way of lexing a source (streamed in chunks, the numpy engine) has to
+give the tokens and errors of the one-shot regex scan
+"""
+
+import difflib
+import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import lexer
+from language_specs import LANGUAGE_SPECS
+from lexer import Lexer
+from lexer_benchmark import realistic_source
+
+def tokens(stream):
+    return [(token.type, token.value, token.line, token.column) for token in stream]
+
+def chunks(source: str, size: int):
+    return [source[index:index + size] for index in range(0, len(source), size)]
+
+@pytest.mark.parametrize('source, language', [
+    ('x <- `%in% y', 'r'),
+    ('x <- 1 %% 2 $$ y\n', 'r'),
+    ('a = 1 $$$ b\nc = "open\n', 'python'),
+    ('let s = `a${b}` @@ c;\n', 'javascript'),
+])
+@pytest.mark.parametrize('size', [1, 2, 3, 5])
+def test_streamed_chunks_match_one_shot(source, language, size):
+    whole = Lexer(source, language)
+    expected = tokens(whole.iter_tokens())
+    streamed = Lexer(source, language)
+    assert tokens(streamed.iter_tokens(chunks(source, size), chunk_size=size)) == expected
+    assert streamed.errors == whole.errors
+
+def buffer_columns(buffer):
+    return list(buffer.types), list(buffer.starts), list(buffer.ends), list(buffer.lines), list(buffer.columns)
+
+@pytest.mark.parametrize('language', sorted(LANGUAGE_SPECS))
+@pytest.mark.parametrize('source', [
+    'x = 3.5e-2 + 0x1F // y  # note\nname = "a\\"b" \'c\'\n\tif (a <= b) { c->d; }\n',
+    'café = ٣ + λ²\ns = "€ "\n@@ $x ?? `t`\n',
+    'a = "open\nb <<= 1 >>> 2 ... ::\n',
+])
+def test_numpy_engine_matches_regex(monkeypatch, source, language):
+    monkeypatch.setattr(Lexer, 'NUMPY_THRESHOLD', 0)
+    for text in (source, realistic_source(language, 2000)):
+        buffer, errors = Lexer(text, language).tokenize_buffer()
+        numpy_buffer, numpy_errors = Lexer(text, language, 'numpy').tokenize_buffer()
+        assert buffer_columns(numpy_buffer) == buffer_columns(buffer)
+        assert numpy_errors == errors
+        assert tokens(Lexer(text, language, 'numpy').iter_tokens()) == tokens(Lexer(text, language).iter_tokens())
+
+class _Planted:
+    def __init__(self, path):
+        self.path = path
+    
+    def __reduce__(self):
+        return open, (self.path, 'w')
+
+def test_tables_cache_is_data_only(tmp_path, monkeypatch):
+    cache = tmp_path / 'lexer_tables.json'
+    monkeypatch.setenv('LEXER_TABLES_CACHE', str(cache))
+    built = lexer._load_lexer_tables()
+    loaded = lexer._load_lexer_tables()
+    assert loaded.keys() == built.keys()
+    for name, tables in built.items():
+        assert loaded[name].pattern.pattern == tables.pattern.pattern
+        assert loaded[name].ascii_starts == tables.ascii_starts and loaded[name].keywords == tables.keywords
+    assert loaded['python'].typo_index.suggest('retrun') == 'return'
+    
+    planted = tmp_path / 'planted'
+    cache.write_bytes(pickle.dumps(_Planted(str(planted))))
+    assert lexer._load_lexer_tables().keys() == built.keys()
+    assert not planted.exists()
+
+@pytest.mark.parametrize('offset, deleted', [(100, 0), (-3, 0), (0, -5), (4, 3)])
+def test_relex_refuses_edits_outside_the_source(offset, deleted):
+    buffer, errors = Lexer('x = 1\n').tokenize_buffer()
+    with pytest.raises(ValueError):
+        Lexer('').relex(buffer, errors, offset, deleted, 'y')
+
+@pytest.mark.parametrize('source, language', [
+    ('²R""(\np', 'cpp'),
+    ('x = R"(a\n)" + éR"(b\n)" + a²R"(c\n)";\n', 'cpp'),
+    ('s = u8R"x(\n)"\n)x" // R"(\n', 'cpp'),
+    ('/* R"(\n */ "a\nb" \'c\'\n', 'javascript'),
+    ('x = """\n1\n""" # "\ny = 2\n', 'python'),
+])
+@pytest.mark.parametrize('workers', [2, 3, 5])
+def test_parallel_split_points_match_one_shot(source, language, workers):
+    buffer, errors = Lexer(source, language).tokenize_buffer()
+    with ThreadPoolExecutor(workers) as executor:
+        parallel, parallel_errors = Lexer(source, language).tokenize_parallel(workers, threshold=0, executor=executor)
+    assert buffer_columns(parallel) == buffer_columns(buffer)
+    assert parallel_errors == errors
+
+# Edits that open and close strings and comments force relex to rescan past
+# the edited line before it can splice the rest of the previous buffer back in
+EDIT_PIECES = ['x', ' = 1', '\n', '"', "'", '"""', '`', '/*', '*/', '#', '//', 'R"(', ')"', '{', '}', '\\', '²', '$$']
+
+@pytest.mark.parametrize('language', sorted(LANGUAGE_SPECS))
+def test_relex_matches_full_tokenize_on_random_edits(language):
+    rng = random.Random(language)
+    source = realistic_source(language, 1500)
+    buffer, errors = Lexer(source, language).tokenize_buffer()
+    for _ in range(40):
+        offset = rng.randint(0, len(source))
+        deleted = rng.randint(0, min(12, len(source) - offset))
+        inserted = ''.join(rng.choice(EDIT_PIECES) for _ in range(rng.randint(0, 3)))
+        buffer, errors = Lexer('', language).relex(buffer, errors, offset, deleted, inserted)
+        source = source[:offset] + inserted + source[offset + deleted:]
+        expected, expected_errors = Lexer(source, language).tokenize_buffer()
+        assert buffer.source == source
+        assert buffer_columns(buffer) == buffer_columns(expected)
+        assert errors == expected_errors
+
+@pytest.mark.parametrize('language', sorted(LANGUAGE_SPECS))
+def test_parallel_matches_serial(language):
+    source = realistic_source(language, 20000) + 'x = "open\n/* unclosed\n'
+    buffer, errors = Lexer(source, language).tokenize_buffer()
+    with ThreadPoolExecutor(4) as executor:
+        parallel, parallel_errors = Lexer(source, language).tokenize_parallel(4, threshold=0, executor=executor)
+    assert buffer_columns(parallel) == buffer_columns(buffer)
+    assert parallel_errors == errors
+
+def test_parallel_process_pool_matches_serial():
+    source = realistic_source('cpp', 20000)
+    assert buffer_columns(Lexer(source, 'cpp').tokenize_parallel(2, threshold=0)[0]) == \
+        buffer_columns(Lexer(source, 'cpp').tokenize_buffer()[0])
+
+@pytest.mark.parametrize('language', sorted(LANGUAGE_SPECS))
+def test_typo_index_matches_difflib(language):
+    tables = lexer.lexer_tables(language)
+    keywords = tables.typo_index.keywords
+    rng = random.Random(language)
+    words = ['', 'x', 'retrun', 'whiel', 'fnuction', 'SELEC', 'improt', 'esle']
+    for keyword in keywords:
+        chars = list(keyword)
+        rng.shuffle(chars)
+        words += [keyword, keyword[1:], keyword + 's', keyword[::-1], ''.join(chars)]
+    for cutoff in (0.6, 0.8):
+        index = lexer.TypoIndex(keywords, cutoff)
+        for word in words:
+            expected = difflib.get_close_matches(word, keywords, n=1, cutoff=cutoff)
+            assert index.suggest(word) == (expected[0] if expected else None), word
+
+@pytest.mark.parametrize('source', ['', 'x = 1\n', 'café = "€"\n' * 50, realistic_source('python', 70000)])
+def test_token_buffer_bytes_round_trip(source):
+    buffer, _ = Lexer(source).tokenize_buffer()
+    restored = lexer.TokenBuffer.from_bytes(buffer.to_bytes(), source)
+    assert buffer_columns(restored) == buffer_columns(buffer)
+    assert restored.to_dicts() == buffer.to_dicts() == [
+        {'type': token.type.name, 'value': token.value, 'line': token.line, 'column': token.column}
+        for token in Lexer(source).tokenize()[0]
+    ]
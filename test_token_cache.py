@@ -0,0 +1,50 @@
+"""
+Token cache regression tests
+A hit returns what the lexer would have, entries are shared through the
+SQLite file and a new lexer version never reads the old entries
+"""
+
+import token_cache
+from lexer import Lexer
+from token_cache import TokenCache
+
+SOURCE = 'x = 1 $$ y\ns = "open\n'
+
+def lexed(cache: TokenCache, source: str = SOURCE, language: str = 'python'):
+    buffer, errors = cache.tokenize(Lexer(source, language))
+    return buffer.to_dicts(), errors
+
+def test_hit_returns_the_lexer_output():
+    cache = TokenCache()
+    expected = Lexer(SOURCE, 'python').tokenize_buffer()
+    expected = expected[0].to_dicts(), expected[1]
+    assert lexed(cache) == expected
+    assert lexed(cache) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Another language is another entry
+    lexed(cache, language='javascript')
+    assert cache.misses == 2 and len(cache.entries) == 2
+
+def test_entries_are_shared_through_the_file(tmp_path):
+    path = str(tmp_path / 'tokens.db')
+    lexed(TokenCache(path=path))
+    other = TokenCache(path=path)
+    assert lexed(other) == lexed(TokenCache())
+    assert (other.hits, other.disk_hits, other.misses) == (1, 1, 0)
+
+def test_memory_is_bounded():
+    cache = TokenCache()
+    lexed(cache, SOURCE + '#' * 3)
+    cache = TokenCache(max_bytes=2 * cache.size)
+    for index in range(4):
+        lexed(cache, SOURCE + '#' * index)
+    assert len(cache.entries) == 2 and cache.evictions == 2 and cache.size <= cache.max_bytes
+
+def test_lexer_version_bump_invalidates(tmp_path, monkeypatch):
+    path = str(tmp_path / 'tokens.db')
+    cache = TokenCache(path=path)
+    lexed(cache)
+    monkeypatch.setattr(token_cache, 'LEXER_VERSION', token_cache.LEXER_VERSION + '.next')
+    lexed(cache)
+    lexed(TokenCache(path=path))
+    assert cache.hits == 0 and cache.misses == 2
@@ -0,0 +1,180 @@
+"""
+Content-Addressed Token Cache
+Reuses token buffers and lexer errors for source code that was already lexed
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from lexer import Lexer, TokenBuffer, LEXER_VERSION
+
+class TokenCache:
+    """
+    LRU cache of lexer output keyed by (source hash, language, lexer version)
+    
+    Entries are stored serialized (TokenBuffer.to_bytes() plus the errors as
+    JSON), so their exact size bounds the in-memory cache at max_bytes. When
+    path is given, entries are also written to a SQLite file that several
+    server processes can share; it is trimmed to max_disk_bytes by last use.
+    """
+    
+    def __init__(self, max_bytes: int = 64 << 20, path: Optional[str] = None,
+                 max_disk_bytes: int = 512 << 20):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.path = path
+        self.entries: 'OrderedDict[str, Tuple[bytes, str]]' = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS token_cache (
+                    key TEXT PRIMARY KEY,
+                    tokens BLOB NOT NULL,
+                    errors TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            self._db.commit()
+    
+    @staticmethod
+    def make_key(source: str, language: str) -> str:
+        """Cache key for a source text in a language"""
+        digest = hashlib.sha256(source.encode('utf-8', 'surrogatepass')).hexdigest()
+        return f'{digest}:{language}:{LEXER_VERSION}'
+    
+    def tokenize(self, lexer: Lexer) -> Tuple[TokenBuffer, List[dict]]:
+        """
+        Lexer.tokenize_buffer() through the cache
+        
+        On a hit the lexer is not run; its errors are replaced with the
+        cached ones so it looks as if it had tokenized the source.
+        """
+        key = self.make_key(lexer.source, lexer.language)
+        entry = self.get(key)
+        if entry is not None:
+            data, errors = entry
+            lexer.errors = json.loads(errors)
+            return TokenBuffer.from_bytes(data, lexer.source), lexer.errors
+        
+        buffer, errors = lexer.tokenize_buffer()
+        self.put(key, buffer.to_bytes(), json.dumps(errors))
+        return buffer, errors
+    
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Serialized (tokens, errors JSON) for key, or None"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            
+            if self._db is not None:
+                row = self._db.execute(
+                    'SELECT tokens, errors FROM token_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        'UPDATE token_cache SET last_used = ? WHERE key = ?', (time.time(), key)
+                    )
+                    self._db.commit()
+                    entry = (bytes(row[0]), row[1])
+                    self._remember(key, entry)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return entry
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key: str, tokens: bytes, errors: str):
+        """Store serialized lexer output under key"""
+        entry = (tokens, errors)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO token_cache VALUES (?, ?, ?, ?, ?)',
+                    (key, tokens, errors, _entry_size(entry), time.time())
+                )
+                self._trim_disk()
+                self._db.commit()
+    
+    def clear(self):
+        """Drop every entry (the SQLite file included) and reset the counters"""
+        with self._lock:
+            self.entries.clear()
+            self.size = 0
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM token_cache')
+                self._db.commit()
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': f"{self.hits / lookups * 100:.1f}%" if lookups else 'N/A',
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'shared_file': self.path
+        }
+    
+    def _remember(self, key: str, entry: Tuple[bytes, str]):
+        """Insert into the in-memory LRU, evicting the oldest entries over budget"""
+        size = _entry_size(entry)
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= _entry_size(old)
+        self.entries[key] = entry
+        self.size += size
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= _entry_size(evicted)
+            self.evictions += 1
+    
+    def _trim_disk(self):
+        """Delete least recently used rows while the file is over budget"""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM token_cache').fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute('SELECT key, size FROM token_cache ORDER BY last_used')
+        stale = []
+        for key, size in rows.fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._db.executemany('DELETE FROM token_cache WHERE key = ?', stale)
+
+def _entry_size(entry: Tuple[bytes, str]) -> int:
+    """Bytes held by a serialized entry"""
+    return len(entry[0]) + len(entry[1])
+
+# Cache shared by every compiler in this process; set TOKEN_CACHE_DB to a
+# file path to share it across server workers as well
+token_cache = TokenCache(
+    max_bytes=int(os.environ.get('TOKEN_CACHE_MAX_BYTES', 64 << 20)),
+    path=os.environ.get('TOKEN_CACHE_DB') or None
+)